@@ -3,25 +3,67 @@ import ipaddress
 import socket
 import platform
 import subprocess
-import json
 import os
+import sqlite3
+import time
+import importlib
+import threading
 from datetime import datetime
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
     QPushButton, QTextEdit, QMessageBox, QComboBox, QFileDialog, QTabWidget,
-    QListWidget, QListWidgetItem, QInputDialog
+    QListWidget, QListWidgetItem, QInputDialog, QTableView, QHeaderView,
+    QProgressBar, QTableWidget, QTableWidgetItem, QCheckBox
 )
 from PyQt5.QtGui import QPalette, QColor, QFont
-from PyQt5.QtCore import Qt, QSettings
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
-import matplotlib.pyplot as plt
-import pandas as pd
-import openpyxl
-from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
-from openpyxl.utils import get_column_letter
+from PyQt5.QtCore import Qt, QSettings, QStandardPaths, QTimer
+
+from motor_vlsm import (
+    MODOS, MODO_SUBREDES, MODO_VLSM, ErrorPlan, planificar_en_cache, ancho_de_mascara, datos_subred,
+    encabezado_plan, int_a_ip, parsear_ip, parsear_mascara, parsear_red, parsear_requisitos, resumen_corto,
+    ANCHO_IPV4
+)
+from vista_resultados import ModeloPlan
+from vista_mapa import MapaDirecciones
+from tareas import Tarea, TareaCancelada, iniciar
+from instrumentacion import ESTADO_CANCELADO, Registro, exportar_traza, texto_medicion, texto_registro
+from historial_db import HistorialDB, TAMANO_PAGINA
+from indice_ipam import IndiceIPAM, etiqueta_calculo, leer_inventario, rangos_plan, texto_conflictos
+
+# Módulos pesados (NumPy, exportación, gráficos, asyncio) que se importan al
+# usarlos por primera vez; tras mostrar la ventana se precargan en segundo plano
+MODULOS_DIFERIDOS = (
+    "tabla_vectorizada", "exportadores", "herramientas_red",
+    "openpyxl", "reportlab.pdfgen.canvas", "mapa_hilbert", "clasificador_ip",
+    "sumarizacion", "espacio_libre",
+)
+PRECALENTAR_MS = 1000
+
+# Modo de sumarización: (formato de salida, tolerancia de espacio extra)
+MODOS_SUMARIZACION = {
+    "Exacta (CIDR)": ("cidr", 0.0),
+    "Exacta (ACL con wildcard)": ("acl", 0.0),
+    "Inexacta para ACL (hasta 25% de espacio extra)": ("acl", 0.25),
+}
+MAX_LINEAS_SUMARIZACION = 5000  # líneas que se muestran en la pestaña
+
+# Vista previa: espera tras la última tecla y tope de requisitos VLSM que se
+# asignan mientras se escribe (con más, solo se cuentan)
+RETARDO_VISTA_PREVIA_MS = 250
+MAX_REQUISITOS_VISTA_PREVIA = 2000
+
+ORIGEN_PLAN = "Subredes del plan actual"
+ORIGEN_HISTORIAL = "Historial e inventarios importados"
+ORIGEN_ARCHIVO = "Archivo de prefijos"
+
+
+def precargar_modulos(nombres=MODULOS_DIFERIDOS):
+    for nombre in nombres:
+        try:
+            importlib.import_module(nombre)
+        except ImportError:
+            # Se informará al usuario cuando intente usar la función
+            pass
 
 
 class VLSMSubnettingApp(QWidget):
@@ -33,15 +75,27 @@ class VLSMSubnettingApp(QWidget):
         
         # Cargar configuración
         self.modo_oscuro = self.settings.value("modo_oscuro", False, type=bool)
-        self.historial = json.loads(self.settings.value("historial", "[]"))
+        self.registro = Registro(ruta_log=os.path.join(self.carpeta_datos(), "rendimiento.log"))
+        self.historial = self.abrir_historial()
+        self.indice_ipam = IndiceIPAM.desde_bloques(self.historial.iterar_bloques())
+        self.ultima_pagina_historial = None
         self.ultima_ruta = self.settings.value("ultima_ruta", "")
         
+        self.tarea_actual = None
+        self.ultima_tarea = None
+        self.resolutor_dns = None  # se crea en la primera resolución masiva
+        # Mientras se rellenan las entradas por código no se programa la vista previa
+        self.cargando_entradas = False
+        
         self.setup_ui()
         self.cargar_configuracion()
+        QTimer.singleShot(PRECALENTAR_MS, self.precalentar_modulos)
         
         # Variables de estado
-        self.subredes_actuales = []
-        self.calculo_actual = ""
+        self.plan_actual = None
+
+    def precalentar_modulos(self):
+        threading.Thread(target=precargar_modulos, daemon=True).start()
 
     def setup_ui(self):
         # Configuración principal
@@ -57,6 +111,11 @@ class VLSMSubnettingApp(QWidget):
         self.tabs.addTab(self.tab_calculo, "🧮 Cálculo VLSM")
         self.setup_tab_calculo()
         
+        # Pestaña del mapa de direcciones
+        self.tab_mapa = QWidget()
+        self.tabs.addTab(self.tab_mapa, "🗺️ Mapa")
+        self.setup_tab_mapa()
+        
         # Pestaña de historial
         self.tab_historial = QWidget()
         self.tabs.addTab(self.tab_historial, "📚 Historial")
@@ -67,11 +126,27 @@ class VLSMSubnettingApp(QWidget):
         self.tabs.addTab(self.tab_herramientas, "🛠️ Herramientas")
         self.setup_tab_herramientas()
         
-        # Barra de estado
+        # Barra de estado con progreso de la tarea en segundo plano
+        grupo_estado = QHBoxLayout()
+        
+        self.barra_progreso = QProgressBar()
+        self.barra_progreso.setRange(0, 1000)
+        self.barra_progreso.setTextVisible(False)
+        self.barra_progreso.setMaximumHeight(12)
+        self.barra_progreso.hide()
+        
+        self.btn_cancelar = QPushButton("⏹️ Cancelar")
+        self.btn_cancelar.clicked.connect(self.cancelar_tarea)
+        self.btn_cancelar.hide()
+        
         self.status_bar = QLabel("Listo")
         self.status_bar.setFont(QFont("Arial", 8))
         self.status_bar.setAlignment(Qt.AlignRight)
-        layout.addWidget(self.status_bar)
+        
+        grupo_estado.addWidget(self.barra_progreso)
+        grupo_estado.addWidget(self.btn_cancelar)
+        grupo_estado.addWidget(self.status_bar, 1)
+        layout.addLayout(grupo_estado)
 
     def setup_tab_calculo(self):
         layout = QVBoxLayout()
@@ -80,18 +155,26 @@ class VLSMSubnettingApp(QWidget):
         # Grupo de entrada de datos
         grupo_entrada = QVBoxLayout()
         
-        self.label_ip = QLabel("IP de Red/CIDR (ej: 192.168.1.0/24 o 10.0.0.0/255.255.0.0):")
+        self.label_ip = QLabel("IP de Red/CIDR (ej: 192.168.1.0/24, 10.0.0.0/255.255.0.0 o 2001:db8::/32):")
         self.input_ip = QLineEdit()
-        self.input_ip.textChanged.connect(self.validar_ip)
+        self.input_ip.textChanged.connect(self.programar_vista_previa)
         
         self.label_tipo = QLabel("Selecciona tipo de entrada:")
         self.combo_tipo = QComboBox()
-        self.combo_tipo.addItems(["Cantidad de subredes", "Cantidad de hosts por subred"])
+        self.combo_tipo.addItems(list(MODOS))
         self.combo_tipo.currentIndexChanged.connect(self.actualizar_placeholder)
+        self.combo_tipo.currentIndexChanged.connect(self.programar_vista_previa)
         
         self.label_cantidad = QLabel("Valor:")
         self.input_cantidad = QLineEdit()
         self.input_cantidad.setPlaceholderText("Ej: 5 (subredes) o 30 (hosts)")
+        self.input_cantidad.textChanged.connect(self.programar_vista_previa)
+        
+        # La validación y la vista previa esperan a que se deje de escribir
+        self.temporizador_vista_previa = QTimer(self)
+        self.temporizador_vista_previa.setSingleShot(True)
+        self.temporizador_vista_previa.setInterval(RETARDO_VISTA_PREVIA_MS)
+        self.temporizador_vista_previa.timeout.connect(self.vista_previa)
         
         grupo_entrada.addWidget(self.label_ip)
         grupo_entrada.addWidget(self.input_ip)
@@ -110,13 +193,40 @@ class VLSMSubnettingApp(QWidget):
         self.btn_limpiar = QPushButton("🧹 Limpiar")
         self.btn_limpiar.clicked.connect(self.limpiar_campos)
         
+        self.check_vista_previa = QCheckBox("⚡ Vista previa al escribir")
+        self.check_vista_previa.setToolTip("Muestra el plan mientras escribes; se guarda en el historial al pulsar Calcular")
+        self.check_vista_previa.setChecked(self.settings.value("vista_previa", True, type=bool))
+        self.check_vista_previa.toggled.connect(self.programar_vista_previa)
+        
         grupo_botones.addWidget(self.btn_calcular)
         grupo_botones.addWidget(self.btn_limpiar)
+        grupo_botones.addWidget(self.check_vista_previa)
         
-        # Resultados
-        self.resultado = QTextEdit()
-        self.resultado.setReadOnly(True)
+        # Resultados: tabla virtualizada sobre el plan
+        self.resumen = QLabel("")
+        self.resumen.setFont(QFont("Courier New", 10))
+        
+        self.modelo_resultado = ModeloPlan(self)
+        self.resultado = QTableView()
+        self.resultado.setModel(self.modelo_resultado)
         self.resultado.setFont(QFont("Courier New", 10))
+        self.resultado.setAlternatingRowColors(True)
+        self.resultado.verticalHeader().hide()
+        self.resultado.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.resultado.verticalHeader().setDefaultSectionSize(22)
+        self.resultado.horizontalHeader().setStretchLastSection(True)
+        
+        # Salto directo a una subred por número o por una IP que contenga
+        grupo_navegacion = QHBoxLayout()
+        self.input_ir_fila = QLineEdit()
+        self.input_ir_fila.setPlaceholderText("Ej: 42 o 192.168.1.77")
+        self.input_ir_fila.returnPressed.connect(self.ir_a_subred)
+        self.btn_ir_fila = QPushButton("🔎 Ir / Buscar IP")
+        self.btn_ir_fila.clicked.connect(self.ir_a_subred)
+        grupo_navegacion.addWidget(QLabel("Subred # o IP:"))
+        grupo_navegacion.addWidget(self.input_ir_fila)
+        grupo_navegacion.addWidget(self.btn_ir_fila)
+        grupo_navegacion.addStretch()
         
         # Grupo de exportación
         grupo_exportacion = QHBoxLayout()
@@ -127,33 +237,63 @@ class VLSMSubnettingApp(QWidget):
         self.btn_exportar_excel = QPushButton("📊 Exportar a Excel")
         self.btn_exportar_excel.clicked.connect(self.exportar_excel)
         
-        self.btn_grafico = QPushButton("📈 Ver gráfico")
+        self.btn_grafico = QPushButton("🗺️ Ver mapa")
         self.btn_grafico.clicked.connect(self.ver_grafico)
         
+        self.btn_clasificar = QPushButton("🧮 Clasificar IPs")
+        self.btn_clasificar.clicked.connect(self.clasificar_ips)
+        
         grupo_exportacion.addWidget(self.btn_exportar)
         grupo_exportacion.addWidget(self.btn_exportar_excel)
         grupo_exportacion.addWidget(self.btn_grafico)
+        grupo_exportacion.addWidget(self.btn_clasificar)
         
         # Ensamblar la pestaña
         layout.addLayout(grupo_entrada)
         layout.addLayout(grupo_botones)
         layout.addWidget(QLabel("📄 Resultados:"))
+        layout.addWidget(self.resumen)
         layout.addWidget(self.resultado)
+        layout.addLayout(grupo_navegacion)
         layout.addLayout(grupo_exportacion)
 
+    def setup_tab_mapa(self):
+        layout = QVBoxLayout()
+        self.tab_mapa.setLayout(layout)
+        
+        self.mapa = MapaDirecciones()
+        self.mapa.subred_activada.connect(self.ir_a_subred_del_mapa)
+        
+        self.btn_mapa_completo = QPushButton("🔭 Ver red completa")
+        self.btn_mapa_completo.clicked.connect(self.mapa.vista_completa)
+        
+        layout.addWidget(QLabel(
+            "Rueda: acercar/alejar · Click derecho: alejar · Doble click: ir a la subred"
+        ))
+        layout.addWidget(self.mapa, 1)
+        layout.addWidget(self.btn_mapa_completo)
+
     def setup_tab_historial(self):
         layout = QVBoxLayout()
         self.tab_historial.setLayout(layout)
         
         self.lista_historial = QListWidget()
         self.lista_historial.itemDoubleClicked.connect(self.cargar_desde_historial)
+        self.lista_historial.verticalScrollBar().valueChanged.connect(self.desplazamiento_historial)
         
         self.btn_limpiar_historial = QPushButton("🧹 Limpiar Historial")
         self.btn_limpiar_historial.clicked.connect(self.limpiar_historial)
         
+        self.btn_importar_inventario = QPushButton("📥 Importar inventario")
+        self.btn_importar_inventario.clicked.connect(self.importar_inventario)
+        
+        grupo_botones = QHBoxLayout()
+        grupo_botones.addWidget(self.btn_importar_inventario)
+        grupo_botones.addWidget(self.btn_limpiar_historial)
+        
         layout.addWidget(QLabel("Historial de cálculos (doble click para cargar):"))
         layout.addWidget(self.lista_historial)
-        layout.addWidget(self.btn_limpiar_historial)
+        layout.addLayout(grupo_botones)
         
         self.actualizar_lista_historial()
 
@@ -179,9 +319,19 @@ class VLSMSubnettingApp(QWidget):
         self.btn_escaneo = QPushButton("🔍 Escanear Puertos")
         self.btn_escaneo.clicked.connect(self.escanear_puertos)
         
+        self.btn_barrido = QPushButton("📡 Barrido Ping")
+        self.btn_barrido.setToolTip("Sondea todos los hosts de una subred (o de la subred calculada)")
+        self.btn_barrido.clicked.connect(self.barrido_ping)
+        
         grupo_botones_red.addWidget(self.btn_ping)
         grupo_botones_red.addWidget(self.btn_resolver)
         grupo_botones_red.addWidget(self.btn_escaneo)
+        grupo_botones_red.addWidget(self.btn_barrido)
+        
+        self.btn_dns_masivo = QPushButton("📚 DNS Masivo")
+        self.btn_dns_masivo.setToolTip("Resolución inversa de una subred o directa de una lista de nombres")
+        self.btn_dns_masivo.clicked.connect(self.resolver_masivo)
+        grupo_botones_red.addWidget(self.btn_dns_masivo)
         
         grupo_red.addWidget(self.input_herramienta)
         grupo_red.addLayout(grupo_botones_red)
@@ -196,25 +346,68 @@ class VLSMSubnettingApp(QWidget):
         self.btn_wildcard = QPushButton("🎭 Calcular Wildcard")
         self.btn_wildcard.clicked.connect(self.calcular_wildcard)
         
+        self.btn_sumarizar = QPushButton("🧩 Sumarizar rutas")
+        self.btn_sumarizar.setToolTip("Resume una lista de prefijos (o las subredes calculadas) en agregados")
+        self.btn_sumarizar.clicked.connect(self.sumarizar_rutas)
+        
+        self.btn_sumarizar_archivo = QPushButton("📂 Sumarizar archivo")
+        self.btn_sumarizar_archivo.setToolTip("Tablas de rutas grandes: el resultado se escribe en otro archivo")
+        self.btn_sumarizar_archivo.clicked.connect(self.sumarizar_archivo)
+        
+        grupo_sumarizacion = QHBoxLayout()
+        grupo_sumarizacion.addWidget(self.btn_sumarizar)
+        grupo_sumarizacion.addWidget(self.btn_sumarizar_archivo)
+        
         grupo_calculo.addWidget(self.btn_inverso)
         grupo_calculo.addWidget(self.btn_wildcard)
+        grupo_calculo.addLayout(grupo_sumarizacion)
+        
+        self.btn_espacio_libre = QPushButton("🕳️ Espacio libre y fragmentación")
+        self.btn_espacio_libre.setToolTip("Bloques sin asignar de una red (o de la red del plan actual)")
+        self.btn_espacio_libre.clicked.connect(self.espacio_libre)
+        grupo_calculo.addWidget(self.btn_espacio_libre)
         
         # Resultados de herramientas
         self.resultado_herramientas = QTextEdit()
         self.resultado_herramientas.setReadOnly(True)
         self.resultado_herramientas.setFont(QFont("Courier New", 10))
         
+        # Tabla del barrido de ping: se llena a medida que llegan respuestas
+        self.tabla_barrido = QTableWidget(0, 4)
+        self.tabla_barrido.setHorizontalHeaderLabels(["Host", "Estado", "RTT (ms)", "Método"])
+        self.tabla_barrido.horizontalHeader().setStretchLastSection(True)
+        self.tabla_barrido.verticalHeader().hide()
+        self.tabla_barrido.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.tabla_barrido.hide()
+        
         # Modo visual
         grupo_modo = QHBoxLayout()
         self.btn_modo = QPushButton("🌙 Alternar Modo Claro/Oscuro")
         self.btn_modo.clicked.connect(self.alternar_modo)
         grupo_modo.addWidget(self.btn_modo)
         
+        self.btn_tiempos = QPushButton("⏱️ Tiempos")
+        self.btn_tiempos.setToolTip("Duración, CPU, memoria y filas de las últimas acciones")
+        self.btn_tiempos.clicked.connect(self.ver_tiempos)
+        
+        self.btn_traza = QPushButton("📈 Exportar traza")
+        self.btn_traza.setToolTip("Guarda las mediciones en formato Chrome trace (chrome://tracing, Perfetto)")
+        self.btn_traza.clicked.connect(self.exportar_traza)
+        
+        self.btn_perfilar = QPushButton("🔬 Perfilar próxima acción")
+        self.btn_perfilar.setToolTip("Ejecuta la próxima acción con cProfile y guarda el perfil")
+        self.btn_perfilar.clicked.connect(self.perfilar_proxima_accion)
+        
+        grupo_modo.addWidget(self.btn_tiempos)
+        grupo_modo.addWidget(self.btn_traza)
+        grupo_modo.addWidget(self.btn_perfilar)
+        
         # Ensamblar la pestaña
         layout.addLayout(grupo_red)
         layout.addLayout(grupo_calculo)
         layout.addWidget(QLabel("📄 Resultados:"))
         layout.addWidget(self.resultado_herramientas)
+        layout.addWidget(self.tabla_barrido)
         layout.addLayout(grupo_modo)
 
     def cargar_configuracion(self):
@@ -228,9 +421,9 @@ class VLSMSubnettingApp(QWidget):
 
     def guardar_configuracion(self):
         self.settings.setValue("modo_oscuro", self.modo_oscuro)
-        self.settings.setValue("historial", json.dumps(self.historial))
         self.settings.setValue("ultima_ruta", self.ultima_ruta)
         self.settings.setValue("ultima_ip", self.input_ip.text())
+        self.settings.setValue("vista_previa", self.check_vista_previa.isChecked())
 
     def aplicar_tema(self, oscuro):
         palette = QPalette()
@@ -249,7 +442,7 @@ class VLSMSubnettingApp(QWidget):
             palette.setColor(QPalette.HighlightedText, Qt.black)
             
             estilo = """
-            QTextEdit, QListWidget {
+            QTextEdit, QListWidget, QTableView {
                 background-color: #232323;
                 color: #ffffff;
                 border: 1px solid #444;
@@ -275,7 +468,7 @@ class VLSMSubnettingApp(QWidget):
             palette.setColor(QPalette.HighlightedText, Qt.white)
             
             estilo = """
-            QTextEdit, QListWidget {
+            QTextEdit, QListWidget, QTableView {
                 background-color: #ffffff;
                 color: #000000;
                 border: 1px solid #ccc;
@@ -291,15 +484,49 @@ class VLSMSubnettingApp(QWidget):
         self.setStyleSheet(estilo)
 
     def actualizar_placeholder(self):
-        if self.combo_tipo.currentText() == "Cantidad de subredes":
+        if self.combo_tipo.currentText() == MODO_SUBREDES:
             self.input_cantidad.setPlaceholderText("Ej: 5 (número de subredes necesarias)")
+        elif self.combo_tipo.currentText() == MODO_VLSM:
+            self.input_cantidad.setPlaceholderText("Ej: LAN-A:50, LAN-B:20, WAN:2 (nombre:hosts)")
         else:
             self.input_cantidad.setPlaceholderText("Ej: 30 (hosts por subred)")
 
+    def programar_vista_previa(self):
+        if not self.cargando_entradas:
+            self.temporizador_vista_previa.start()
+
+    def vista_previa(self):
+        if not self.validar_ip() or not self.check_vista_previa.isChecked():
+            return
+        valor = self.input_cantidad.text().strip()
+        if not valor or self.tarea_actual is not None:
+            return
+        modo = self.combo_tipo.currentText()
+        try:
+            if modo == MODO_VLSM:
+                requisitos = parsear_requisitos(valor)
+                if len(requisitos) > MAX_REQUISITOS_VISTA_PREVIA:
+                    total = sum(hosts for _, hosts in requisitos)
+                    self.actualizar_status(
+                        f"Vista previa: {len(requisitos)} requisitos, {total} hosts (pulsa Calcular)"
+                    )
+                    return
+            # Subdivisión fija: O(1) aunque la red padre sea enorme
+            plan = planificar_en_cache(self.input_ip.text().strip(), modo, valor)
+        except ErrorPlan as e:
+            self.actualizar_status(f"Vista previa: {e}")
+            return
+        if plan is self.plan_actual:
+            # Ya está en pantalla (calculado o cargado): se conserva su encabezado
+            return
+        texto = f"👁️ Vista previa de {plan.cidr}: {resumen_corto(plan)}"
+        self.mostrar_plan(plan, texto, al_principio=False)
+        self.actualizar_status("Vista previa actualizada (pulsa Calcular para guardarla)")
+
     def validar_ip(self):
         texto = self.input_ip.text()
         try:
-            ipaddress.IPv4Network(texto, strict=False)
+            ipaddress.ip_network(texto.strip(), strict=False)
             self.input_ip.setStyleSheet("background-color: #c8f7c5;")
             return True
         except ValueError:
@@ -319,106 +546,145 @@ class VLSMSubnettingApp(QWidget):
             self.mostrar_error("❌ Por favor, ingresa un valor para el cálculo.")
             return
 
-        try:
-            cantidad = int(cantidad)
-            if cantidad <= 0:
-                raise ValueError
-        except ValueError:
-            self.mostrar_error("❌ La cantidad debe ser un número entero positivo.")
-            return
+        if modo != MODO_VLSM:
+            try:
+                cantidad = int(cantidad)
+                if cantidad <= 0:
+                    raise ValueError
+            except ValueError:
+                self.mostrar_error("❌ La cantidad debe ser un número entero positivo.")
+                return
 
-        try:
-            red = ipaddress.IPv4Network(red_cidr, strict=False)
-        except ValueError as e:
-            self.mostrar_error(f"❌ Error en la red: {str(e)}")
-            return
+        self.ejecutar_tarea(
+            self._trabajo_planificar, red_cidr, modo, cantidad,
+            descripcion=f"Calculando {red_cidr}",
+            al_terminar=lambda plan: self.plan_calculado(plan, modo, cantidad),
+            al_error=lambda mensaje: self.mostrar_error(f"❌ {mensaje}")
+        )
+
+    def _trabajo_planificar(self, tarea, red_cidr, modo, cantidad):
+        # Se ejecuta en un hilo de trabajo: no debe tocar widgets
+        return planificar_en_cache(red_cidr, modo, cantidad)
 
+    def plan_calculado(self, plan, modo, cantidad):
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        texto_resultado = f"📡 Subnetting de la red {red} ({timestamp}):\n\n"
 
         try:
-            if modo == "Cantidad de subredes":
-                if cantidad > (2 ** (30 - red.prefixlen)):
-                    self.mostrar_error(f"❌ No se pueden crear {cantidad} subredes con una red /{red.prefixlen}.")
-                    return
-
-                bits_necesarios = (cantidad - 1).bit_length()
-                nuevo_prefijo = red.prefixlen + bits_necesarios
+            texto_resultado = encabezado_plan(plan, timestamp)
 
-                if nuevo_prefijo > 30:
-                    self.mostrar_error("❌ No hay suficientes direcciones para crear tantas subredes.")
-                    return
-
-                subredes = list(red.subnets(new_prefix=nuevo_prefijo))
-                texto_resultado += f"➡️ Subdivisión en {len(subredes)} subredes (/{nuevo_prefijo}):\n\n"
-
-                for i, subred in enumerate(subredes[:cantidad]):
-                    texto_resultado += self.info_subred(i + 1, subred)
-
-            elif modo == "Cantidad de hosts por subred":
-                if cantidad > (2 ** (32 - red.prefixlen - 1) - 2):
-                    self.mostrar_error(f"❌ No se pueden crear subredes con {cantidad} hosts en una red /{red.prefixlen}.")
-                    return
-
-                bits_necesarios = (cantidad + 2 - 1).bit_length()
-                nuevo_prefijo = 32 - bits_necesarios
-
-                if nuevo_prefijo < red.prefixlen:
-                    self.mostrar_error("❌ No hay suficiente espacio en la red original para subredes de ese tamaño.")
-                    return
-
-                subredes = list(red.subnets(new_prefix=nuevo_prefijo))
-                texto_resultado += f"➡️ Subredes con al menos {cantidad} hosts (/{nuevo_prefijo}):\n\n"
-
-                for i, subred in enumerate(subredes):
-                    texto_resultado += self.info_subred(i + 1, subred)
+            # Comprobar contra lo ya asignado antes de guardar
+            conflictos = self.indice_ipam.conflictos_plan(plan)
+            if conflictos:
+                texto_resultado += (
+                    f"⚠️ Solapa con {len(conflictos)} asignaciones guardadas:\n"
+                    f"{texto_conflictos(conflictos, plan.ancho)}\n"
+                )
 
-            self.resultado.setPlainText(texto_resultado)
-            self.subredes_actuales = subredes
-            self.calculo_actual = texto_resultado
+            self.mostrar_plan(plan, texto_resultado)
 
             # Guardar en historial
             entrada_historial = {
                 "fecha": timestamp,
-                "red": str(red),
+                "red": plan.cidr,
                 "modo": modo,
                 "valor": cantidad,
-                "resultado": texto_resultado
             }
-            self.historial.append(entrada_historial)
-            self.actualizar_lista_historial()
+            with self.registro.medir(f"Guardar en historial {plan.cidr}", filas=len(plan)):
+                entrada_historial["id"] = self.historial.agregar(
+                    subredes=len(plan), resumen=texto_resultado, rangos=rangos_plan(plan),
+                    ancho=plan.ancho, **entrada_historial
+                )
+                self.indice_ipam.agregar_plan(etiqueta_calculo(entrada_historial["id"], plan.cidr), plan)
+            self.agregar_item_historial(entrada_historial, al_principio=True)
             self.guardar_configuracion()
 
-            self.actualizar_status(f"Cálculo completado para {red}")
+            if conflictos:
+                self.actualizar_status(f"Cálculo completado para {plan.cidr} ({len(conflictos)} solapamientos)")
+            else:
+                self.actualizar_status(f"Cálculo completado para {plan.cidr}")
 
         except Exception as e:
             self.mostrar_error(f"❌ Error inesperado: {str(e)}")
 
-    def info_subred(self, numero, subred):
+    def mostrar_plan(self, plan, resumen, al_principio=True):
+        self.plan_actual = plan
+        self.resumen.setText(resumen.strip())
+        if plan is self.modelo_resultado.plan:
+            # Ya estaba en pantalla (p. ej. por la vista previa): nada que redibujar
+            return
+        # Solo se repintan las filas que cambian respecto al plan anterior
+        self.modelo_resultado.actualizar_plan(plan)
+        self.mapa.establecer_plan(plan)
+        self.resultado.resizeColumnsToContents()
+        if al_principio:
+            self.resultado.scrollToTop()
+
+    def limpiar_resultado(self):
+        self.plan_actual = None
+        self.resumen.clear()
+        self.modelo_resultado.limpiar()
+        self.mapa.establecer_plan(None)
+
+    def ir_a_subred(self):
+        if not self.plan_actual:
+            return
+        plan = self.plan_actual
+        texto = self.input_ir_fila.text().strip()
         try:
-            first_ip = subred.network_address + 1
-            last_ip = subred.broadcast_address - 1
-            num_hosts = subred.num_addresses - 2
-        except Exception:
-            first_ip = last_ip = "N/A"
-            num_hosts = "N/A"
-
-        texto = (
-            f"Subred {numero}:\n"
-            f"  ➤ Dirección de red: {subred.network_address}\n"
-            f"  ➤ Broadcast: {subred.broadcast_address}\n"
-            f"  ➤ Rango de IPs: {first_ip} - {last_ip}\n"
-            f"  ➤ Hosts disponibles: {num_hosts}\n"
-            f"  ➤ Máscara: {subred.netmask} (/{subred.prefixlen})\n"
-            f"  ➤ Wildcard: {subred.hostmask}\n\n"
-        )
-        return texto
+            if texto.isdigit():
+                fila = int(texto) - 1
+                if not 0 <= fila < len(plan):
+                    raise ErrorPlan(f"El plan tiene {len(plan)} subredes.")
+            else:
+                ip, ancho = parsear_ip(texto)
+                fila = plan.indice_de(ip) if ancho == plan.ancho else None
+                if fila is None:
+                    raise ErrorPlan(f"{texto} no pertenece a ninguna subred del plan.")
+        except ErrorPlan as e:
+            # Sin mostrar_error: el resultado actual debe seguir en pantalla
+            QMessageBox.warning(self, "Buscar subred", f"❌ {e}")
+            return
+
+        red, prefijo = plan[fila]
+        self.actualizar_status(
+            f"{plan.etiqueta(fila)} (#{fila + 1}): {int_a_ip(red, plan.ancho)}/{prefijo}"
+        )
+        if fila >= self.modelo_resultado.total_filas():
+            # Más allá de las filas que Qt puede mostrar: solo se informa
+            return
+        self.modelo_resultado.cargar_hasta(fila + 1)
+        indice = self.modelo_resultado.index(fila, 0)
+        self.resultado.scrollTo(indice, QTableView.PositionAtTop)
+        self.resultado.selectRow(fila)
+
+    def ir_a_subred_del_mapa(self, indice):
+        self.input_ir_fila.setText(str(indice + 1))
+        self.tabs.setCurrentWidget(self.tab_calculo)
+        self.ir_a_subred()
 
     def exportar_pdf(self):
-        if not self.calculo_actual:
+        if not self.plan_actual:
             self.mostrar_error("❌ No hay resultados para exportar.")
             return
 
+        from exportadores import MAX_FILAS_PDF
+
+        total = len(self.plan_actual)
+        pregunta = f"¿Incluir la tabla con las {total} subredes?\n"
+        if total > MAX_FILAS_PDF:
+            # Todas las páginas quedan en memoria hasta guardar el PDF
+            pregunta = (f"¿Incluir la tabla con las primeras {MAX_FILAS_PDF} de {total} subredes?\n"
+                        "Para la tabla completa exporta a Excel.\n")
+        respuesta = QMessageBox.question(
+            self,
+            "Exportar PDF",
+            pregunta + "Elige «No» para exportar solo el resumen.",
+            QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel
+        )
+        if respuesta == QMessageBox.Cancel:
+            return
+        solo_resumen = respuesta == QMessageBox.No
+
         ruta, _ = QFileDialog.getSaveFileName(
             self, 
             "Guardar PDF", 
@@ -429,65 +695,31 @@ class VLSMSubnettingApp(QWidget):
         if not ruta:
             return
 
-        try:
-            # Actualizar última ruta
-            self.ultima_ruta = os.path.dirname(ruta)
-            self.guardar_configuracion()
+        # Actualizar última ruta
+        self.ultima_ruta = os.path.dirname(ruta)
+        self.guardar_configuracion()
 
-            # Crear documento PDF profesional
-            doc = SimpleDocTemplate(ruta, pagesize=letter)
-            styles = getSampleStyleSheet()
-            
-            # Estilo personalizado para el título
-            titulo_style = ParagraphStyle(
-                'Titulo',
-                parent=styles['Heading1'],
-                fontSize=14,
-                leading=18,
-                spaceAfter=12,
-                alignment=1  # Centrado
-            )
-            
-            # Estilo para contenido
-            contenido_style = ParagraphStyle(
-                'Contenido',
-                parent=styles['Normal'],
-                fontName='Courier',
-                fontSize=10,
-                leading=12
-            )
-            
-            # Contenido del PDF
-            contenido = []
-            
-            # Título
-            titulo = Paragraph("Reporte de Subnetting VLSM", titulo_style)
-            contenido.append(titulo)
-            contenido.append(Spacer(1, 12))
-            
-            # Fecha
-            fecha = Paragraph(f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal'])
-            contenido.append(fecha)
-            contenido.append(Spacer(1, 12))
-            
-            # Agregar cada línea del resultado
-            for linea in self.calculo_actual.split('\n'):
-                if linea.strip():
-                    p = Paragraph(linea.replace(' ', '&nbsp;'), contenido_style)
-                    contenido.append(p)
-                    contenido.append(Spacer(1, 6))
-            
-            # Generar PDF
-            doc.build(contenido)
-            
-            self.actualizar_status(f"PDF exportado correctamente a {ruta}")
-            QMessageBox.information(self, "Éxito", "✅ Reporte PDF generado correctamente.")
-            
-        except Exception as e:
-            self.mostrar_error(f"❌ Error al exportar PDF: {str(e)}")
+        self.ejecutar_tarea(
+            self._trabajo_pdf, ruta, self.plan_actual, solo_resumen,
+            descripcion="Exportando PDF",
+            al_terminar=lambda _: self.exportacion_terminada(
+                f"PDF exportado correctamente a {ruta}", "✅ Reporte PDF generado correctamente."
+            ),
+            al_error=lambda mensaje: self.mostrar_error(f"❌ Error al exportar PDF: {mensaje}")
+        )
+
+    def _trabajo_pdf(self, tarea, ruta, plan, solo_resumen):
+        # Tabla dibujada página a página sobre el canvas, sin flowables por línea
+        def progreso(hechos, total):
+            tarea.informar(hechos, total, "Guardando PDF" if hechos >= total else "Generando PDF")
+
+        from exportadores import exportar_pdf
+
+        fecha = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        return exportar_pdf(ruta, plan, fecha, al_progreso=progreso, solo_resumen=solo_resumen)
 
     def exportar_excel(self):
-        if not hasattr(self, 'subredes_actuales') or not self.subredes_actuales:
+        if not self.plan_actual:
             self.mostrar_error("❌ No hay subredes calculadas para exportar.")
             return
 
@@ -501,122 +733,85 @@ class VLSMSubnettingApp(QWidget):
         if not ruta:
             return
 
-        try:
-            # Actualizar última ruta
-            self.ultima_ruta = os.path.dirname(ruta)
-            self.guardar_configuracion()
+        # Actualizar última ruta
+        self.ultima_ruta = os.path.dirname(ruta)
+        self.guardar_configuracion()
 
-            # Crear libro de Excel
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "Subnetting VLSM"
-            
-            # Estilos
-            header_font = Font(bold=True, color="FFFFFF")
-            header_fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
-            border = Border(left=Side(style='thin'), right=Side(style='thin'), 
-                          top=Side(style='thin'), bottom=Side(style='thin'))
-            center_alignment = Alignment(horizontal='center')
-            
-            # Encabezados
-            encabezados = [
-                "Subred", "Dirección de Red", "Primera IP", "Última IP", 
-                "Broadcast", "Hosts", "Máscara", "Prefijo", "Wildcard"
-            ]
-            
-            for col_num, encabezado in enumerate(encabezados, 1):
-                celda = ws.cell(row=1, column=col_num, value=encabezado)
-                celda.font = header_font
-                celda.fill = header_fill
-                celda.border = border
-                celda.alignment = center_alignment
-            
-            # Datos
-            for row_num, subred in enumerate(self.subredes_actuales, 2):
-                first_ip = subred.network_address + 1
-                last_ip = subred.broadcast_address - 1
-                num_hosts = subred.num_addresses - 2
-                
-                datos = [
-                    f"Subred {row_num-1}",
-                    str(subred.network_address),
-                    str(first_ip),
-                    str(last_ip),
-                    str(subred.broadcast_address),
-                    num_hosts,
-                    str(subred.netmask),
-                    f"/{subred.prefixlen}",
-                    str(subred.hostmask)
-                ]
-                
-                for col_num, dato in enumerate(datos, 1):
-                    celda = ws.cell(row=row_num, column=col_num, value=dato)
-                    celda.border = border
-                    if col_num in (2, 3, 4, 5):  # Alinear direcciones IP al centro
-                        celda.alignment = center_alignment
-            
-            # Ajustar ancho de columnas
-            for col in ws.columns:
-                max_length = 0
-                column = col[0].column_letter
-                for cell in col:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = (max_length + 2) * 1.2
-                ws.column_dimensions[column].width = adjusted_width
-            
-            # Guardar archivo
-            wb.save(ruta)
-            
-            self.actualizar_status(f"Excel exportado correctamente a {ruta}")
-            QMessageBox.information(self, "Éxito", "✅ Archivo Excel generado correctamente.")
-            
-        except Exception as e:
-            self.mostrar_error(f"❌ Error al exportar a Excel: {str(e)}")
+        self.ejecutar_tarea(
+            self._trabajo_excel, ruta, self.plan_actual,
+            descripcion="Exportando Excel",
+            al_terminar=lambda hojas: self.exportacion_terminada(
+                f"Excel exportado correctamente a {ruta}",
+                "✅ Archivo Excel generado correctamente."
+                + (f"\nEl plan supera el límite de filas de Excel y se dividió en {hojas} hojas." if hojas > 1 else "")
+            ),
+            al_error=lambda mensaje: self.mostrar_error(f"❌ Error al exportar a Excel: {mensaje}")
+        )
+
+    def _trabajo_excel(self, tarea, ruta, plan):
+        # Escritura en streaming: el libro nunca se carga completo en memoria
+        from exportadores import exportar_excel
+
+        def progreso(hechos, total):
+            tarea.informar(hechos, total, "Guardando Excel" if hechos >= total else "Exportando Excel")
+
+        return exportar_excel(ruta, plan, al_progreso=progreso)
+
+    def clasificar_ips(self):
+        if not self.plan_actual:
+            self.mostrar_error("❌ Realiza un cálculo de subredes primero.")
+            return
+
+        entrada, _ = QFileDialog.getOpenFileName(
+            self, "Archivo de IPs (una por línea)", self.ultima_ruta or "",
+            "Texto o CSV (*.txt *.csv *.log);;Todos los archivos (*)"
+        )
+        if not entrada:
+            return
+        salida, _ = QFileDialog.getSaveFileName(
+            self, "Guardar conteos por subred", self.ultima_ruta or "", "CSV (*.csv)"
+        )
+        if not salida:
+            return
+
+        self.ultima_ruta = os.path.dirname(salida)
+        self.guardar_configuracion()
+
+        self.ejecutar_tarea(
+            self._trabajo_clasificar, entrada, salida, self.plan_actual,
+            descripcion="Clasificando IPs",
+            al_terminar=lambda r: self.exportacion_terminada(
+                f"Conteos guardados en {salida}",
+                f"✅ {r.lineas - r.no_validas} IPs clasificadas "
+                f"({r.sin_subred} fuera del plan, {r.no_validas} líneas no válidas)."
+            ),
+            al_error=lambda mensaje: self.mostrar_error(f"❌ Error al clasificar: {mensaje}")
+        )
+
+    def _trabajo_clasificar(self, tarea, entrada, salida, plan):
+        # El archivo se lee por bloques: el tamaño de la entrada no limita la memoria
+        from clasificador_ip import TablaPrefijos, clasificar, escribir_conteos
+
+        total = os.path.getsize(entrada)
+        tabla = TablaPrefijos([plan])
+        with open(entrada, "rb") as archivo:
+            resultado = clasificar(
+                archivo, tabla,
+                al_progreso=lambda leidos: tarea.informar(leidos, total, "Clasificando IPs")
+            )
+        with open(salida, "w", newline="", encoding="utf-8") as flujo:
+            escribir_conteos(flujo, resultado)
+        return resultado
+
+    def exportacion_terminada(self, estado, mensaje):
+        self.actualizar_status(estado)
+        QMessageBox.information(self, "Éxito", mensaje)
 
     def ver_grafico(self):
-        if not hasattr(self, 'subredes_actuales') or not self.subredes_actuales:
+        if not self.plan_actual:
             self.mostrar_error("❌ Realiza un cálculo de subredes primero.")
             return
-        
-        try:
-            # Preparar datos
-            subredes = self.subredes_actuales[:20]  # Limitar para visualización
-            nombres = [f"Subred {i+1}" for i in range(len(subredes))]
-            hosts = [subred.num_addresses - 2 for subred in subredes]
-            rangos = [f"{subred.network_address + 1}\n-\n{subred.broadcast_address - 1}" 
-                     for subred in subredes]
-            
-            # Crear figura
-            plt.figure(figsize=(12, 7))
-            
-            # Gráfico de barras
-            bars = plt.bar(nombres, hosts, color='skyblue')
-            
-            # Añadir etiquetas y título
-            plt.xlabel("Subredes")
-            plt.ylabel("Número de Hosts")
-            plt.title("Distribución de Hosts por Subred")
-            plt.xticks(rotation=45, ha='right')
-            
-            # Añadir información adicional en las barras
-            for bar, rango in zip(bars, rangos):
-                height = bar.get_height()
-                plt.text(bar.get_x() + bar.get_width()/2., height,
-                         rango,
-                         ha='center', va='bottom', rotation=0, fontsize=8)
-            
-            # Ajustar layout
-            plt.tight_layout()
-            
-            # Mostrar gráfico
-            plt.show()
-            
-        except Exception as e:
-            self.mostrar_error(f"❌ Error al generar gráfico: {str(e)}")
+        self.tabs.setCurrentWidget(self.tab_mapa)
 
     def ping_ip(self):
         objetivo = self.input_herramienta.text().strip()
@@ -627,28 +822,44 @@ class VLSMSubnettingApp(QWidget):
         try:
             # Validar que sea una IP válida
             ipaddress.IPv4Address(objetivo)
-            
-            self.resultado_herramientas.setPlainText(f"🔍 Realizando ping a {objetivo}...")
-            QApplication.processEvents()  # Actualizar la interfaz
-            
-            comando = ['ping', '-n' if platform.system() == 'Windows' else '-c', '4', objetivo]
-            
-            try:
-                output = subprocess.check_output(
-                    comando, 
-                    stderr=subprocess.STDOUT, 
-                    universal_newlines=True,
-                    timeout=10
-                )
-                self.resultado_herramientas.setPlainText(f"📶 Resultado Ping a {objetivo}:\n{output}")
-                self.actualizar_status(f"Ping completado a {objetivo}")
-            except subprocess.TimeoutExpired:
-                self.resultado_herramientas.setPlainText(f"⏳ Tiempo de espera agotado para {objetivo}")
-            except subprocess.CalledProcessError as e:
-                self.resultado_herramientas.setPlainText(f"❌ Error en ping a {objetivo}:\n{e.output}")
-        
         except ValueError:
             self.mostrar_error(f"❌ {objetivo} no es una dirección IPv4 válida.", herramienta=True)
+            return
+        
+        self.resultado_herramientas.setPlainText(f"🔍 Realizando ping a {objetivo}...")
+        self.ejecutar_tarea(
+            self._trabajo_ping, objetivo,
+            descripcion=f"Ping a {objetivo}",
+            al_terminar=self.herramienta_terminada,
+            al_error=lambda mensaje: self.mostrar_error(f"❌ {mensaje}", herramienta=True)
+        )
+
+    def _trabajo_ping(self, tarea, objetivo):
+        comando = ['ping', '-n' if platform.system() == 'Windows' else '-c', '4', objetivo]
+        proceso = subprocess.Popen(
+            comando, 
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT, 
+            universal_newlines=True
+        )
+        limite = time.monotonic() + 10
+        try:
+            while True:
+                try:
+                    output, _ = proceso.communicate(timeout=0.2)
+                    break
+                except subprocess.TimeoutExpired:
+                    tarea.comprobar()
+                    if time.monotonic() > limite:
+                        return f"⏳ Tiempo de espera agotado para {objetivo}", None
+        finally:
+            if proceso.poll() is None:
+                proceso.kill()
+                proceso.communicate()
+        
+        if proceso.returncode != 0:
+            return f"❌ Error en ping a {objetivo}:\n{output}", None
+        return f"📶 Resultado Ping a {objetivo}:\n{output}", f"Ping completado a {objetivo}"
 
     def resolver_ip(self):
         objetivo = self.input_herramienta.text().strip()
@@ -656,38 +867,47 @@ class VLSMSubnettingApp(QWidget):
             self.mostrar_error("❌ Ingresa un dominio o IP para resolver.", herramienta=True)
             return
         
+        self.resultado_herramientas.setPlainText(f"🔍 Resolviendo {objetivo}...")
+        self.ejecutar_tarea(
+            self._trabajo_resolver, objetivo,
+            descripcion=f"Resolviendo {objetivo}",
+            al_terminar=self.herramienta_terminada,
+            al_error=lambda mensaje: self.mostrar_error(f"❌ {mensaje}", herramienta=True)
+        )
+
+    def _trabajo_resolver(self, tarea, objetivo):
+        # Intentar resolver como dominio
         try:
-            self.resultado_herramientas.setPlainText(f"🔍 Resolviendo {objetivo}...")
-            QApplication.processEvents()  # Actualizar la interfaz
+            ip = socket.gethostbyname(objetivo)
+            lineas = [f"🔍 Resolviendo {objetivo}...", f"🌐 {objetivo} resuelto a: {ip}"]
             
-            # Intentar resolver como dominio
+            # Intentar resolver nombre si se ingresó una IP
             try:
-                ip = socket.gethostbyname(objetivo)
-                self.resultado_herramientas.append(f"🌐 {objetivo} resuelto a: {ip}")
-                
-                # Intentar resolver nombre si se ingresó una IP
-                try:
-                    nombre, _, _ = socket.gethostbyaddr(objetivo)
-                    self.resultado_herramientas.append(f"🏷️ Nombre asociado: {nombre}")
-                except:
-                    pass
-                
-                self.actualizar_status(f"Resolución DNS completada para {objetivo}")
+                nombre, _, _ = socket.gethostbyaddr(objetivo)
+                lineas.append(f"🏷️ Nombre asociado: {nombre}")
+            except:
+                pass
             
-            except socket.gaierror:
-                # Si falla, intentar como IP
-                try:
-                    ip_obj = ipaddress.IPv4Address(objetivo)
-                    try:
-                        nombre, _, _ = socket.gethostbyaddr(str(ip_obj))
-                        self.resultado_herramientas.setPlainText(f"🏷️ {ip_obj} corresponde a: {nombre}")
-                    except socket.herror:
-                        self.resultado_herramientas.setPlainText(f"ℹ️ {ip_obj} es una IP válida pero no tiene nombre asociado")
-                except ValueError:
-                    self.mostrar_error(f"❌ No se pudo resolver {objetivo} como dominio ni como IP.", herramienta=True)
+            return "\n".join(lineas), f"Resolución DNS completada para {objetivo}"
         
-        except Exception as e:
-            self.mostrar_error(f"❌ Error al resolver: {str(e)}", herramienta=True)
+        except socket.gaierror:
+            tarea.comprobar()
+            # Si falla, intentar como IP
+            try:
+                ip_obj = ipaddress.IPv4Address(objetivo)
+            except ValueError:
+                raise ValueError(f"No se pudo resolver {objetivo} como dominio ni como IP.") from None
+            try:
+                nombre, _, _ = socket.gethostbyaddr(str(ip_obj))
+                return f"🏷️ {ip_obj} corresponde a: {nombre}", None
+            except socket.herror:
+                return f"ℹ️ {ip_obj} es una IP válida pero no tiene nombre asociado", None
+
+    def herramienta_terminada(self, resultado):
+        texto, estado = resultado
+        self.resultado_herramientas.setPlainText(texto)
+        if estado:
+            self.actualizar_status(estado)
 
     def escanear_puertos(self):
         objetivo = self.input_herramienta.text().strip()
@@ -695,10 +915,13 @@ class VLSMSubnettingApp(QWidget):
             self.mostrar_error("❌ Ingresa una dirección IP para escanear.", herramienta=True)
             return
         
+        # Se admiten varias IPs o una subred completa (ej: 192.168.1.0/28)
+        from herramientas_red import expandir_hosts
+
         try:
-            ipaddress.IPv4Address(objetivo)
-        except ValueError:
-            self.mostrar_error(f"❌ {objetivo} no es una dirección IPv4 válida.", herramienta=True)
+            hosts = expandir_hosts(objetivo)
+        except ValueError as e:
+            self.mostrar_error(f"❌ {objetivo} no es un objetivo válido: {str(e)}", herramienta=True)
             return
         
         # Pedir rango de puertos
@@ -714,77 +937,227 @@ class VLSMSubnettingApp(QWidget):
         if not ok:
             return
         
-        self.resultado_herramientas.setPlainText(f"🔍 Escaneando puertos {inicio}-{fin} en {objetivo}...")
-        QApplication.processEvents()  # Actualizar la interfaz
-        
-        puertos_abiertos = []
+        self.resultado_herramientas.setPlainText(
+            f"🔍 Escaneando puertos {inicio}-{fin} en {objetivo} ({len(hosts)} hosts)..."
+        )
+        self.ejecutar_tarea(
+            self._trabajo_escaneo, hosts, inicio, fin,
+            descripcion=f"Escaneando {objetivo}",
+            al_parcial=self.resultado_herramientas.append,
+            al_terminar=lambda abiertos: self.escaneo_terminado(objetivo, inicio, fin, abiertos),
+            al_error=lambda mensaje: self.mostrar_error(f"❌ {mensaje}", herramienta=True)
+        )
+
+    def _trabajo_escaneo(self, tarea, hosts, inicio, fin):
+        from herramientas_red import escanear_puertos as escanear_puertos_red
+
+        def al_abierto(r):
+            tarea.publicar(f"✅ {r.host} puerto {r.puerto} ({r.servicio}) abierto - {r.latencia * 1000:.1f} ms")
         
-        for puerto in range(inicio, fin + 1):
-            try:
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                    s.settimeout(0.5)
-                    resultado = s.connect_ex((objetivo, puerto))
-                    if resultado == 0:
-                        puertos_abiertos.append(puerto)
-                        servicio = socket.getservbyport(puerto, 'tcp') if puerto <= 1024 else "?"
-                        self.resultado_herramientas.append(f"✅ Puerto {puerto} ({servicio}) abierto")
-                    else:
-                        self.resultado_herramientas.append(f"❌ Puerto {puerto} cerrado")
-                    QApplication.processEvents()
-            except Exception as e:
-                self.resultado_herramientas.append(f"⚠️ Error en puerto {puerto}: {str(e)}")
-                continue
+        def al_progreso(hechas, total):
+            tarea.informar(hechas, total, "Escaneando puertos")
         
+        return escanear_puertos_red(
+            hosts, range(inicio, fin + 1), al_abierto=al_abierto, al_progreso=al_progreso
+        )
+
+    def escaneo_terminado(self, objetivo, inicio, fin, puertos_abiertos):
         if puertos_abiertos:
             self.resultado_herramientas.append("\n📌 Resumen de puertos abiertos:")
-            for puerto in puertos_abiertos:
-                servicio = socket.getservbyport(puerto, 'tcp') if puerto <= 1024 else "?"
-                self.resultado_herramientas.append(f"  - {puerto} ({servicio})")
+            for r in puertos_abiertos:
+                self.resultado_herramientas.append(f"  - {r.host}:{r.puerto} ({r.servicio})")
+        else:
+            self.resultado_herramientas.append("\nℹ️ No se encontraron puertos abiertos.")
         
         self.actualizar_status(f"Escaneo completado para {objetivo} (puertos {inicio}-{fin})")
 
+    def hosts_del_plan(self, titulo):
+        # Sin objetivo escrito: elegir una subred del plan calculado (0 = todo el plan)
+        if not self.plan_actual:
+            self.mostrar_error("❌ Ingresa una IP o subred, o calcula un plan primero.", herramienta=True)
+            return None, None
+        # getInt no admite más de 2^31-1 subredes (planes IPv6): se pide texto
+        total = len(self.plan_actual)
+        texto, ok = QInputDialog.getText(
+            self, titulo, f"Subred # del plan actual (1-{total}, 0 = todas):", text="1"
+        )
+        if not ok:
+            return None, None
+        try:
+            numero = int(texto.strip())
+        except ValueError:
+            numero = -1
+        if not 0 <= numero <= total:
+            self.mostrar_error(f"❌ Indica un número de subred entre 0 y {total}.", herramienta=True)
+            return None, None
+        from herramientas_red import hosts_de_plan
+
+        try:
+            hosts = hosts_de_plan(self.plan_actual, numero - 1 if numero else None)
+        except ValueError as e:
+            self.mostrar_error(f"❌ {str(e)}", herramienta=True)
+            return None, None
+        return hosts, (f"subred {numero}" if numero else "todo el plan")
+
+    def barrido_ping(self):
+        objetivo = self.input_herramienta.text().strip()
+        if objetivo:
+            from herramientas_red import expandir_hosts
+
+            try:
+                hosts = expandir_hosts(objetivo)
+            except ValueError as e:
+                self.mostrar_error(f"❌ Objetivo no válido: {str(e)}", herramienta=True)
+                return
+        else:
+            hosts, objetivo = self.hosts_del_plan("Barrido Ping")
+            if hosts is None:
+                return
+        
+        self.resultado_herramientas.setPlainText(f"📡 Barrido de ping en {objetivo} ({len(hosts)} hosts)...")
+        self.tabla_barrido.setRowCount(0)
+        self.tabla_barrido.show()
+        self.ejecutar_tarea(
+            self._trabajo_barrido, hosts,
+            descripcion=f"Barrido de ping en {objetivo}",
+            al_parcial=self.agregar_fila_barrido,
+            al_terminar=lambda resultados: self.barrido_terminado(objetivo, resultados),
+            al_error=lambda mensaje: self.mostrar_error(f"❌ {mensaje}", herramienta=True)
+        )
+
+    def _trabajo_barrido(self, tarea, hosts):
+        from herramientas_red import barrido_ping as barrido_ping_red
+
+        return barrido_ping_red(
+            hosts,
+            al_resultado=tarea.publicar,
+            al_progreso=lambda hechos, total: tarea.informar(hechos, total, "Barrido de ping")
+        )
+
+    def agregar_fila_barrido(self, r):
+        fila = self.tabla_barrido.rowCount()
+        self.tabla_barrido.insertRow(fila)
+        rtt = f"{r.rtt * 1000:.1f}" if r.vivo else "-"
+        for columna, valor in enumerate((r.host, "✅ Vivo" if r.vivo else "❌ Sin respuesta", rtt, r.metodo)):
+            self.tabla_barrido.setItem(fila, columna, QTableWidgetItem(valor))
+
+    def barrido_terminado(self, objetivo, resultados):
+        vivos = sum(1 for r in resultados if r.vivo)
+        self.resultado_herramientas.append(f"📌 {vivos} de {len(resultados)} hosts respondieron.")
+        # Las filas llegaron en orden de respuesta; se muestran ordenadas por IP
+        self.tabla_barrido.setUpdatesEnabled(False)
+        self.tabla_barrido.setRowCount(0)
+        for r in resultados:
+            self.agregar_fila_barrido(r)
+        self.tabla_barrido.setUpdatesEnabled(True)
+        self.actualizar_status(f"Barrido de ping completado para {objetivo}")
+
+    def resolver_masivo(self):
+        objetivo = self.input_herramienta.text().strip()
+        inverso = True
+        if objetivo:
+            from herramientas_red import expandir_hosts
+
+            try:
+                consultas = expandir_hosts(objetivo)
+            except ValueError:
+                # No son IPs ni subredes: resolver como lista de nombres
+                consultas = objetivo.replace(",", " ").split()
+                inverso = False
+        else:
+            consultas, objetivo = self.hosts_del_plan("DNS Masivo")
+            if consultas is None:
+                return
+        
+        tipo = "inversa (PTR)" if inverso else "directa"
+        self.resultado_herramientas.setPlainText(
+            f"🔎 Resolución {tipo} de {len(consultas)} consultas en {objetivo}..."
+        )
+        self.ejecutar_tarea(
+            self._trabajo_dns_masivo, consultas, inverso,
+            descripcion=f"Resolución DNS de {objetivo}",
+            al_parcial=self.resultado_herramientas.append,
+            al_terminar=lambda resultados: self.dns_masivo_terminado(objetivo, resultados),
+            al_error=lambda mensaje: self.mostrar_error(f"❌ Error al resolver: {mensaje}", herramienta=True)
+        )
+
+    def _trabajo_dns_masivo(self, tarea, consultas, inverso):
+        def al_resultado(r):
+            if r.error is None:
+                respuesta = r.respuesta if inverso else ", ".join(r.respuesta)
+                tarea.publicar(f"🏷️ {r.consulta} → {respuesta}")
+        
+        return self.obtener_resolutor_dns().resolver_masivo(
+            consultas, inverso,
+            al_resultado=al_resultado,
+            al_progreso=lambda hechos, total: tarea.informar(hechos, total, "Resolviendo DNS")
+        )
+
+    def obtener_resolutor_dns(self):
+        # Se conserva entre consultas para reutilizar su caché
+        if self.resolutor_dns is None:
+            from herramientas_red import ResolutorDNS
+            self.resolutor_dns = ResolutorDNS()
+        return self.resolutor_dns
+
+    def dns_masivo_terminado(self, objetivo, resultados):
+        # Reescribir en el orden de la consulta, con los que no resolvieron al final
+        resueltos = [r for r in resultados if r.error is None]
+        lineas = [f"🔎 {len(resueltos)} de {len(resultados)} consultas resueltas en {objetivo}:\n"]
+        for r in resueltos:
+            respuesta = r.respuesta if isinstance(r.respuesta, str) else ", ".join(r.respuesta)
+            lineas.append(f"🏷️ {r.consulta} → {respuesta}")
+        sin_nombre = len(resultados) - len(resueltos)
+        if sin_nombre:
+            lineas.append(f"\nℹ️ {sin_nombre} consultas sin respuesta")
+        self.resultado_herramientas.setPlainText("\n".join(lineas))
+        self.actualizar_status(f"Resolución DNS completada para {objetivo}")
+
     def calculo_inverso(self):
         ip_str = self.input_herramienta.text().strip()
         if not ip_str:
             self.mostrar_error("❌ Ingresa una dirección IP para calcular.", herramienta=True)
             return
         
+        # Se acepta "ip/prefijo"; si no, se pide la máscara
+        ip_str, _, mascara = ip_str.partition("/")
         try:
-            ip = ipaddress.IPv4Address(ip_str)
-            
-            # Pedir máscara o prefijo
+            ip, ancho = parsear_ip(ip_str)
+        except ErrorPlan:
+            self.mostrar_error(f"❌ {ip_str} no es una dirección IP válida.", herramienta=True)
+            return
+        
+        if not mascara:
+            ejemplo = "255.255.255.0 o /24" if ancho == ANCHO_IPV4 else "/64"
             mascara, ok = QInputDialog.getText(
                 self, 
                 "Cálculo Inverso", 
-                "Ingresa máscara (ej: 255.255.255.0 o /24):"
+                f"Ingresa máscara (ej: {ejemplo}):"
             )
-            if not ok or not mascara:
+            if not ok or not mascara.strip():
                 return
-            
-            try:
-                if mascara.startswith('/'):
-                    red = ipaddress.IPv4Network(f"{ip_str}{mascara}", strict=False)
-                else:
-                    red = ipaddress.IPv4Network(f"{ip_str}/{mascara}", strict=False)
-                
-                resultado = (
-                    f"🔄 Información de red para {ip_str} con máscara {mascara}:\n\n"
-                    f"  ➤ Dirección de red: {red.network_address}\n"
-                    f"  ➤ Broadcast: {red.broadcast_address}\n"
-                    f"  ➤ Rango de hosts: {red.network_address + 1} - {red.broadcast_address - 1}\n"
-                    f"  ➤ Máscara: {red.netmask} (/{red.prefixlen})\n"
-                    f"  ➤ Wildcard: {red.hostmask}\n"
-                    f"  ➤ Hosts disponibles: {red.num_addresses - 2}\n"
-                )
-                
-                self.resultado_herramientas.setPlainText(resultado)
-                self.actualizar_status(f"Cálculo inverso completado para {ip_str}")
-                
-            except ValueError as e:
-                self.mostrar_error(f"❌ Máscara no válida: {str(e)}", herramienta=True)
         
-        except ValueError:
-            self.mostrar_error(f"❌ {ip_str} no es una dirección IPv4 válida.", herramienta=True)
+        try:
+            prefijo = parsear_mascara(mascara, ancho)
+        except ErrorPlan as e:
+            self.mostrar_error(f"❌ {e}", herramienta=True)
+            return
+        
+        red, _, _ = parsear_red(f"{ip_str}/{prefijo}")
+        d = datos_subred(red, prefijo, ancho)
+        broadcast = "no aplica en IPv6" if d["broadcast"] is None else int_a_ip(d["broadcast"], ancho)
+        resultado = (
+            f"🔄 Información de red para {int_a_ip(ip, ancho)} con máscara {mascara.strip()}:\n\n"
+            f"  ➤ Dirección de red: {int_a_ip(red, ancho)}\n"
+            f"  ➤ Broadcast: {broadcast}\n"
+            f"  ➤ Rango de hosts: {int_a_ip(d['primera'], ancho)} - {int_a_ip(d['ultima'], ancho)}\n"
+            f"  ➤ Máscara: {int_a_ip(d['mascara'], ancho)} (/{prefijo})\n"
+            f"  ➤ Wildcard: {int_a_ip(d['wildcard'], ancho)}\n"
+            f"  ➤ Hosts disponibles: {d['hosts']}\n"
+        )
+        
+        self.resultado_herramientas.setPlainText(resultado)
+        self.actualizar_status(f"Cálculo inverso completado para {ip_str}")
 
     def calcular_wildcard(self):
         mascara = self.input_herramienta.text().strip()
@@ -792,66 +1165,251 @@ class VLSMSubnettingApp(QWidget):
             self.mostrar_error("❌ Ingresa una máscara para calcular su wildcard.", herramienta=True)
             return
         
+        ancho = ancho_de_mascara(mascara)
         try:
-            if mascara.startswith('/'):
-                # Es un prefijo CIDR
-                prefijo = int(mascara[1:])
-                if not (0 <= prefijo <= 32):
-                    raise ValueError
-                mascara_obj = ipaddress.IPv4Network(f"0.0.0.0/{prefijo}").netmask
+            prefijo = parsear_mascara(mascara, ancho)
+        except ErrorPlan:
+            self.mostrar_error("❌ La máscara ingresada no es válida.", herramienta=True)
+            return
+        
+        d = datos_subred(0, prefijo, ancho)
+        resultado = (
+            f"🎭 Cálculo de Wildcard:\n\n"
+            f"  ➤ Máscara ingresada: {mascara}\n"
+            f"  ➤ Máscara equivalente: {int_a_ip(d['mascara'], ancho)}\n"
+            f"  ➤ Wildcard resultante: {int_a_ip(d['wildcard'], ancho)}\n"
+            f"  ➤ Prefijo CIDR equivalente: /{prefijo}\n"
+        )
+        
+        self.resultado_herramientas.setPlainText(resultado)
+        self.actualizar_status(f"Wildcard calculado para {mascara}")
+
+    def pedir_modo_sumarizacion(self):
+        modo, ok = QInputDialog.getItem(
+            self, "Sumarizar rutas", "Tipo de resumen:", list(MODOS_SUMARIZACION), 0, False
+        )
+        return MODOS_SUMARIZACION[modo] if ok else None
+
+    def sumarizar_rutas(self):
+        # Por defecto se proponen las subredes del plan actual, si no son demasiadas
+        texto_inicial = ""
+        if self.plan_actual and len(self.plan_actual) <= MAX_LINEAS_SUMARIZACION:
+            texto_inicial = "\n".join(
+                f"{int_a_ip(red, self.plan_actual.ancho)}/{prefijo}" for red, prefijo in self.plan_actual
+            )
+        texto, ok = QInputDialog.getMultiLineText(
+            self, "Sumarizar rutas",
+            "Prefijos, uno por línea (10.0.0.0/24 o 10.0.0.0 255.255.255.0):", texto_inicial
+        )
+        if not ok or not texto.strip():
+            return
+        modo = self.pedir_modo_sumarizacion()
+        if modo is None:
+            return
+
+        self.ejecutar_tarea(
+            self._trabajo_sumarizar, texto.splitlines(), *modo,
+            descripcion="Sumarizando rutas",
+            al_terminar=self.mostrar_sumarizacion,
+            al_error=lambda mensaje: self.mostrar_error(f"❌ {mensaje}", herramienta=True)
+        )
+
+    def _trabajo_sumarizar(self, tarea, lineas, formato, tolerancia):
+        # Los límites por familia evitan agregados IPv6 de /8
+        from sumarizacion import PREFIJO_MINIMO, PREFIJO_MINIMO_IPV6, formatear, sumarizar
+
+        agregados = [formatear(*a, formato)
+                     for a in sumarizar(lineas, tolerancia, PREFIJO_MINIMO, PREFIJO_MINIMO_IPV6)]
+        return len(lineas), agregados
+
+    def mostrar_sumarizacion(self, resultado):
+        entradas, agregados = resultado
+        lineas = [f"🧩 {entradas} prefijos resumidos en {len(agregados)} agregados:\n"]
+        lineas.extend(agregados[:MAX_LINEAS_SUMARIZACION])
+        if len(agregados) > MAX_LINEAS_SUMARIZACION:
+            lineas.append(f"\n... y {len(agregados) - MAX_LINEAS_SUMARIZACION} más (usa «Sumarizar archivo»)")
+        self.resultado_herramientas.setPlainText("\n".join(lineas))
+        self.actualizar_status(f"Sumarización completada: {len(agregados)} agregados")
+
+    def sumarizar_archivo(self):
+        entrada, _ = QFileDialog.getOpenFileName(
+            self, "Tabla de rutas o lista de prefijos", self.ultima_ruta or "",
+            "Texto (*.txt *.csv *.cfg);;Todos los archivos (*)"
+        )
+        if not entrada:
+            return
+        modo = self.pedir_modo_sumarizacion()
+        if modo is None:
+            return
+        salida, _ = QFileDialog.getSaveFileName(
+            self, "Guardar resumen", self.ultima_ruta or "", "Texto (*.txt)"
+        )
+        if not salida:
+            return
+
+        self.ultima_ruta = os.path.dirname(salida)
+        self.guardar_configuracion()
+
+        self.ejecutar_tarea(
+            self._trabajo_sumarizar_archivo, entrada, salida, *modo,
+            descripcion="Sumarizando archivo",
+            al_terminar=lambda agregados: self.exportacion_terminada(
+                f"Resumen guardado en {salida}", f"✅ {agregados} agregados guardados en {salida}"
+            ),
+            al_error=lambda mensaje: self.mostrar_error(f"❌ {mensaje}", herramienta=True)
+        )
+
+    def _trabajo_sumarizar_archivo(self, tarea, entrada, salida, formato, tolerancia):
+        # Los agregados se escriben a medida que salen del generador
+        from sumarizacion import PREFIJO_MINIMO, PREFIJO_MINIMO_IPV6, formatear, sumarizar
+
+        agregados = 0
+        with open(entrada, encoding="utf-8") as origen, open(salida, "w", encoding="utf-8") as destino:
+            for agregado in sumarizar(origen, tolerancia, PREFIJO_MINIMO, PREFIJO_MINIMO_IPV6):
+                destino.write(formatear(*agregado, formato) + "\n")
+                agregados += 1
+                if agregados % 10000 == 0:
+                    tarea.comprobar()
+        return agregados
+
+    def espacio_libre(self):
+        texto = self.input_herramienta.text().strip()
+        try:
+            if texto:
+                red, prefijo, ancho = parsear_red(texto)
+            elif self.plan_actual:
+                red, prefijo, ancho = self.plan_actual.red, self.plan_actual.prefijo, self.plan_actual.ancho
             else:
-                # Es una máscara normal
-                mascara_obj = ipaddress.IPv4Address(mascara)
-            
-            wildcard = ipaddress.IPv4Address(int(mascara_obj) ^ 0xFFFFFFFF)
-            
-            resultado = (
-                f"🎭 Cálculo de Wildcard:\n\n"
-                f"  ➤ Máscara ingresada: {mascara}\n"
-                f"  ➤ Wildcard resultante: {wildcard}\n"
-                f"  ➤ Prefijo CIDR equivalente: /{ipaddress.IPv4Network(f'0.0.0.0/{mascara}').prefixlen if not mascara.startswith('/') else mascara}\n"
+                raise ErrorPlan("Ingresa una red padre o realiza un cálculo primero.")
+        except ErrorPlan as e:
+            self.mostrar_error(f"❌ {e}", herramienta=True)
+            return
+
+        origenes = [ORIGEN_HISTORIAL, ORIGEN_ARCHIVO]
+        if self.plan_actual:
+            origenes.insert(0, ORIGEN_PLAN)
+        origen, ok = QInputDialog.getItem(
+            self, "Espacio libre", "Asignaciones a descontar:", origenes, 0, False
+        )
+        if not ok:
+            return
+
+        ruta = None
+        if origen == ORIGEN_PLAN:
+            rangos = rangos_plan(self.plan_actual)
+        elif origen == ORIGEN_HISTORIAL:
+            fin = red + (1 << (ancho - prefijo))
+            rangos = [(a, b) for a, b, _ in self.indice_ipam.solapamientos(ancho, red, fin)]
+        else:
+            ruta, _ = QFileDialog.getOpenFileName(
+                self, "Prefijos asignados", self.ultima_ruta or "",
+                "Texto (*.txt *.csv *.cfg);;Todos los archivos (*)"
             )
-            
-            self.resultado_herramientas.setPlainText(resultado)
-            self.actualizar_status(f"Wildcard calculado para {mascara}")
+            if not ruta:
+                return
+            rangos = []
+
+        self.ejecutar_tarea(
+            self._trabajo_espacio_libre, red, prefijo, ancho, rangos, ruta,
+            descripcion="Analizando espacio libre",
+            al_terminar=self.mostrar_espacio_libre,
+            al_error=lambda mensaje: self.mostrar_error(f"❌ {mensaje}", herramienta=True)
+        )
+
+    def _trabajo_espacio_libre(self, tarea, red, prefijo, ancho, rangos, ruta):
+        from espacio_libre import analizar_espacio
+        from sumarizacion import leer_prefijos
+
+        if ruta:
+            with open(ruta, encoding="utf-8") as archivo:
+                (inicios, fines), rangos6 = leer_prefijos(archivo)
+            rangos = list(zip(inicios, fines)) if ancho == ANCHO_IPV4 else rangos6
+        return analizar_espacio(red, prefijo, ancho, rangos)
+
+    def mostrar_espacio_libre(self, analisis):
+        from espacio_libre import texto_analisis
+
+        self.resultado_herramientas.setPlainText(texto_analisis(analisis))
+        self.actualizar_status(
+            f"Espacio libre: {len(analisis.huecos)} bloques, fragmentación {analisis.fragmentacion:.1%}"
+        )
+
+    def carpeta_datos(self):
+        carpeta = QStandardPaths.writableLocation(QStandardPaths.AppDataLocation)
+        os.makedirs(carpeta, exist_ok=True)
+        return carpeta
+
+    def abrir_historial(self):
+        historial = HistorialDB(os.path.join(self.carpeta_datos(), "historial.sqlite3"))
         
-        except ValueError:
-            self.mostrar_error("❌ La máscara ingresada no es válida.", herramienta=True)
+        # Migrar una sola vez el historial antiguo guardado como JSON en QSettings
+        if self.settings.contains("historial"):
+            try:
+                historial.importar_json(self.settings.value("historial", "[]"))
+            except (ValueError, KeyError, TypeError, sqlite3.Error) as e:
+                # Se conserva la clave para reintentar en el próximo inicio
+                mensaje = f"⚠️ No se pudo migrar el historial antiguo: {e}"
+                QTimer.singleShot(0, lambda: QMessageBox.warning(self, "Historial", mensaje))
+            else:
+                self.settings.remove("historial")
+        return historial
 
     def actualizar_lista_historial(self):
         self.lista_historial.clear()
-        for item in reversed(self.historial):
-            texto = f"{item['fecha']} - {item['red']} ({item['modo']}: {item['valor']})"
-            QListWidgetItem(texto, self.lista_historial)
+        self.ultima_pagina_historial = None
+        self.cargar_pagina_historial()
+
+    def cargar_pagina_historial(self):
+        # Las entradas se cargan por páginas a medida que se baja en la lista
+        if self.ultima_pagina_historial == 0:
+            return
+        entradas = self.historial.pagina(antes_de=self.ultima_pagina_historial)
+        for entrada in entradas:
+            self.agregar_item_historial(entrada)
+        self.ultima_pagina_historial = entradas[-1]["id"] if len(entradas) == TAMANO_PAGINA else 0
+
+    def desplazamiento_historial(self, valor):
+        if valor >= self.lista_historial.verticalScrollBar().maximum() - 5:
+            self.cargar_pagina_historial()
+
+    def agregar_item_historial(self, entrada, al_principio=False):
+        valor = str(entrada['valor'])
+        if len(valor) > 40:
+            valor = valor[:37] + "..."
+        texto = f"{entrada['fecha']} - {entrada['red']} ({entrada['modo']}: {valor})"
+        item = QListWidgetItem(texto)
+        item.setData(Qt.UserRole, entrada["id"])
+        if al_principio:
+            self.lista_historial.insertItem(0, item)
+        else:
+            self.lista_historial.addItem(item)
 
     def cargar_desde_historial(self, item):
-        indice = len(self.historial) - self.lista_historial.row(item) - 1
-        entrada = self.historial[indice]
-        
-        self.input_ip.setText(entrada["red"])
-        self.combo_tipo.setCurrentText(entrada["modo"])
-        self.input_cantidad.setText(str(entrada["valor"]))
-        self.resultado.setPlainText(entrada["resultado"])
+        entrada = self.historial.obtener(item.data(Qt.UserRole))
+        if entrada is None:
+            return
         
-        # Intentar reconstruir las subredes para exportación
+        self.cargando_entradas = True
         try:
-            red = ipaddress.IPv4Network(entrada["red"], strict=False)
-            modo = entrada["modo"]
-            valor = entrada["valor"]
-            
-            if modo == "Cantidad de subredes":
-                bits_necesarios = (valor - 1).bit_length()
-                nuevo_prefijo = red.prefixlen + bits_necesarios
-                self.subredes_actuales = list(red.subnets(new_prefix=nuevo_prefijo))[:valor]
-            else:
-                bits_necesarios = (valor + 2 - 1).bit_length()
-                nuevo_prefijo = 32 - bits_necesarios
-                self.subredes_actuales = list(red.subnets(new_prefix=nuevo_prefijo))
-            
-            self.calculo_actual = entrada["resultado"]
+            self.input_ip.setText(entrada["red"])
+            self.combo_tipo.setCurrentText(entrada["modo"])
+            self.input_cantidad.setText(str(entrada["valor"]))
+        finally:
+            self.cargando_entradas = False
+        # Una vista previa pendiente de antes sobrescribiría el encabezado cargado
+        self.temporizador_vista_previa.stop()
+        self.validar_ip()
+        
+        # Reconstruir el plan para mostrarlo y exportarlo
+        try:
+            with self.registro.medir(f"Cargar del historial {entrada['red']}") as medicion:
+                plan = planificar_en_cache(entrada["red"], entrada["modo"], entrada["valor"])
+                self.mostrar_plan(plan, encabezado_plan(plan, entrada["fecha"]))
+                medicion.filas = len(plan)
             self.actualizar_status(f"Cálculo cargado desde historial: {entrada['fecha']}")
-        except:
-            self.subredes_actuales = []
+            self.mostrar_medicion(medicion)
+        except (ErrorPlan, KeyError, TypeError):
+            self.limpiar_resultado()
             self.actualizar_status("Cálculo cargado desde historial (sin datos para exportar)")
 
     def limpiar_historial(self):
@@ -863,17 +1421,43 @@ class VLSMSubnettingApp(QWidget):
         )
         
         if respuesta == QMessageBox.Yes:
-            self.historial = []
+            self.historial.limpiar()
+            self.indice_ipam = IndiceIPAM.desde_bloques(self.historial.iterar_bloques())
             self.actualizar_lista_historial()
             self.guardar_configuracion()
             self.actualizar_status("Historial limpiado")
 
+    def importar_inventario(self):
+        ruta, _ = QFileDialog.getOpenFileName(
+            self, "Importar inventario", self.ultima_ruta,
+            "Inventario (*.txt *.csv);;Todos los archivos (*)"
+        )
+        if not ruta:
+            return
+        try:
+            with open(ruta, encoding="utf-8") as archivo:
+                redes = leer_inventario(archivo.read())
+        except (OSError, UnicodeDecodeError, ErrorPlan) as e:
+            QMessageBox.critical(self, "Error", f"❌ No se pudo leer el inventario: {e}")
+            return
+
+        # Solapamientos con lo ya asignado, antes de sumar el inventario al índice
+        origen = os.path.basename(ruta)
+        solapadas = 0
+        for dueno, ancho, inicio, fin in self.historial.agregar_inventario(origen, redes):
+            if self.indice_ipam.solapamientos(ancho, inicio, fin):
+                solapadas += 1
+            self.indice_ipam.agregar(dueno, ancho, inicio, fin)
+        mensaje = f"📥 {len(redes)} redes importadas de {origen}"
+        if solapadas:
+            mensaje += f" ({solapadas} solapan con asignaciones previas)"
+        QMessageBox.information(self, "Inventario", mensaje)
+        self.actualizar_status(mensaje)
+
     def limpiar_campos(self):
         self.input_ip.clear()
         self.input_cantidad.clear()
-        self.resultado.clear()
-        self.subredes_actuales = []
-        self.calculo_actual = ""
+        self.limpiar_resultado()
         self.actualizar_status("Campos limpiados")
 
     def alternar_modo(self):
@@ -884,18 +1468,113 @@ class VLSMSubnettingApp(QWidget):
         modo = "oscuro" if self.modo_oscuro else "claro"
         self.actualizar_status(f"Modo {modo} activado")
 
+    def ejecutar_tarea(self, funcion, *args, descripcion="", al_terminar=None,
+                       al_parcial=None, al_error=None):
+        if self.tarea_actual is not None:
+            QMessageBox.warning(self, "Tarea en curso", "⏳ Espera a que termine o cancela la tarea actual.")
+            return None
+        
+        tarea = Tarea(self._medir_tarea, funcion, descripcion, *args)
+        tarea.senales.progreso.connect(self.progreso_tarea)
+        tarea.senales.cancelado.connect(lambda: self.actualizar_status(f"{descripcion}: cancelado"))
+        tarea.senales.finalizado.connect(self.tarea_finalizada)
+        if al_terminar:
+            tarea.senales.terminado.connect(al_terminar)
+        if al_parcial:
+            tarea.senales.parcial.connect(al_parcial)
+        if al_error:
+            tarea.senales.error.connect(al_error)
+        
+        # La tarea anterior sigue referenciada hasta aquí: su run() puede no
+        # haber retornado aún cuando la interfaz recibe "finalizado"
+        self.ultima_tarea = self.tarea_actual = tarea
+        self.barra_progreso.setValue(0)
+        self.barra_progreso.show()
+        self.btn_cancelar.show()
+        self.actualizar_status(f"{descripcion}...")
+        return iniciar(tarea)
+
+    def _medir_tarea(self, tarea, funcion, descripcion, *args):
+        # Se ejecuta en el hilo de trabajo, igual que funcion
+        with self.registro.medir(descripcion) as medicion:
+            tarea.medicion = medicion
+            try:
+                resultado = funcion(tarea, *args)
+            except TareaCancelada:
+                medicion.estado = ESTADO_CANCELADO
+                raise
+            finally:
+                medicion.filas = tarea.hechos or None
+            if medicion.filas is None and hasattr(resultado, "__len__"):
+                medicion.filas = len(resultado)
+            return resultado
+
+    def progreso_tarea(self, hechos, total, mensaje):
+        if total:
+            self.barra_progreso.setValue(int(1000 * hechos / total))
+        self.actualizar_status(f"{mensaje} ({hechos}/{total})")
+
+    def cancelar_tarea(self):
+        if self.tarea_actual is not None:
+            self.tarea_actual.cancelar()
+            self.actualizar_status("Cancelando...")
+
+    def tarea_finalizada(self):
+        self.tarea_actual = None
+        self.barra_progreso.hide()
+        self.btn_cancelar.hide()
+        medicion = self.ultima_tarea.medicion if self.ultima_tarea else None
+        if medicion is not None and medicion.duracion is not None:
+            self.mostrar_medicion(medicion)
+
+    def mostrar_medicion(self, medicion):
+        texto = f"{self.status_bar.text()} · ⏱️ {texto_medicion(medicion)}"
+        if medicion.perfil:
+            texto += f" · perfil en {medicion.perfil}"
+        self.status_bar.setText(texto)
+
+    def ver_tiempos(self):
+        self.resultado_herramientas.setPlainText(texto_registro(self.registro.instantanea()))
+
+    def exportar_traza(self):
+        ruta, _ = QFileDialog.getSaveFileName(
+            self, "Exportar traza", os.path.join(self.ultima_ruta or "", "traza_vlsm.json"),
+            "Chrome trace (*.json)"
+        )
+        if not ruta:
+            return
+        try:
+            mediciones = self.registro.instantanea()
+            exportar_traza(ruta, mediciones)
+            self.actualizar_status(f"Traza de {len(mediciones)} acciones guardada en {ruta}")
+        except OSError as e:
+            self.mostrar_error(f"❌ No se pudo guardar la traza: {e}", herramienta=True)
+
+    def perfilar_proxima_accion(self):
+        ruta, _ = QFileDialog.getSaveFileName(
+            self, "Guardar perfil", os.path.join(self.ultima_ruta or "", "perfil_vlsm.prof"),
+            "Perfil de cProfile (*.prof)"
+        )
+        if not ruta:
+            return
+        self.registro.perfilar_siguiente(ruta)
+        self.actualizar_status(f"La próxima acción se perfilará en {ruta} (y un resumen .txt)")
+
     def mostrar_error(self, mensaje, herramienta=False):
         QMessageBox.critical(self, "Error", mensaje)
         if herramienta:
             self.resultado_herramientas.append(mensaje)
         else:
-            self.resultado.clear()
+            self.limpiar_resultado()
 
     def actualizar_status(self, mensaje):
         self.status_bar.setText(f"Estado: {mensaje}")
 
     def closeEvent(self, event):
+        if self.tarea_actual is not None:
+            self.tarea_actual.cancelar()
         self.guardar_configuracion()
+        self.historial.cerrar()
         event.accept()
 
 
@@ -0,0 +1,171 @@
+"""Benchmark de arranque de la aplicación.
+
+Mide el tiempo hasta la primera ventana (desde que se lanza el proceso hasta
+que la ventana se muestra y se procesa el primer ciclo de eventos) y el
+desglose de `python -X importtime` por módulo. Ejemplo:
+
+    python benchmark_arranque.py --repeticiones 5 --json arranque.json
+
+Con --offscreen no hace falta pantalla (QT_QPA_PLATFORM=offscreen).
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+MODULO_APP = "VMLSCalculator_Pro"
+
+
+def _hijo():
+    # Se ejecuta en un proceso nuevo: informa los tiempos parciales por stdout
+    inicio = time.perf_counter()
+    sys.path.insert(0, DIRECTORIO)
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import QApplication
+    app_modulo = __import__(MODULO_APP)
+    importado = time.perf_counter()
+
+    app = QApplication(sys.argv[:1])
+    app.setStyle('Fusion')
+    ventana = app_modulo.VLSMSubnettingApp()
+    construido = time.perf_counter()
+    ventana.show()
+
+    def listo():
+        print(json.dumps({
+            "listo": time.time(),
+            "importacion": importado - inicio,
+            "construccion": construido - importado,
+            "primer_evento": time.perf_counter() - construido,
+        }), flush=True)
+        app.quit()
+
+    # Se dispara tras el primer ciclo del bucle de eventos, con la ventana ya mostrada
+    QTimer.singleShot(0, listo)
+    app.exec_()
+
+
+def medir_primera_ventana(repeticiones, offscreen=False):
+    entorno = dict(os.environ)
+    if offscreen:
+        entorno["QT_QPA_PLATFORM"] = "offscreen"
+    muestras = []
+    for _ in range(repeticiones):
+        lanzado = time.time()
+        proceso = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--hijo"],
+            cwd=DIRECTORIO, env=entorno, capture_output=True, text=True
+        )
+        if proceso.returncode != 0:
+            raise RuntimeError(f"El proceso de prueba falló:\n{proceso.stderr}")
+        ultima = proceso.stdout.strip().splitlines()[-1]
+        muestra = json.loads(ultima)
+        # Desde el lanzamiento hasta la ventana visible, incluido el arranque
+        # del intérprete; el cierre del proceso no cuenta
+        muestra["primera_ventana"] = muestra.pop("listo") - lanzado
+        muestras.append(muestra)
+    return muestras
+
+
+def desglose_importtime(modulo=MODULO_APP, limite=15):
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=DIRECTORIO, capture_output=True, text=True
+    )
+    if proceso.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {modulo}:\n{proceso.stderr}")
+
+    # La salida va en postorden: los hijos de un módulo aparecen antes que él
+    directos = []
+    pendientes = []
+    total_ms = 0.0
+    for linea in proceso.stderr.splitlines():
+        # Formato: "import time: propio | acumulado | nombre" (µs, con sangría por nivel)
+        if not linea.startswith("import time:") or "self [us]" in linea:
+            continue
+        propio, acumulado, nombre = linea[len("import time:"):].split("|")
+        nivel = (len(nombre) - len(nombre.lstrip())) // 2
+        entrada = {
+            "modulo": nombre.strip(),
+            "propio_ms": int(propio) / 1000,
+            "acumulado_ms": int(acumulado) / 1000,
+        }
+        if nivel == 1:
+            pendientes.append(entrada)
+        elif nivel == 0:
+            if entrada["modulo"] == modulo:
+                directos = pendientes
+                total_ms = entrada["acumulado_ms"]
+            pendientes = []
+
+    return {
+        "total_ms": total_ms,
+        "modulos": sorted(directos, key=lambda m: m["acumulado_ms"], reverse=True)[:limite],
+    }
+
+
+def resumen_muestras(muestras):
+    claves = ("primera_ventana", "importacion", "construccion", "primer_evento")
+    return {
+        clave: {
+            "mediana_ms": statistics.median(m[clave] for m in muestras) * 1000,
+            "minimo_ms": min(m[clave] for m in muestras) * 1000,
+        }
+        for clave in claves
+    }
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(description="Benchmark de arranque de la aplicación.")
+    parser.add_argument("--repeticiones", type=int, default=5,
+                        help="Arranques medidos (se informa la mediana)")
+    parser.add_argument("--offscreen", action="store_true",
+                        help="Usar la plataforma Qt sin pantalla")
+    parser.add_argument("--sin-ventana", action="store_true",
+                        help="Solo el desglose de importaciones")
+    parser.add_argument("--limite", type=int, default=15,
+                        help="Módulos a mostrar en el desglose")
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    parser.add_argument("--hijo", action="store_true", help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    if args.hijo:
+        _hijo()
+        return 0
+
+    resultados = {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+    importaciones = desglose_importtime(limite=args.limite)
+    resultados["importtime"] = importaciones
+    print(f"Importación de {MODULO_APP}: {importaciones['total_ms']:.1f} ms")
+    for m in importaciones["modulos"]:
+        print(f"  {m['acumulado_ms']:9.1f} ms  {m['modulo']}")
+
+    if not args.sin_ventana:
+        muestras = medir_primera_ventana(max(1, args.repeticiones), args.offscreen)
+        resultados["arranque"] = resumen_muestras(muestras)
+        resultados["muestras"] = muestras
+        print(f"\nArranque (mediana de {len(muestras)}):")
+        for clave, valores in resultados["arranque"].items():
+            print(f"  {clave:16} {valores['mediana_ms']:9.1f} ms  (mín. {valores['minimo_ms']:.1f} ms)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as archivo:
+            json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
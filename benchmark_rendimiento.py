@@ -0,0 +1,374 @@
+"""Benchmark de rendimiento sin interfaz gráfica ni red.
+
+Mide la generación de planes (de /24 a /8, de 1 a 1M subredes), el guardado y
+la carga con un historial grande, la exportación a Excel y PDF y el escaneo
+de puertos contra servicios abiertos en 127.0.0.1 por el propio benchmark.
+Los resultados se guardan en JSON y se pueden comparar con una base anterior:
+el proceso termina con código 1 si algún caso empeora más del umbral. Ejemplo:
+
+    python benchmark_rendimiento.py --json base.json
+    python benchmark_rendimiento.py --base base.json --umbral 15
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import selectors
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from contextlib import ExitStack
+
+from motor_vlsm import MODO_HOSTS, MODO_SUBREDES, MODO_VLSM, encabezado_plan, planificar
+
+GRUPOS = ("plan", "historial", "exportacion", "escaner")
+
+# (red, modo, valor, grande): los casos grandes se omiten con --rapido
+PLANES = (
+    ("192.168.1.0/24", MODO_SUBREDES, 1, False),
+    ("192.168.1.0/24", MODO_SUBREDES, 64, False),
+    ("172.16.0.0/16", MODO_HOSTS, 254, False),
+    ("172.16.0.0/16", MODO_SUBREDES, 16384, False),
+    ("10.0.0.0/8", MODO_SUBREDES, 65536, False),
+    ("10.0.0.0/8", MODO_SUBREDES, 1000000, True),
+    ("2001:db8::/48", MODO_SUBREDES, 65536, True),
+)
+REQUISITOS_VLSM = 10000
+CALCULOS_GUARDADOS = 1000
+CALCULOS_CARGADOS = 1000
+PUERTOS_ABIERTOS = 32
+PUERTOS_CERRADOS = 2000
+
+Caso = namedtuple("Caso", "nombre grupo preparar")
+# medir() es lo único que se cronometra; unidades es lo que procesa cada vez
+Medicion = namedtuple("Medicion", "medir unidades")
+
+
+def _requisitos_vlsm(cantidad, semilla=1):
+    aleatorio = random.Random(semilla)
+    return ",".join(f"sede{i}:{aleatorio.choice((2, 6, 14, 30, 62, 120, 250))}" for i in range(cantidad))
+
+
+def _consumir(filas):
+    cantidad = 0
+    for _ in filas:
+        cantidad += 1
+    return cantidad
+
+
+def casos_plan(rapido):
+    from tabla_vectorizada import filas_vectorizadas
+
+    def calculo(red, modo, valor):
+        # Lo que hace calcular_subnetting: plan perezoso y encabezado
+        def preparar():
+            return Medicion(lambda: encabezado_plan(planificar(red, modo, valor), ""), 1)
+        return preparar
+
+    def filas(red, modo, valor):
+        def preparar():
+            plan = planificar(red, modo, valor)
+            return Medicion(lambda: _consumir(filas_vectorizadas(plan)), len(plan))
+        return preparar
+
+    casos = []
+    planes = [p for p in PLANES if not (rapido and p[3])]
+    planes.append(("10.0.0.0/8", MODO_VLSM, _requisitos_vlsm(REQUISITOS_VLSM), False))
+    for red, modo, valor, _ in planes:
+        etiqueta = f"{REQUISITOS_VLSM} requisitos VLSM" if modo == MODO_VLSM else f"{modo} = {valor}"
+        casos.append(Caso(f"plan: {red}, {etiqueta}", "plan", calculo(red, modo, valor)))
+        casos.append(Caso(f"filas: {red}, {etiqueta}", "plan", filas(red, modo, valor)))
+    return casos
+
+
+def _poblar_historial(ruta, cantidad):
+    # Misma forma que la migración desde QSettings: una sola transacción
+    from historial_db import HistorialDB
+
+    aleatorio = random.Random(2)
+    entradas = []
+    for i in range(cantidad):
+        red = f"10.{aleatorio.randrange(256)}.{aleatorio.randrange(256)}.0/24"
+        modo = aleatorio.choice((MODO_SUBREDES, MODO_HOSTS))
+        valor = aleatorio.choice((2, 4, 8, 16)) if modo == MODO_SUBREDES else aleatorio.choice((6, 14, 30))
+        entradas.append({"fecha": f"2024-01-01 00:{i // 60 % 60:02d}:{i % 60:02d}",
+                         "red": red, "modo": modo, "valor": valor})
+    historial = HistorialDB(ruta)
+    historial.importar_json(json.dumps(entradas))
+    historial.cerrar()
+
+
+def casos_historial(directorio, cantidad, pila):
+    from historial_db import HistorialDB
+    from indice_ipam import IndiceIPAM, rangos_plan
+
+    ruta = os.path.join(directorio, "historial.db")
+    estado = {}
+
+    def historial():
+        # Se llena una sola vez, al preparar el primer caso que lo usa
+        if "historial" not in estado:
+            _poblar_historial(ruta, cantidad)
+            estado["historial"] = HistorialDB(ruta)
+            pila.callback(estado["historial"].cerrar)
+        return estado["historial"]
+
+    def abrir():
+        historial()
+
+        def medir():
+            # Arranque de la aplicación: abrir la base y reconstruir el índice
+            h = HistorialDB(ruta)
+            IndiceIPAM.desde_bloques(h.iterar_bloques())
+            h.cerrar()
+        return Medicion(medir, cantidad)
+
+    def guardar():
+        h = historial()
+        planes = [planificar(f"172.{16 + i % 16}.{i // 16 % 256}.0/24", MODO_SUBREDES, 4)
+                  for i in range(CALCULOS_GUARDADOS)]
+
+        def medir():
+            for plan in planes:
+                h.agregar("2024-01-02 00:00:00", plan.cidr, plan.modo, plan.valor, len(plan),
+                          rangos=rangos_plan(plan), ancho=plan.ancho)
+        return Medicion(medir, CALCULOS_GUARDADOS)
+
+    def cargar():
+        h = historial()
+        ids = random.Random(3).sample(range(1, cantidad + 1), min(CALCULOS_CARGADOS, cantidad))
+
+        def medir():
+            # Lo que hace cargar_desde_historial, sin la caché de planes
+            for id_ in ids:
+                entrada = h.obtener(id_)
+                encabezado_plan(planificar(entrada["red"], entrada["modo"], entrada["valor"]),
+                                entrada["fecha"])
+        return Medicion(medir, len(ids))
+
+    def paginar():
+        h = historial()
+
+        def medir():
+            paginas = 0
+            ultimo = None
+            while paginas < 50:
+                pagina = h.pagina(ultimo)
+                if not pagina:
+                    break
+                ultimo = pagina[-1]["id"]
+                paginas += 1
+            return paginas
+        return Medicion(medir, 50)
+
+    return [
+        Caso(f"historial: abrir e indexar {cantidad} cálculos", "historial", abrir),
+        Caso(f"historial: guardar {CALCULOS_GUARDADOS} cálculos", "historial", guardar),
+        Caso(f"historial: cargar {CALCULOS_CARGADOS} cálculos", "historial", cargar),
+        Caso("historial: 50 páginas de la lista", "historial", paginar),
+    ]
+
+
+def casos_exportacion(directorio, filas):
+    from exportadores import exportar_excel, exportar_pdf
+
+    plan = planificar("10.0.0.0/8", MODO_SUBREDES, filas)
+
+    def excel():
+        import openpyxl  # noqa: F401 - falla antes de cronometrar si no está
+        return Medicion(lambda: exportar_excel(os.path.join(directorio, "plan.xlsx"), plan), len(plan))
+
+    def pdf():
+        import reportlab  # noqa: F401
+        return Medicion(lambda: exportar_pdf(os.path.join(directorio, "plan.pdf"), plan, ""), len(plan))
+
+    return [
+        Caso(f"exportación: Excel de {len(plan)} subredes", "exportacion", excel),
+        Caso(f"exportación: PDF de {len(plan)} subredes", "exportacion", pdf),
+    ]
+
+
+class ServiciosLocales:
+    """Puertos TCP abiertos en 127.0.0.1 que aceptan y cierran cada conexión."""
+
+    def __init__(self, cantidad):
+        self.selector = selectors.DefaultSelector()
+        self.sockets = []
+        for _ in range(cantidad):
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            s.bind(("127.0.0.1", 0))
+            s.listen(512)
+            s.setblocking(False)
+            self.selector.register(s, selectors.EVENT_READ)
+            self.sockets.append(s)
+        self.puertos = [s.getsockname()[1] for s in self.sockets]
+        self._parar = threading.Event()
+        self._hilo = threading.Thread(target=self._aceptar, daemon=True)
+
+    def _aceptar(self):
+        while not self._parar.is_set():
+            for clave, _ in self.selector.select(0.1):
+                try:
+                    conexion, _ = clave.fileobj.accept()
+                    conexion.close()
+                except OSError:
+                    pass
+
+    def __enter__(self):
+        self._hilo.start()
+        return self
+
+    def __exit__(self, *_):
+        self._parar.set()
+        self._hilo.join()
+        self.selector.close()
+        for s in self.sockets:
+            s.close()
+
+
+def _puertos_cerrados(cantidad):
+    # Puertos efímeros que el sistema acaba de dar y que quedan libres
+    sockets = []
+    for _ in range(cantidad):
+        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        s.bind(("127.0.0.1", 0))
+        sockets.append(s)
+    puertos = [s.getsockname()[1] for s in sockets]
+    for s in sockets:
+        s.close()
+    return puertos
+
+
+def casos_escaner(pila):
+    from herramientas_red import escanear_puertos
+
+    def escaneo():
+        servicios = pila.enter_context(ServiciosLocales(PUERTOS_ABIERTOS))
+        abiertos = set(servicios.puertos)
+        puertos = servicios.puertos + [p for p in _puertos_cerrados(PUERTOS_CERRADOS) if p not in abiertos]
+
+        def medir():
+            encontrados = escanear_puertos(["127.0.0.1"], puertos, timeout=1.0)
+            if {r.puerto for r in encontrados} != abiertos:
+                raise RuntimeError("El escaneo no encontró exactamente los puertos abiertos")
+        return Medicion(medir, len(puertos))
+
+    return [Caso(f"escáner: {PUERTOS_ABIERTOS + PUERTOS_CERRADOS} sondas a 127.0.0.1", "escaner", escaneo)]
+
+
+def medir_caso(caso, repeticiones):
+    medicion = caso.preparar()
+    muestras = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        medicion.medir()
+        muestras.append(time.perf_counter() - inicio)
+    mediana = statistics.median(muestras)
+    return {
+        "grupo": caso.grupo,
+        "mediana_ms": mediana * 1000,
+        "minimo_ms": min(muestras) * 1000,
+        "unidades": medicion.unidades,
+        "por_segundo": medicion.unidades / mediana if mediana else None,
+    }
+
+
+def comparar(resultados, base, umbral, minimo_ms):
+    """Casos que empeoran más de `umbral` % respecto a la base (y más de minimo_ms)."""
+    regresiones = {}
+    for nombre, actual in resultados.items():
+        anterior = base.get(nombre)
+        if not anterior:
+            continue
+        cambio = (actual["mediana_ms"] / anterior["mediana_ms"] - 1) * 100 if anterior["mediana_ms"] else 0.0
+        actual["cambio_pct"] = cambio
+        if cambio > umbral and actual["mediana_ms"] - anterior["mediana_ms"] > minimo_ms:
+            regresiones[nombre] = cambio
+    return regresiones
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(description="Benchmark de rendimiento sin interfaz gráfica.")
+    parser.add_argument("--grupos", nargs="+", choices=GRUPOS, default=list(GRUPOS),
+                        help="Grupos de casos a medir")
+    parser.add_argument("--filtro", default="", help="Solo los casos cuyo nombre contenga este texto")
+    parser.add_argument("--repeticiones", type=int, default=5,
+                        help="Mediciones por caso (se compara la mediana)")
+    parser.add_argument("--rapido", action="store_true", help="Omitir los planes más grandes")
+    parser.add_argument("--historial", type=int, default=100000,
+                        help="Cálculos en el historial de prueba")
+    parser.add_argument("--filas-exportacion", type=int, default=16384,
+                        help="Subredes del plan exportado")
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    parser.add_argument("--base", help="Resultados anteriores (--json) con los que comparar")
+    parser.add_argument("--umbral", type=float, default=20.0,
+                        help="Empeoramiento admitido respecto a la base, en %%")
+    parser.add_argument("--minimo-ms", type=float, default=1.0,
+                        help="Diferencias menores se consideran ruido")
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    base = None
+    if args.base:
+        with open(args.base, encoding="utf-8") as archivo:
+            base = json.load(archivo)["casos"]
+
+    resultados = {}
+    omitidos = {}
+    with tempfile.TemporaryDirectory() as directorio, ExitStack() as pila:
+        casos = []
+        if "plan" in args.grupos:
+            casos += casos_plan(args.rapido)
+        if "historial" in args.grupos:
+            casos += casos_historial(directorio, max(args.historial, 1), pila)
+        if "exportacion" in args.grupos:
+            casos += casos_exportacion(directorio, args.filas_exportacion)
+        if "escaner" in args.grupos:
+            casos += casos_escaner(pila)
+
+        for caso in casos:
+            if args.filtro not in caso.nombre:
+                continue
+            try:
+                resultados[caso.nombre] = medir_caso(caso, max(1, args.repeticiones))
+            except ImportError as e:
+                # openpyxl y reportlab son opcionales
+                omitidos[caso.nombre] = str(e)
+                print(f"  (omitido) {caso.nombre}: {e}")
+                continue
+            r = resultados[caso.nombre]
+            print(f"  {r['mediana_ms']:10.2f} ms  {r['por_segundo'] or 0:14,.0f}/s  {caso.nombre}")
+
+    regresiones = comparar(resultados, base, args.umbral, args.minimo_ms) if base else {}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as archivo:
+            json.dump({
+                "python": platform.python_version(),
+                "plataforma": platform.platform(),
+                "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "repeticiones": args.repeticiones,
+                "casos": resultados,
+                "omitidos": omitidos,
+                "regresiones": regresiones,
+            }, archivo, indent=2, ensure_ascii=False)
+
+    if base is not None:
+        if not regresiones:
+            print(f"\nSin regresiones de más del {args.umbral:g} % respecto a {args.base}")
+            return 0
+        print(f"\nRegresiones de más del {args.umbral:g} %:")
+        for nombre, cambio in regresiones.items():
+            print(f"  +{cambio:.1f} %  {nombre}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,307 @@
+"""Clasificación de listas de IP en las subredes de uno o varios planes.
+
+Los planes se compilan en una tabla de coincidencia por prefijo más largo:
+intervalos disjuntos con su inicio en un arreglo uint32 ordenado, de modo que
+cada búsqueda es un searchsorted. La entrada se lee por bloques y las IP se
+extraen de los bytes con NumPy, sin crear un objeto por línea. Ejemplo:
+
+    python clasificador_ip.py flujos.csv --plan 10.0.0.0/8 subredes 256 \\
+        --columna 2 --conteos conteos.csv --asignaciones asignaciones.csv
+
+Solo IPv4: las líneas con IPv6 u otro texto se cuentan como no válidas.
+"""
+import argparse
+import csv
+import sys
+
+import numpy as np
+
+from motor_vlsm import ANCHO_IPV4, ErrorPlan, MODO_VLSM, int_a_ip, planificar
+from tabla_vectorizada import a_texto_ip, redes_y_prefijos
+
+# Bytes leídos de la entrada cada vez; cada byte ocupa unos 40 en los
+# arreglos intermedios de extraer_ips
+TAMANO_BLOQUE = 2 * 1024 * 1024
+
+_PUNTO = ord(".")
+_SALTO = ord("\n")
+_LARGO_IPV4 = len("255.255.255.255")
+
+
+class TablaPrefijos:
+    """Subredes de varios planes como intervalos disjuntos [inicio, fin).
+
+    Cuando una subred está contenida en otra gana la más específica; cada
+    intervalo apunta a su subred en `redes`, `prefijos` y `etiquetas`.
+    """
+
+    def __init__(self, planes):
+        redes, prefijos, etiquetas = [], [], []
+        for plan in planes:
+            if plan.ancho != ANCHO_IPV4:
+                raise ErrorPlan(f"El clasificador solo admite planes IPv4: {plan.cidr}")
+            r, p = redes_y_prefijos(plan)
+            redes.append(r.astype(np.int64))
+            prefijos.append(p.astype(np.int64))
+            etiquetas.append(plan)
+        self.redes = np.concatenate(redes) if redes else np.empty(0, dtype=np.int64)
+        self.prefijos = np.concatenate(prefijos) if prefijos else np.empty(0, dtype=np.int64)
+        self._planes = etiquetas
+        self._desplazamientos = np.cumsum([0] + [len(r) for r in redes])
+
+        # Externas antes que internas a igual inicio
+        orden = np.lexsort((self.prefijos, self.redes))
+        inicios = self.redes[orden]
+        fines = inicios + (np.int64(1) << (32 - self.prefijos[orden]))
+        if inicios.size < 2 or np.all(inicios[1:] >= fines[:-1]):
+            self.inicios, self.fines, self.indices = inicios, fines, orden
+        else:
+            self.inicios, self.fines, self.indices = self._aplanar(inicios, fines, orden)
+        self.inicios = self.inicios.astype(np.uint32)
+
+    @staticmethod
+    def _aplanar(inicios, fines, indices):
+        # Los bloques CIDR están anidados o son disjuntos: con una pila de
+        # bloques abiertos se emite cada tramo con el más interno que lo cubre
+        salida = []
+        pila = []
+        cursor = 0
+
+        def emitir(hasta):
+            nonlocal cursor
+            if pila and cursor < hasta:
+                salida.append((cursor, hasta, pila[-1][1]))
+            cursor = max(cursor, hasta)
+
+        for inicio, fin, indice in zip(inicios.tolist(), fines.tolist(), indices.tolist()):
+            while pila and pila[-1][0] <= inicio:
+                emitir(pila[-1][0])
+                pila.pop()
+            emitir(inicio)
+            if pila and fin > pila[-1][0]:
+                continue  # duplicado parcial imposible en CIDR; se ignora
+            pila.append((fin, indice))
+        while pila:
+            emitir(pila[-1][0])
+            pila.pop()
+
+        tramos = np.array(salida, dtype=np.int64).reshape(-1, 3)
+        return tramos[:, 0], tramos[:, 1], tramos[:, 2]
+
+    def __len__(self):
+        return self.redes.size
+
+    def buscar(self, ips):
+        """Índice de la subred de cada IP (uint32), o -1 si no está en ninguna."""
+        j = np.searchsorted(self.inicios, ips, side="right") - 1
+        resultado = np.full(ips.size, -1, dtype=np.int64)
+        validos = j >= 0
+        validos[validos] = ips[validos] < self.fines[j[validos]]
+        resultado[validos] = self.indices[j[validos]]
+        return resultado
+
+    def subred(self, indice):
+        """(plan, número dentro del plan) de la subred `indice`."""
+        k = int(np.searchsorted(self._desplazamientos, indice, side="right")) - 1
+        return self._planes[k], indice - int(self._desplazamientos[k])
+
+    def etiqueta(self, indice):
+        plan, numero = self.subred(indice)
+        return plan.etiqueta(numero)
+
+    def cidr(self, indice):
+        return f"{int_a_ip(int(self.redes[indice]))}/{int(self.prefijos[indice])}"
+
+
+def extraer_ips(datos, columna=0, separador=","):
+    """IP de la columna indicada de cada línea completa de `datos` (bytes).
+
+    Devuelve (ips uint32, validas bool), una entrada por línea.
+    """
+    c = np.frombuffer(datos, dtype=np.uint8)
+    fines_linea = np.flatnonzero(c == _SALTO)
+    if not fines_linea.size:
+        return np.empty(0, dtype=np.uint32), np.empty(0, dtype=bool)
+    inicios_linea = np.concatenate(([0], fines_linea[:-1] + 1))
+
+    # Inicio del campo pedido: tras el separador número `columna` de la línea
+    if columna:
+        # Con un centinela al final, a las líneas sin ese separador les toca uno
+        # que está fuera de la línea
+        separadores = np.append(np.flatnonzero(c == ord(separador)), c.size)
+        k = np.minimum(np.searchsorted(separadores, inicios_linea) + (columna - 1), separadores.size - 1)
+        validas = separadores[k] < fines_linea
+        inicios = np.where(validas, separadores[k] + 1, inicios_linea)
+    else:
+        validas = np.ones(fines_linea.size, dtype=bool)
+        inicios = inicios_linea
+
+    # Ventana de ancho fijo con los caracteres de cada IP y uno más: la IP
+    # llega hasta el primer carácter que no es dígito ni punto
+    relleno = np.concatenate((c, np.zeros(_LARGO_IPV4 + 1, dtype=np.uint8)))
+    ventanas = np.lib.stride_tricks.sliding_window_view(relleno, _LARGO_IPV4 + 1)[inicios]
+    es_punto = ventanas == _PUNTO
+    corte = ~(((ventanas >= 48) & (ventanas <= 57)) | es_punto)
+    largo = np.argmax(corte, axis=1)
+    validas &= largo >= 7  # sin corte en la ventana, argmax da 0
+
+    # Los puntos marcan dónde empieza y termina cada octeto
+    puntos = es_punto & (np.arange(_LARGO_IPV4 + 1) < largo[:, None])
+    validas &= np.count_nonzero(puntos, axis=1) == 3
+    if validas.all():
+        # Caso habitual: se evita copiar las ventanas de las filas válidas
+        filas = slice(None)
+    else:
+        filas = np.flatnonzero(validas)
+        puntos, ventanas, largo = puntos[filas], ventanas[filas], largo[filas]
+    posiciones = (np.flatnonzero(puntos) % (_LARGO_IPV4 + 1)).reshape(-1, 3)
+
+    desde = np.concatenate((np.zeros((posiciones.shape[0], 1), dtype=np.intp), posiciones + 1), axis=1)
+    hasta = np.concatenate((posiciones, largo[:, None]), axis=1)
+    cifras = hasta - desde
+    octetos = np.zeros(cifras.shape, dtype=np.uint32)
+    for i in range(3):
+        digito = np.take_along_axis(ventanas, np.minimum(desde + i, _LARGO_IPV4), axis=1)
+        octetos = np.where(i < cifras, octetos * 10 + (digito - 48), octetos)
+    validas[filas] = np.all((cifras >= 1) & (cifras <= 3) & (octetos <= 255), axis=1)
+
+    ips = np.zeros(fines_linea.size, dtype=np.uint32)
+    ips[filas] = (octetos[:, 0] << 24) | (octetos[:, 1] << 16) | (octetos[:, 2] << 8) | octetos[:, 3]
+    return ips, validas
+
+
+def bloques_archivo(archivo, tamano_bloque=TAMANO_BLOQUE):
+    # Bloques que terminan en salto de línea; la línea cortada pasa al siguiente
+    resto = b""
+    while True:
+        datos = archivo.read(tamano_bloque)
+        if not datos:
+            break
+        corte = datos.rfind(b"\n")
+        if corte < 0:
+            resto += datos
+            continue
+        yield resto + datos[:corte + 1]
+        resto = datos[corte + 1:]
+    if resto:
+        yield resto + b"\n"
+
+
+class Clasificacion:
+    def __init__(self, tabla):
+        self.tabla = tabla
+        self.conteos = np.zeros(len(tabla), dtype=np.int64)
+        self.lineas = 0
+        self.no_validas = 0
+        self.sin_subred = 0
+
+
+def clasificar(archivo, tabla, columna=0, separador=",", al_asignar=None,
+               al_progreso=None, tamano_bloque=TAMANO_BLOQUE):
+    """Cuenta las IP de un archivo binario por subred de la tabla.
+
+    al_asignar(ips, indices) recibe cada bloque ya clasificado (solo líneas
+    válidas; índice -1 = fuera de los planes).
+    """
+    resultado = Clasificacion(tabla)
+    leidos = 0
+    for datos in bloques_archivo(archivo, tamano_bloque):
+        ips, validas = extraer_ips(datos, columna, separador)
+        ips = ips[validas]
+        indices = tabla.buscar(ips)
+        dentro = indices >= 0
+        resultado.conteos += np.bincount(indices[dentro], minlength=len(tabla))
+        resultado.lineas += validas.size
+        resultado.no_validas += int(validas.size - ips.size)
+        resultado.sin_subred += int(ips.size - np.count_nonzero(dentro))
+        if al_asignar:
+            al_asignar(ips, indices)
+        leidos += len(datos)
+        if al_progreso:
+            al_progreso(leidos)
+    return resultado
+
+
+def escribir_conteos(flujo, resultado, todas=False):
+    escritor = csv.writer(flujo, lineterminator="\n")
+    escritor.writerow(["subred", "red", "ips"])
+    tabla = resultado.tabla
+    for indice in (range(len(tabla)) if todas else np.flatnonzero(resultado.conteos).tolist()):
+        escritor.writerow([tabla.etiqueta(indice), tabla.cidr(indice), int(resultado.conteos[indice])])
+    escritor.writerow(["(sin subred)", "", resultado.sin_subred])
+    escritor.writerow(["(no válidas)", "", resultado.no_validas])
+
+
+def escritor_asignaciones(flujo, tabla):
+    # Textos de CIDR por subred creados solo para las subredes que aparecen
+    cidrs = {}
+
+    def escribir(ips, indices):
+        textos = a_texto_ip(ips).tolist()
+        lineas = []
+        for ip, indice in zip(textos, indices.tolist()):
+            if indice not in cidrs:
+                cidrs[indice] = tabla.cidr(indice) if indice >= 0 else ""
+            lineas.append(f"{ip},{cidrs[indice]}\n")
+        flujo.write("".join(lineas))
+
+    flujo.write("ip,red\n")
+    return escribir
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        description="Asigna cada IP de un archivo a su subred (coincidencia por prefijo más largo)."
+    )
+    parser.add_argument("entrada", help="Archivo con una IP por línea o CSV ('-' = stdin)")
+    parser.add_argument("--plan", nargs=3, action="append", required=True,
+                        metavar=("RED", "MODO", "VALOR"),
+                        help="Plan a compilar (modo: subredes, hosts o vlsm); se puede repetir")
+    parser.add_argument("--columna", type=int, default=0, help="Columna con la IP (desde 0)")
+    parser.add_argument("--separador", default=",", help="Separador de columnas")
+    parser.add_argument("--conteos", default="-", help="CSV de conteos por subred ('-' = stdout)")
+    parser.add_argument("--todas", action="store_true", help="Incluir subredes sin IP en los conteos")
+    parser.add_argument("--asignaciones", help="CSV con la subred de cada IP")
+    return parser
+
+
+def main(argv=None):
+    from cli_vlsm import normalizar_modo
+
+    args = crear_parser().parse_args(argv)
+    if len(args.separador) != 1:
+        print("El separador debe ser un único carácter", file=sys.stderr)
+        return 2
+    try:
+        planes = []
+        for red, modo, valor in args.plan:
+            modo = normalizar_modo(modo)
+            planes.append(planificar(red, modo, valor if modo == MODO_VLSM else int(valor)))
+        tabla = TablaPrefijos(planes)
+    except (ErrorPlan, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    entrada = sys.stdin.buffer if args.entrada == "-" else open(args.entrada, "rb")
+    asignaciones = open(args.asignaciones, "w", encoding="utf-8") if args.asignaciones else None
+    try:
+        resultado = clasificar(
+            entrada, tabla, args.columna, args.separador,
+            al_asignar=escritor_asignaciones(asignaciones, tabla) if asignaciones else None
+        )
+    finally:
+        if entrada is not sys.stdin.buffer:
+            entrada.close()
+        if asignaciones:
+            asignaciones.close()
+
+    if args.conteos == "-":
+        escribir_conteos(sys.stdout, resultado, args.todas)
+    else:
+        with open(args.conteos, "w", newline="", encoding="utf-8") as flujo:
+            escribir_conteos(flujo, resultado, args.todas)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+"""Modo por lotes sin interfaz gráfica.
+
+Lee solicitudes de plan (red, modo, valor) en CSV o JSONL desde un archivo o
+la entrada estándar y escribe los resultados en la salida estándar a medida
+que se producen. Ejemplo:
+
+    python cli_vlsm.py sitios.csv --salida jsonl --procesos 8 --desordenado
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from collections import deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from motor_vlsm import MODOS, MODO_SUBREDES, MODO_HOSTS, MODO_VLSM, ErrorPlan, planificar
+from tabla_vectorizada import filas_vectorizadas
+
+# Filas por texto que se escribe o que devuelve un proceso: acota la memoria
+# aunque una sola solicitud genere millones de subredes
+FILAS_POR_BLOQUE = 16384
+
+ALIAS_MODOS = {
+    "subredes": MODO_SUBREDES,
+    "hosts": MODO_HOSTS,
+    "vlsm": MODO_VLSM,
+}
+
+CAMPOS_RESUMEN = [
+    "linea", "red", "modo", "valor", "prefijo", "subredes", "hosts_por_subred",
+    "desperdicio", "libres", "error"
+]
+CAMPOS_SUBREDES = [
+    "linea", "red_padre", "subred", "red", "primera", "ultima", "broadcast",
+    "hosts", "mascara", "prefijo", "wildcard", "error"
+]
+
+
+def normalizar_modo(texto):
+    texto = (texto or "").strip()
+    if texto in MODOS:
+        return texto
+    try:
+        return ALIAS_MODOS[texto.lower()]
+    except KeyError:
+        raise ErrorPlan(f"Modo de cálculo desconocido: {texto}") from None
+
+
+def leer_solicitudes(flujo, formato):
+    if formato == "csv":
+        for linea, fila in enumerate(csv.DictReader(flujo), 2):
+            yield linea, fila
+    else:
+        for linea, texto in enumerate(flujo, 1):
+            if texto.strip():
+                try:
+                    solicitud = json.loads(texto)
+                except ValueError as e:
+                    yield linea, {"error": f"JSON no válido: {e}"}
+                    continue
+                if not isinstance(solicitud, dict):
+                    solicitud = {"error": "Cada línea debe ser un objeto JSON con red, modo y valor"}
+                yield linea, solicitud
+
+
+def plan_de_solicitud(solicitud):
+    if solicitud.get("error"):
+        raise ErrorPlan(solicitud["error"])
+    modo = normalizar_modo(solicitud.get("modo"))
+    valor = solicitud.get("valor")
+    if modo != MODO_VLSM:
+        try:
+            valor = int(valor)
+        except (TypeError, ValueError):
+            raise ErrorPlan("La cantidad debe ser un número entero positivo.") from None
+    return planificar(str(solicitud.get("red") or ""), modo, valor)
+
+
+def registros_solicitud(linea, solicitud, detalle, inicio=0, fin=None):
+    try:
+        plan = plan_de_solicitud(solicitud)
+    except ErrorPlan as e:
+        yield {"linea": linea, "red": solicitud.get("red"), "red_padre": solicitud.get("red"),
+               "modo": solicitud.get("modo"), "valor": solicitud.get("valor"), "error": str(e)}
+        return
+
+    if detalle == "resumen":
+        yield {
+            "linea": linea,
+            "red": plan.cidr,
+            "modo": plan.modo,
+            "valor": plan.valor,
+            "prefijo": getattr(plan, "nuevo_prefijo", None),
+            "subredes": len(plan),
+            "hosts_por_subred": getattr(plan, "hosts_por_subred", None),
+            "desperdicio": plan.desperdicio,
+            "libres": plan.direcciones_libres,
+        }
+        return
+
+    filas = filas_vectorizadas(plan, inicio, fin)
+    for etiqueta, red, primera, ultima, broadcast, hosts, masc, prefijo, wild in filas:
+        yield {
+            "linea": linea, "red_padre": plan.cidr, "subred": etiqueta, "red": red,
+            "primera": primera, "ultima": ultima, "broadcast": broadcast, "hosts": hosts,
+            "mascara": masc, "prefijo": prefijo, "wildcard": wild,
+        }
+
+
+def serializar(registros, formato, campos):
+    salida = io.StringIO()
+    if formato == "csv":
+        escritor = csv.DictWriter(salida, fieldnames=campos, extrasaction="ignore", lineterminator="\n")
+        escritor.writerows(registros)
+    else:
+        for registro in registros:
+            salida.write(json.dumps(registro, ensure_ascii=False))
+            salida.write("\n")
+    return salida.getvalue()
+
+
+def procesar(trabajo, filas=FILAS_POR_BLOQUE):
+    """Textos de `filas` registros como máximo, con (texto, hubo_error)."""
+    linea, solicitud, detalle, formato, inicio, fin = trabajo
+    campos = CAMPOS_RESUMEN if detalle == "resumen" else CAMPOS_SUBREDES
+    registros = registros_solicitud(linea, solicitud, detalle, inicio, fin)
+    while True:
+        bloque = list(islice(registros, filas))
+        if not bloque:
+            return
+        yield serializar(bloque, formato, campos), any(r.get("error") for r in bloque)
+
+
+def procesar_lote(lote):
+    textos = []
+    errores = 0
+    for trabajo in lote:
+        for texto, hubo_error in procesar(trabajo):
+            textos.append(texto)
+            errores += hubo_error
+    return "".join(textos), errores
+
+
+def dividir_trabajos(trabajos, filas=FILAS_POR_BLOQUE):
+    """Parte las solicitudes con muchas subredes en rangos de `filas` filas.
+
+    Devuelve (trabajo, filas del trabajo). El plan se calcula aquí solo para
+    saber cuántas filas tiene; cada proceso lo vuelve a calcular.
+    """
+    for trabajo in trabajos:
+        linea, solicitud, detalle, formato, inicio, fin = trabajo
+        total = 1
+        if detalle == "subredes":
+            try:
+                total = len(plan_de_solicitud(solicitud))
+            except ErrorPlan:
+                pass
+        if total <= filas:
+            yield trabajo, total
+            continue
+        for inicio in range(0, total, filas):
+            fin = min(inicio + filas, total)
+            yield (linea, solicitud, detalle, formato, inicio, fin), fin - inicio
+
+
+def lotes(trabajos, tamano, filas=FILAS_POR_BLOQUE):
+    lote = []
+    filas_lote = 0
+    for trabajo, filas_trabajo in trabajos:
+        lote.append(trabajo)
+        filas_lote += filas_trabajo
+        if len(lote) >= tamano or filas_lote >= filas:
+            yield lote
+            lote = []
+            filas_lote = 0
+    if lote:
+        yield lote
+
+
+def ejecutar(trabajos, procesos=1, ordenado=True, pendientes=None, tamano_lote=64):
+    # Devuelve (texto, errores) por bloque sin cargar en memoria toda la
+    # entrada ni todas las filas de una solicitud
+    if procesos <= 1:
+        for trabajo in trabajos:
+            for texto, hubo_error in procesar(trabajo):
+                yield texto, int(hubo_error)
+        return
+
+    pendientes = pendientes or procesos * 4
+    trabajos = dividir_trabajos(trabajos)
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        if ordenado:
+            en_curso = deque()
+            for lote in lotes(trabajos, tamano_lote):
+                en_curso.append(pool.submit(procesar_lote, lote))
+                if len(en_curso) >= pendientes:
+                    yield en_curso.popleft().result()
+            while en_curso:
+                yield en_curso.popleft().result()
+        else:
+            en_curso = set()
+            for lote in lotes(trabajos, tamano_lote):
+                en_curso.add(pool.submit(procesar_lote, lote))
+                if len(en_curso) >= pendientes:
+                    listos, en_curso = wait(en_curso, return_when=FIRST_COMPLETED)
+                    for futuro in listos:
+                        yield futuro.result()
+            for futuro in wait(en_curso).done:
+                yield futuro.result()
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        description="Cálculo de subnetting por lotes (CSV/JSONL) sin interfaz gráfica."
+    )
+    parser.add_argument("entrada", nargs="?", default="-",
+                        help="Archivo de solicitudes con campos red, modo y valor ('-' = stdin)")
+    parser.add_argument("--entrada-formato", choices=["csv", "jsonl"],
+                        help="Formato de entrada (por defecto, según la extensión; stdin = jsonl)")
+    parser.add_argument("--salida", choices=["csv", "jsonl"], default="jsonl",
+                        help="Formato de salida")
+    parser.add_argument("--detalle", choices=["resumen", "subredes"], default="resumen",
+                        help="Una fila por solicitud o una fila por subred")
+    parser.add_argument("--procesos", type=int, default=1,
+                        help="Procesos en paralelo (0 = uno por CPU)")
+    parser.add_argument("--desordenado", action="store_true",
+                        help="Escribir cada resultado en cuanto esté listo, sin respetar el orden")
+    parser.add_argument("--pendientes", type=int,
+                        help="Máximo de lotes en vuelo (por defecto, 4 por proceso)")
+    parser.add_argument("--lote", type=int, default=64,
+                        help="Solicitudes por tarea enviada a cada proceso")
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    formato = args.entrada_formato
+    if formato is None:
+        formato = "csv" if args.entrada.lower().endswith(".csv") else "jsonl"
+    procesos = args.procesos or os.cpu_count() or 1
+    campos = CAMPOS_RESUMEN if args.detalle == "resumen" else CAMPOS_SUBREDES
+
+    flujo = sys.stdin if args.entrada == "-" else open(args.entrada, newline="", encoding="utf-8")
+    errores = 0
+    try:
+        if args.salida == "csv":
+            sys.stdout.write(",".join(campos) + "\n")
+        trabajos = (
+            (linea, solicitud, args.detalle, args.salida, 0, None)
+            for linea, solicitud in leer_solicitudes(flujo, formato)
+        )
+        resultados = ejecutar(
+            trabajos, procesos, not args.desordenado, args.pendientes, max(1, args.lote)
+        )
+        for texto, errores_lote in resultados:
+            sys.stdout.write(texto)
+            sys.stdout.flush()
+            errores += errores_lote
+    except BrokenPipeError:
+        # La salida se cerró (ej: `| head`): stdout pasa a /dev/null para que
+        # el vaciado al salir no vuelva a fallar
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    finally:
+        if flujo is not sys.stdin:
+            flujo.close()
+
+    if errores:
+        print(f"{errores} solicitudes con error", file=sys.stderr)
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
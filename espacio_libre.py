@@ -0,0 +1,69 @@
+"""Espacio libre y fragmentación de un bloque padre.
+
+Las asignaciones (de un plan, del historial o de una lista importada) se
+tratan como rangos enteros [inicio, fin): se recortan al bloque padre, se
+ordenan y se funden, y los huecos entre ellos se parten en el mínimo número de
+bloques CIDR. Todo es O(n log n) en el número de asignaciones.
+"""
+from collections import namedtuple
+
+from motor_vlsm import ANCHO_IPV4, bloques_cidr, int_a_ip
+from sumarizacion import fundir, fundir_ipv4
+
+AnalisisEspacio = namedtuple(
+    "AnalisisEspacio", "red prefijo ancho total asignadas huecos mayor_prefijo fragmentacion"
+)
+
+
+def fundir_en_padre(red, prefijo, ancho, rangos):
+    """Rangos recortados a [red, red + 2**(ancho - prefijo)), ordenados y fundidos."""
+    fin_padre = red + (1 << (ancho - prefijo))
+    recortados = [
+        (max(inicio, red), min(fin, fin_padre)) for inicio, fin in rangos
+        if inicio < fin_padre and fin > red
+    ]
+    if ancho == ANCHO_IPV4:
+        inicios, fines = fundir_ipv4([r[0] for r in recortados], [r[1] for r in recortados])
+        return list(zip(inicios, fines))
+    return fundir(recortados)
+
+
+def huecos(red, prefijo, ancho, fundidos):
+    """Bloques CIDR libres del padre entre rangos ya fundidos."""
+    cursor = red
+    for inicio, fin in fundidos:
+        if inicio > cursor:
+            yield from bloques_cidr(cursor, inicio, ancho)
+        cursor = max(cursor, fin)
+    yield from bloques_cidr(cursor, red + (1 << (ancho - prefijo)), ancho)
+
+
+def analizar_espacio(red, prefijo, ancho, rangos):
+    fundidos = fundir_en_padre(red, prefijo, ancho, rangos)
+    libres = list(huecos(red, prefijo, ancho, fundidos))
+    total = 1 << (ancho - prefijo)
+    asignadas = sum(fin - inicio for inicio, fin in fundidos)
+    mayor_prefijo = min((p for _, p in libres), default=None)
+    # Fragmentación externa: parte del espacio libre que no está en el mayor bloque
+    if libres:
+        fragmentacion = 1 - (1 << (ancho - mayor_prefijo)) / (total - asignadas)
+    else:
+        fragmentacion = 0.0
+    return AnalisisEspacio(red, prefijo, ancho, total, asignadas, libres, mayor_prefijo, fragmentacion)
+
+
+def texto_analisis(analisis, limite=200):
+    a = analisis
+    libres = a.total - a.asignadas
+    lineas = [
+        f"🕳️ Espacio libre en {int_a_ip(a.red, a.ancho)}/{a.prefijo}:\n",
+        f"  ➤ Direcciones asignadas: {a.asignadas} de {a.total} ({a.asignadas / a.total:.1%})",
+        f"  ➤ Direcciones libres: {libres} en {len(a.huecos)} bloques",
+    ]
+    if a.huecos:
+        lineas.append(f"  ➤ Mayor prefijo asignable: /{a.mayor_prefijo}")
+        lineas.append(f"  ➤ Fragmentación: {a.fragmentacion:.1%}\n")
+        lineas.extend(f"    {int_a_ip(r, a.ancho)}/{p}" for r, p in a.huecos[:limite])
+        if len(a.huecos) > limite:
+            lineas.append(f"    ... y {len(a.huecos) - limite} bloques más")
+    return "\n".join(lineas)
@@ -0,0 +1,261 @@
+"""Exportación de planes a archivos, sin dependencias de interfaz gráfica.
+
+Las filas se generan por bloques con tabla_vectorizada y se escriben en
+cuanto están listas, de modo que la memoria no depende del tamaño del plan.
+"""
+from motor_vlsm import ANCHO_IPV6, ENCABEZADOS, MODO_VLSM, Plan, hosts_en, int_a_ip
+from tabla_vectorizada import filas_vectorizadas
+
+# Límite de filas de una hoja de Excel, contando la fila de encabezados
+FILAS_POR_HOJA = 1048576 - 1
+TITULO_HOJA = "Subnetting VLSM"
+
+# Columnas con direcciones IP que van centradas (1 = primera columna)
+_COLUMNAS_CENTRADAS = (2, 3, 4, 5)
+_ANCHO_IP = len("255.255.255.255")
+_ANCHO_IPV6 = len("ffff:ffff:ffff:ffff:ffff:ffff:ffff:ffff")
+_INTERVALO_PROGRESO = 1000
+
+
+def _estilos_excel(wb):
+    from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+
+    lado = Side(style='thin')
+    borde = Border(left=lado, right=lado, top=lado, bottom=lado)
+    estilos = {
+        "vlsm_encabezado": NamedStyle(
+            name="vlsm_encabezado", font=Font(bold=True, color="FFFFFF"),
+            fill=PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid"),
+            border=borde, alignment=Alignment(horizontal='center')
+        ),
+        "vlsm_celda": NamedStyle(name="vlsm_celda", border=borde),
+        "vlsm_ip": NamedStyle(name="vlsm_ip", border=borde, alignment=Alignment(horizontal='center')),
+    }
+    for estilo in estilos.values():
+        wb.add_named_style(estilo)
+    return estilos
+
+
+def maximos_campos(plan):
+    # Largo máximo de cada campo sin recorrer las filas: las IP tienen tope
+    # fijo y el resto se deduce del plan
+    if isinstance(plan, Plan):
+        etiqueta = len(f"Subred {len(plan)}")
+        hosts = plan.hosts_por_subred
+        prefijo = plan.nuevo_prefijo
+    else:
+        etiqueta = max((len(a[0]) for a in plan.asignaciones), default=0)
+        prefijo = min((a[3] for a in plan.asignaciones), default=plan.ancho)
+        hosts = hosts_en(prefijo, plan.ancho)
+    if plan.ancho == ANCHO_IPV6:
+        ip, broadcast = _ANCHO_IPV6, 1  # IPv6 no tiene broadcast
+    else:
+        ip = broadcast = _ANCHO_IP
+    maximos = [etiqueta, ip, ip, ip, broadcast, len(str(hosts)), ip, len(f"/{prefijo}"), ip]
+    return [max(m, len(e)) for m, e in zip(maximos, ENCABEZADOS)]
+
+
+def anchos_columnas(plan):
+    return [(m + 2) * 1.2 for m in maximos_campos(plan)]
+
+
+def exportar_excel(ruta, plan, al_progreso=None, filas_por_hoja=FILAS_POR_HOJA):
+    """Escribe el plan en modo write-only, abriendo otra hoja al llegar al límite."""
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook(write_only=True)
+    _estilos_excel(wb)
+    anchos = anchos_columnas(plan)
+    total = len(plan)
+
+    def nueva_hoja(numero):
+        ws = wb.create_sheet(TITULO_HOJA if numero == 1 else f"{TITULO_HOJA} ({numero})")
+        # En modo write-only los anchos se fijan antes de escribir filas
+        for columna, ancho in enumerate(anchos, 1):
+            ws.column_dimensions[get_column_letter(columna)].width = ancho
+        encabezados = []
+        for encabezado in ENCABEZADOS:
+            celda = WriteOnlyCell(ws, value=encabezado)
+            celda.style = "vlsm_encabezado"
+            encabezados.append(celda)
+        ws.append(encabezados)
+        # Una celda con estilo por columna; append la serializa al momento,
+        # así que se reutiliza cambiando solo el valor
+        celdas = []
+        for columna in range(1, len(ENCABEZADOS) + 1):
+            celda = WriteOnlyCell(ws)
+            celda.style = "vlsm_ip" if columna in _COLUMNAS_CENTRADAS else "vlsm_celda"
+            celdas.append(celda)
+        return ws, celdas
+
+    # Excel guarda los números como double: los hosts IPv6 perderían precisión
+    hosts_como_texto = plan.ancho == ANCHO_IPV6
+    hoja = 1
+    ws, celdas = nueva_hoja(hoja)
+    en_hoja = 0
+    for numero, fila in enumerate(filas_vectorizadas(plan), 1):
+        if en_hoja == filas_por_hoja:
+            hoja += 1
+            ws, celdas = nueva_hoja(hoja)
+            en_hoja = 0
+        if hosts_como_texto:
+            fila[5] = str(fila[5])
+        for celda, dato in zip(celdas, fila):
+            celda.value = dato
+        ws.append(celdas)
+        en_hoja += 1
+        if al_progreso and numero % _INTERVALO_PROGRESO == 0:
+            al_progreso(numero, total)
+
+    if al_progreso:
+        al_progreso(total, total)
+    wb.save(ruta)
+    return hoja
+
+
+# Reporte PDF: hoja carta apaisada, tabla en Courier dibujada directamente
+# sobre el canvas, una página cada vez
+_MARGEN = 36
+_FUENTE = "Courier"
+_TAMANO_FUENTE = 8
+_ALTO_FILA = 11
+_MAX_ETIQUETA_PDF = 24  # caracteres; los nombres VLSM más largos se recortan
+# El canvas de reportlab guarda todas las páginas en memoria hasta save()
+# (unos 0,5 KB por fila): la tabla completa se corta en este número de filas
+# (~2200 páginas) y el resto se remite al Excel o al reporte solo con resumen
+MAX_FILAS_PDF = 100000
+
+
+def lineas_resumen(plan, fecha):
+    # Resumen en texto plano: las fuentes estándar del PDF no tienen emojis
+    lineas = [
+        f"Fecha: {fecha}",
+        f"Red: {plan.cidr}",
+        f"Modo: {plan.modo} ({plan.valor})" if plan.modo != MODO_VLSM else f"Modo: {plan.modo}",
+        f"Subredes: {len(plan)}",
+    ]
+    if isinstance(plan, Plan):
+        lineas.append(f"Prefijo: /{plan.nuevo_prefijo} ({plan.hosts_por_subred} hosts por subred)")
+    lineas.append(f"Desperdicio: {plan.desperdicio} hosts")
+    lineas.append(f"Direcciones libres: {plan.direcciones_libres}")
+    if plan.modo == MODO_VLSM and plan.rechazados:
+        lineas.append(f"Sin espacio ({len(plan.rechazados)}):")
+        lineas.extend(f"  {nombre} ({hosts} hosts)" for nombre, hosts in plan.rechazados)
+    if plan.libres:
+        lineas.append(f"Espacio sin asignar ({len(plan.libres)} bloques):")
+        lineas.extend(f"  {int_a_ip(red, plan.ancho)}/{p}" for red, p in plan.libres)
+    return lineas
+
+
+def exportar_pdf(ruta, plan, fecha, al_progreso=None, solo_resumen=False, max_filas=MAX_FILAS_PDF):
+    """Dibuja el resumen y la tabla de subredes página a página; devuelve las páginas.
+
+    La tabla se corta en max_filas filas con una nota al final.
+    """
+    from reportlab.lib.pagesizes import landscape, letter
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    from reportlab.pdfgen import canvas
+
+    ancho, alto = landscape(letter)
+    c = canvas.Canvas(ruta, pagesize=(ancho, alto), pageCompression=1)
+    c.setTitle(f"Reporte de Subnetting VLSM - {plan.cidr}")
+
+    maximos = maximos_campos(plan)
+    maximos[0] = min(maximos[0], _MAX_ETIQUETA_PDF)
+    # Las tablas IPv6 son más anchas: se reduce la fuente hasta que quepan
+    caracteres = sum(m + 2 for m in maximos)
+    tamano_fuente = min(_TAMANO_FUENTE, (ancho - 2 * _MARGEN) / (caracteres * stringWidth("0", _FUENTE, 1)))
+    alto_fila = _ALTO_FILA * tamano_fuente / _TAMANO_FUENTE
+    ancho_car = stringWidth("0", _FUENTE, tamano_fuente)
+    columnas = [(m + 2) * ancho_car for m in maximos]
+    x_columnas = [_MARGEN]
+    for ancho_col in columnas:
+        x_columnas.append(x_columnas[-1] + ancho_col)
+    ancho_tabla = x_columnas[-1] - _MARGEN
+    formato_fila = "".join(f"{{:<{m + 2}}}" for m in maximos[:-1]) + "{}"
+    paginas = [0]
+
+    def iniciar_pagina():
+        paginas[0] += 1
+        c.setFont("Helvetica-Bold", 14)
+        c.drawCentredString(ancho / 2, alto - _MARGEN - 14, "Reporte de Subnetting VLSM")
+        c.setFont("Helvetica", 8)
+        c.drawRightString(ancho - _MARGEN, _MARGEN / 2, f"Página {paginas[0]}")
+        c.drawString(_MARGEN, _MARGEN / 2, f"{plan.cidr} - {fecha}")
+        return alto - _MARGEN - 40
+
+    def cerrar_pagina():
+        c.showPage()
+
+    # Resumen
+    y = iniciar_pagina()
+    c.setFont(_FUENTE, 10)
+    for linea in lineas_resumen(plan, fecha):
+        if y < _MARGEN + 12:
+            cerrar_pagina()
+            y = iniciar_pagina()
+            c.setFont(_FUENTE, 10)
+        c.drawString(_MARGEN, y, linea)
+        y -= 12
+
+    total = min(len(plan), max_filas)
+    if solo_resumen or not total:
+        cerrar_pagina()
+        c.save()
+        return paginas[0]
+
+    def encabezado_tabla(y):
+        c.setFillColorRGB(0.31, 0.506, 0.741)  # mismo azul que el encabezado de Excel
+        c.rect(_MARGEN, y - 3, ancho_tabla, alto_fila, stroke=0, fill=1)
+        c.setFillColorRGB(1, 1, 1)
+        c.setFont(_FUENTE + "-Bold", tamano_fuente)
+        for x, texto in zip(x_columnas, ENCABEZADOS):
+            c.drawString(x + ancho_car, y, texto)
+        c.setFillColorRGB(0, 0, 0)
+        c.setFont(_FUENTE, tamano_fuente)
+        return y - alto_fila
+
+    def rejilla(y_encabezado, y_ultima):
+        # Líneas de la tabla de una página, de la fila de encabezados a la última
+        arriba = y_encabezado - 3 + alto_fila
+        abajo = y_ultima - 3
+        c.setLineWidth(0.25)
+        y = arriba
+        while y >= abajo - 0.01:
+            c.line(_MARGEN, y, _MARGEN + ancho_tabla, y)
+            y -= alto_fila
+        for x in x_columnas:
+            c.line(x, arriba, x, abajo)
+
+    y -= alto_fila
+    y_tabla = y
+    y = encabezado_tabla(y)
+    for numero, fila in enumerate(filas_vectorizadas(plan, 0, total), 1):
+        if y < _MARGEN:
+            rejilla(y_tabla, y + alto_fila)
+            cerrar_pagina()
+            y_tabla = iniciar_pagina()
+            y = encabezado_tabla(y_tabla)
+        if len(fila[0]) > _MAX_ETIQUETA_PDF:
+            fila[0] = fila[0][:_MAX_ETIQUETA_PDF - 1] + "~"
+        # Courier es monoespaciada: una sola cadena por fila, con cada campo
+        # rellenado al ancho de su columna
+        c.drawString(_MARGEN + ancho_car, y, formato_fila.format(*fila))
+        y -= alto_fila
+        if al_progreso and numero % _INTERVALO_PROGRESO == 0:
+            al_progreso(numero, total)
+
+    rejilla(y_tabla, y + alto_fila)
+    if total < len(plan):
+        if y < _MARGEN:
+            cerrar_pagina()
+            y = iniciar_pagina()
+        c.setFont(_FUENTE, 10)
+        c.drawString(_MARGEN, y - 6, f"... y {len(plan) - total} subredes más: exporte a Excel para la tabla completa.")
+    cerrar_pagina()
+    if al_progreso:
+        al_progreso(total, total)
+    c.save()
+    return paginas[0]
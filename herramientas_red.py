@@ -0,0 +1,489 @@
+"""Herramientas de red concurrentes sin dependencias de interfaz gráfica.
+
+El escáner de puertos usa asyncio con un número fijo de sondas en vuelo,
+límite de tasa opcional por host y tiempo de espera por conexión. Solo
+informa los puertos abiertos. El barrido de ping usa el mismo esquema con
+ICMP sin privilegios, el comando ping del sistema o conexiones TCP. La
+resolución DNS masiva usa un pool de hilos y una caché con TTL que también
+guarda las respuestas negativas.
+"""
+import asyncio
+import errno
+import ipaddress
+import itertools
+import platform
+import re
+import shutil
+import socket
+import struct
+import threading
+import time
+from collections import namedtuple, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from motor_vlsm import ANCHO_IPV4, int_a_ip
+
+CONCURRENCIA_ESCANEO = 500
+TIMEOUT_ESCANEO = 0.5
+
+CONCURRENCIA_PING = 128
+TIMEOUT_PING = 1.0
+PUERTOS_TCP_PING = (80, 443, 22, 445, 3389)
+
+HILOS_DNS = 32
+TTL_DNS = 300
+TTL_NEGATIVO_DNS = 60
+
+PuertoAbierto = namedtuple("PuertoAbierto", "host puerto servicio latencia")
+ResultadoPing = namedtuple("ResultadoPing", "host vivo rtt metodo")
+ResultadoDNS = namedtuple("ResultadoDNS", "consulta respuesta error desde_cache")
+
+
+def nombre_servicio(puerto):
+    try:
+        return socket.getservbyport(puerto, "tcp")
+    except OSError:
+        return "?"
+
+
+def familia(host):
+    return socket.AF_INET6 if ipaddress.ip_address(host).version == 6 else socket.AF_INET
+
+
+def clave_ip(host):
+    # IPv4 antes que IPv6; los objetos de versiones distintas no se comparan
+    ip = ipaddress.ip_address(host)
+    return ip.version, int(ip)
+
+
+def hosts_de_plan(plan, indice=None, max_hosts=65536):
+    # Hosts utilizables de una subred del plan, o de todo el plan si indice es None
+    subredes = [plan[indice]] if indice is not None else plan
+    hosts = []
+    for red, prefijo in subredes:
+        tamano = 1 << (plan.ancho - prefijo)
+        if plan.ancho != ANCHO_IPV4:
+            # IPv6 no reserva red ni broadcast
+            inicio, fin = red, red + tamano
+        elif tamano > 2:
+            inicio, fin = red + 1, red + tamano - 1
+        else:
+            inicio, fin = red, red + tamano
+        if len(hosts) + fin - inicio > max_hosts:
+            raise ValueError(f"Demasiados hosts para el barrido (máximo {max_hosts}).")
+        hosts.extend(int_a_ip(n, plan.ancho) for n in range(inicio, fin))
+    return hosts
+
+
+def expandir_hosts(texto, max_hosts=65536):
+    # Admite IPs y redes CIDR separadas por comas o espacios
+    hosts = []
+    for parte in texto.replace(",", " ").split():
+        if "/" in parte:
+            red = ipaddress.ip_network(parte, strict=False)
+            candidatos = red.hosts() if red.num_addresses > 2 else iter(red)
+            for ip in candidatos:
+                hosts.append(str(ip))
+                if len(hosts) > max_hosts:
+                    break
+        else:
+            hosts.append(str(ipaddress.ip_address(parte)))
+        if len(hosts) > max_hosts:
+            raise ValueError(f"Demasiados hosts para escanear (máximo {max_hosts}).")
+    if not hosts:
+        raise ValueError("No se indicó ningún host.")
+    return hosts
+
+
+class LimitadorTasa:
+    """Cubeta de fichas: como mucho `tasa` conexiones por segundo."""
+
+    def __init__(self, tasa, rafaga=None):
+        self.tasa = float(tasa)
+        self.capacidad = float(rafaga or max(1.0, tasa))
+        self.fichas = self.capacidad
+        self.ultimo = time.monotonic()
+        self._candado = asyncio.Lock()
+
+    async def adquirir(self):
+        async with self._candado:
+            while True:
+                ahora = time.monotonic()
+                self.fichas = min(self.capacidad, self.fichas + (ahora - self.ultimo) * self.tasa)
+                self.ultimo = ahora
+                if self.fichas >= 1:
+                    self.fichas -= 1
+                    return
+                await asyncio.sleep((1 - self.fichas) / self.tasa)
+
+
+async def sondear_puerto(host, puerto, timeout=TIMEOUT_ESCANEO):
+    # Devuelve la latencia de conexión en segundos, o None si no está abierto
+    loop = asyncio.get_running_loop()
+    s = socket.socket(familia(host), socket.SOCK_STREAM)
+    s.setblocking(False)
+    inicio = time.perf_counter()
+    try:
+        await asyncio.wait_for(loop.sock_connect(s, (host, puerto)), timeout)
+        return time.perf_counter() - inicio
+    except (OSError, asyncio.TimeoutError):
+        return None
+    finally:
+        s.close()
+
+
+async def escanear(hosts, puertos, concurrencia=CONCURRENCIA_ESCANEO, timeout=TIMEOUT_ESCANEO,
+                   tasa_por_host=None, al_abierto=None, al_progreso=None):
+    hosts = list(hosts)
+    puertos = list(puertos)
+    total = len(hosts) * len(puertos)
+    limitadores = {h: LimitadorTasa(tasa_por_host) for h in hosts} if tasa_por_host else {}
+    # Se alternan los hosts para que el límite por host no frene a los demás
+    sondas = ((h, p) for p in puertos for h in hosts)
+    abiertos = []
+    hechas = 0
+
+    async def trabajador():
+        nonlocal hechas
+        for host, puerto in sondas:
+            if limitadores:
+                await limitadores[host].adquirir()
+            latencia = await sondear_puerto(host, puerto, timeout)
+            hechas += 1
+            if latencia is not None:
+                resultado = PuertoAbierto(host, puerto, nombre_servicio(puerto), latencia)
+                abiertos.append(resultado)
+                if al_abierto:
+                    al_abierto(resultado)
+            if al_progreso:
+                al_progreso(hechas, total)
+
+    trabajadores = [asyncio.ensure_future(trabajador()) for _ in range(max(1, min(concurrencia, total)))]
+    try:
+        await asyncio.gather(*trabajadores)
+    finally:
+        for t in trabajadores:
+            t.cancel()
+    abiertos.sort(key=lambda r: (clave_ip(r.host), r.puerto))
+    return abiertos
+
+
+def escanear_puertos(hosts, puertos, **opciones):
+    return asyncio.run(escanear(hosts, puertos, **opciones))
+
+
+def _suma_verificacion(datos):
+    if len(datos) % 2:
+        datos += b"\0"
+    suma = sum(struct.unpack(f"!{len(datos) // 2}H", datos))
+    suma = (suma >> 16) + (suma & 0xFFFF)
+    suma += suma >> 16
+    return ~suma & 0xFFFF
+
+
+def _eco_icmp(secuencia, tipo=8):
+    # En ICMPv6 (tipo 128) la suma la calcula el núcleo
+    datos = b"vlsm-barrido"
+    cabecera = struct.pack("!BBHHH", tipo, 0, 0, 0, secuencia)
+    suma = _suma_verificacion(cabecera + datos)
+    return struct.pack("!BBHHH", tipo, 0, suma, 0, secuencia) + datos
+
+
+def _icmp_de_familia(familia_ip):
+    # (protocolo, tipo de solicitud, tipo de respuesta) del eco de cada familia
+    if familia_ip == socket.AF_INET6:
+        return getattr(socket, "IPPROTO_ICMPV6", 58), 128, 129
+    return socket.IPPROTO_ICMP, 8, 0
+
+
+def _es_respuesta_eco(datos, tipo_respuesta, secuencia):
+    # macOS entrega las respuestas ICMPv4 de datagrama con la cabecera IP delante
+    if datos and datos[0] >> 4 == 4:
+        datos = datos[(datos[0] & 0x0F) * 4:]
+    # El núcleo reescribe el identificador; basta con el tipo y la secuencia
+    return len(datos) >= 8 and datos[0] == tipo_respuesta and struct.unpack("!H", datos[6:8])[0] == secuencia
+
+
+def icmp_permitido(familia_ip=socket.AF_INET):
+    # Sockets ICMP de datagrama: Linux los permite sin root según ping_group_range
+    # (el de IPv6 puede no estar disponible aunque el de IPv4 sí)
+    try:
+        socket.socket(familia_ip, socket.SOCK_DGRAM, _icmp_de_familia(familia_ip)[0]).close()
+        return True
+    except (OSError, AttributeError):
+        return False
+
+
+def metodo_ping_disponible(hosts=()):
+    familias = {familia(h) for h in hosts} or {socket.AF_INET}
+    if all(icmp_permitido(f) for f in familias):
+        return "icmp"
+    if shutil.which("ping"):
+        return "ping"
+    return "tcp"
+
+
+async def ping_icmp(host, timeout=TIMEOUT_PING, secuencia=1):
+    loop = asyncio.get_running_loop()
+    protocolo, solicitud, tipo_respuesta = _icmp_de_familia(familia(host))
+    try:
+        s = socket.socket(familia(host), socket.SOCK_DGRAM, protocolo)
+    except OSError:
+        return None
+    s.setblocking(False)
+    inicio = time.perf_counter()
+    try:
+        s.connect((host, 0))
+        await loop.sock_sendall(s, _eco_icmp(secuencia, solicitud))
+        limite = inicio + timeout
+        while True:
+            restante = limite - time.perf_counter()
+            if restante <= 0:
+                return None
+            respuesta = await asyncio.wait_for(loop.sock_recv(s, 1024), restante)
+            if _es_respuesta_eco(respuesta, tipo_respuesta, secuencia):
+                return time.perf_counter() - inicio
+    except (OSError, asyncio.TimeoutError):
+        return None
+    finally:
+        s.close()
+
+
+_RTT_PING = re.compile(r"(?:time|tiempo)[=<]\s*([\d.,]+)\s*ms", re.IGNORECASE)
+
+
+def _comando_ping(host, timeout):
+    sistema = platform.system()
+    if sistema == "Windows":
+        return ["ping", "-n", "1", "-w", str(int(timeout * 1000)), host]
+    if sistema == "Darwin":
+        return ["ping", "-c", "1", "-W", str(int(timeout * 1000)), host]
+    return ["ping", "-c", "1", "-W", str(max(1, round(timeout))), host]
+
+
+async def ping_comando(host, timeout=TIMEOUT_PING):
+    inicio = time.perf_counter()
+    proceso = await asyncio.create_subprocess_exec(
+        *_comando_ping(host, timeout),
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+    )
+    try:
+        salida, _ = await asyncio.wait_for(proceso.communicate(), timeout + 1)
+    except asyncio.TimeoutError:
+        proceso.kill()
+        await proceso.wait()
+        return None
+    if proceso.returncode != 0:
+        return None
+    coincidencia = _RTT_PING.search(salida.decode(errors="replace"))
+    if coincidencia:
+        return float(coincidencia.group(1).replace(",", ".")) / 1000
+    return time.perf_counter() - inicio
+
+
+async def ping_tcp(host, timeout=TIMEOUT_PING, puertos=PUERTOS_TCP_PING):
+    # Un rechazo de conexión también demuestra que el host está vivo
+    loop = asyncio.get_running_loop()
+
+    async def intentar(puerto):
+        s = socket.socket(familia(host), socket.SOCK_STREAM)
+        s.setblocking(False)
+        inicio = time.perf_counter()
+        try:
+            await loop.sock_connect(s, (host, puerto))
+        except ConnectionRefusedError:
+            pass
+        except OSError as e:
+            if e.errno != errno.ECONNREFUSED:
+                raise
+        finally:
+            s.close()
+        return time.perf_counter() - inicio
+
+    intentos = [asyncio.ensure_future(intentar(p)) for p in puertos]
+    try:
+        for completado in asyncio.as_completed(intentos, timeout=timeout):
+            try:
+                return await completado
+            except OSError:
+                continue
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        for intento in intentos:
+            intento.cancel()
+    return None
+
+
+async def barrer_ping(hosts, concurrencia=CONCURRENCIA_PING, timeout=TIMEOUT_PING, metodo="auto",
+                      respaldo_tcp=True, al_resultado=None, al_progreso=None):
+    hosts = list(hosts)
+    if metodo == "auto":
+        metodo = metodo_ping_disponible(hosts)
+    sondas = {"icmp": ping_icmp, "ping": ping_comando, "tcp": ping_tcp}
+    sonda = sondas[metodo]
+    pendientes = iter(hosts)
+    secuencias = itertools.count(1)
+    resultados = []
+
+    async def trabajador():
+        for host in pendientes:
+            usado = metodo
+            if metodo == "icmp":
+                rtt = await sonda(host, timeout, next(secuencias) & 0xFFFF)
+            else:
+                rtt = await sonda(host, timeout)
+            if rtt is None and respaldo_tcp and metodo != "tcp":
+                rtt = await ping_tcp(host, timeout)
+                usado = "tcp"
+            resultado = ResultadoPing(host, rtt is not None, rtt, usado if rtt is not None else metodo)
+            resultados.append(resultado)
+            if al_resultado:
+                al_resultado(resultado)
+            if al_progreso:
+                al_progreso(len(resultados), len(hosts))
+
+    trabajadores = [asyncio.ensure_future(trabajador()) for _ in range(max(1, min(concurrencia, len(hosts))))]
+    try:
+        await asyncio.gather(*trabajadores)
+    finally:
+        for t in trabajadores:
+            t.cancel()
+    resultados.sort(key=lambda r: clave_ip(r.host))
+    return resultados
+
+
+def barrido_ping(hosts, **opciones):
+    return asyncio.run(barrer_ping(hosts, **opciones))
+
+
+class CacheTTL:
+    """Caché en memoria con vencimiento por entrada y tamaño máximo (LRU)."""
+
+    def __init__(self, ttl=TTL_DNS, ttl_negativo=TTL_NEGATIVO_DNS, max_entradas=100000,
+                 reloj=time.monotonic):
+        self.ttl = ttl
+        self.ttl_negativo = ttl_negativo
+        self.max_entradas = max_entradas
+        self.reloj = reloj
+        self._entradas = OrderedDict()
+        self._candado = threading.Lock()
+
+    def obtener(self, clave):
+        # Devuelve (encontrado, valor, error)
+        with self._candado:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return False, None, None
+            vence, valor, error = entrada
+            if vence <= self.reloj():
+                del self._entradas[clave]
+                return False, None, None
+            self._entradas.move_to_end(clave)
+            return True, valor, error
+
+    def guardar(self, clave, valor, error=None):
+        ttl = self.ttl_negativo if error else self.ttl
+        with self._candado:
+            self._entradas[clave] = (self.reloj() + ttl, valor, error)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def limpiar(self):
+        with self._candado:
+            self._entradas.clear()
+
+    def __len__(self):
+        return len(self._entradas)
+
+
+def _directo_sistema(nombre):
+    return socket.gethostbyname_ex(nombre)[2]
+
+
+def _inverso_sistema(ip):
+    return socket.gethostbyaddr(ip)[0]
+
+
+def resolutores_archivo_hosts(ruta):
+    # Funciones (directo, inverso) que consultan un archivo con formato /etc/hosts
+    directo = {}
+    inverso = {}
+    with open(ruta, encoding="utf-8") as archivo:
+        for linea in archivo:
+            campos = linea.split("#", 1)[0].split()
+            if len(campos) < 2:
+                continue
+            ip, nombres = campos[0], campos[1:]
+            inverso.setdefault(ip, nombres[0])
+            for nombre in nombres:
+                directo.setdefault(nombre.lower(), []).append(ip)
+
+    def resolver_directo(nombre):
+        try:
+            return list(directo[nombre.lower()])
+        except KeyError:
+            raise socket.gaierror(socket.EAI_NONAME, f"{nombre} no está en {ruta}") from None
+
+    def resolver_inverso(ip):
+        try:
+            return inverso[ip]
+        except KeyError:
+            raise socket.herror(1, f"{ip} no está en {ruta}") from None
+
+    return resolver_directo, resolver_inverso
+
+
+class ResolutorDNS:
+    def __init__(self, cache=None, hilos=HILOS_DNS, directo=None, inverso=None):
+        self.cache = cache if cache is not None else CacheTTL()
+        self.hilos = hilos
+        self._directo = directo or _directo_sistema
+        self._inverso = inverso or _inverso_sistema
+
+    def _consultar(self, tipo, consulta):
+        clave = (tipo, consulta)
+        encontrado, valor, error = self.cache.obtener(clave)
+        if encontrado:
+            return ResultadoDNS(consulta, valor, error, True)
+        funcion = self._inverso if tipo == "PTR" else self._directo
+        try:
+            valor, error = funcion(consulta), None
+        except (OSError, UnicodeError) as e:
+            valor, error = None, str(e) or type(e).__name__
+        self.cache.guardar(clave, valor, error)
+        return ResultadoDNS(consulta, valor, error, False)
+
+    def inverso(self, ip):
+        return self._consultar("PTR", ip)
+
+    def directo(self, nombre):
+        return self._consultar("A", nombre)
+
+    def resolver_masivo(self, consultas, inverso=True, al_resultado=None, al_progreso=None):
+        consultas = list(consultas)
+        tipo = "PTR" if inverso else "A"
+        resultados = []
+        # Sin "with": al salir del bloque se esperarían todas las consultas en vuelo
+        pool = ThreadPoolExecutor(max_workers=max(1, min(self.hilos, len(consultas))))
+        futuros = [pool.submit(self._consultar, tipo, c) for c in consultas]
+        try:
+            for futuro in as_completed(futuros):
+                resultado = futuro.result()
+                resultados.append(resultado)
+                if al_resultado:
+                    al_resultado(resultado)
+                if al_progreso:
+                    al_progreso(len(resultados), len(consultas))
+        except BaseException:
+            # Cancelación desde un callback: se descartan las pendientes y no se
+            # espera a las que ya están en curso (cancel_futures solo existe desde 3.9)
+            for futuro in futuros:
+                futuro.cancel()
+            pool.shutdown(wait=False)
+            raise
+        pool.shutdown()
+        orden = {c: i for i, c in enumerate(consultas)}
+        resultados.sort(key=lambda r: orden[r.consulta])
+        return resultados
@@ -0,0 +1,211 @@
+"""Historial de cálculos en SQLite.
+
+Cada cálculo se guarda como una fila con sus parámetros y un resumen corto;
+las subredes se reconstruyen con el motor al recargarlo. La base funciona en
+modo WAL, solo se añaden filas, y las consultas de la lista van paginadas por
+los índices de fecha y red.
+
+La tabla de bloques guarda los rangos asignados por cada cálculo y por los
+inventarios importados, para el índice de solapamientos (indice_ipam).
+"""
+import json
+import sqlite3
+
+from indice_ipam import etiqueta_calculo, etiqueta_inventario, rangos_plan
+from motor_vlsm import ANCHO_IPV4, MODO_VLSM, ErrorPlan, int_a_ip, parsear_red, planificar
+
+TAMANO_PAGINA = 200
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS calculos (
+    id INTEGER PRIMARY KEY,
+    fecha TEXT NOT NULL,
+    red TEXT NOT NULL,
+    red_int INTEGER,
+    prefijo INTEGER,
+    modo TEXT NOT NULL,
+    valor TEXT NOT NULL,
+    subredes INTEGER,
+    resumen TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_calculos_fecha ON calculos (fecha);
+CREATE INDEX IF NOT EXISTS idx_calculos_red ON calculos (red_int, prefijo);
+CREATE TABLE IF NOT EXISTS bloques (
+    id INTEGER PRIMARY KEY,
+    calculo_id INTEGER,
+    dueno TEXT NOT NULL,
+    ancho INTEGER NOT NULL,
+    inicio TEXT NOT NULL,
+    fin TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_bloques_calculo ON bloques (calculo_id);
+"""
+
+_COLUMNAS = "id, fecha, red, modo, valor, subredes, resumen"
+
+
+def _hex(n):
+    # Los extremos IPv6 tampoco caben en un INTEGER de SQLite
+    return format(n, "x")
+
+
+def clave_red(texto):
+    # SQLite solo guarda enteros de 64 bits: las redes IPv6 se indexan por su
+    # texto normalizado en la misma columna
+    try:
+        red, prefijo, ancho = parsear_red(texto)
+    except ErrorPlan:
+        return None, None
+    return (red if ancho == ANCHO_IPV4 else int_a_ip(red, ancho)), prefijo
+
+
+class HistorialDB:
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.conexion = sqlite3.connect(ruta)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        nueva_tabla_bloques = not self.conexion.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'bloques'"
+        ).fetchone()
+        self.conexion.executescript(_ESQUEMA)
+        if nueva_tabla_bloques:
+            self.completar_bloques()
+
+    @staticmethod
+    def _a_entrada(fila):
+        id_, fecha, red, modo, valor, subredes, resumen = fila
+        if modo != MODO_VLSM:
+            try:
+                valor = int(valor)
+            except ValueError:
+                pass
+        return {
+            "id": id_, "fecha": fecha, "red": red, "modo": modo,
+            "valor": valor, "subredes": subredes, "resumen": resumen
+        }
+
+    def agregar(self, fecha, red, modo, valor, subredes=None, resumen="", rangos=(), ancho=ANCHO_IPV4):
+        red_int, prefijo = clave_red(red)
+        with self.conexion:
+            cursor = self.conexion.execute(
+                "INSERT INTO calculos (fecha, red, red_int, prefijo, modo, valor, subredes, resumen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (fecha, red, red_int, prefijo, modo, str(valor), subredes, resumen)
+            )
+            self._agregar_bloques(cursor.lastrowid, etiqueta_calculo(cursor.lastrowid, red), ancho, rangos)
+        return cursor.lastrowid
+
+    def _agregar_bloques(self, calculo_id, dueno, ancho, rangos):
+        self.conexion.executemany(
+            "INSERT INTO bloques (calculo_id, dueno, ancho, inicio, fin) VALUES (?, ?, ?, ?, ?)",
+            ((calculo_id, dueno, ancho, _hex(inicio), _hex(fin)) for inicio, fin in rangos)
+        )
+
+    def completar_bloques(self):
+        # Cálculos guardados antes de existir la tabla de bloques: se
+        # reconstruyen sus planes una sola vez
+        pendientes = self.conexion.execute(
+            f"SELECT {_COLUMNAS} FROM calculos WHERE id NOT IN "
+            "(SELECT calculo_id FROM bloques WHERE calculo_id IS NOT NULL)"
+        ).fetchall()
+        with self.conexion:
+            for fila in pendientes:
+                entrada = self._a_entrada(fila)
+                try:
+                    plan = planificar(entrada["red"], entrada["modo"], entrada["valor"])
+                except (ErrorPlan, TypeError):
+                    continue
+                self._agregar_bloques(
+                    entrada["id"], etiqueta_calculo(entrada["id"], entrada["red"]),
+                    plan.ancho, rangos_plan(plan)
+                )
+        return len(pendientes)
+
+    def agregar_inventario(self, origen, redes):
+        """Guarda las redes (nombre, red, prefijo, ancho) de un inventario importado."""
+        bloques = []
+        for nombre, red, prefijo, ancho in redes:
+            cidr = f"{int_a_ip(red, ancho)}/{prefijo}"
+            bloques.append((etiqueta_inventario(origen, nombre, cidr), ancho, red, red + (1 << (ancho - prefijo))))
+        with self.conexion:
+            self.conexion.executemany(
+                "INSERT INTO bloques (calculo_id, dueno, ancho, inicio, fin) VALUES (NULL, ?, ?, ?, ?)",
+                ((dueno, ancho, _hex(inicio), _hex(fin)) for dueno, ancho, inicio, fin in bloques)
+            )
+        return bloques
+
+    def iterar_bloques(self):
+        """(dueño, ancho, inicio, fin) de cada rango guardado."""
+        for dueno, ancho, inicio, fin in self.conexion.execute(
+            "SELECT dueno, ancho, inicio, fin FROM bloques ORDER BY id"
+        ):
+            yield dueno, ancho, int(inicio, 16), int(fin, 16)
+
+    def contar(self):
+        return self.conexion.execute("SELECT COUNT(*) FROM calculos").fetchone()[0]
+
+    def pagina(self, antes_de=None, limite=TAMANO_PAGINA):
+        # Paginación por clave (id descendente): coste constante en cualquier página
+        if antes_de is None:
+            filas = self.conexion.execute(
+                f"SELECT {_COLUMNAS} FROM calculos ORDER BY id DESC LIMIT ?", (limite,)
+            )
+        else:
+            filas = self.conexion.execute(
+                f"SELECT {_COLUMNAS} FROM calculos WHERE id < ? ORDER BY id DESC LIMIT ?",
+                (antes_de, limite)
+            )
+        return [self._a_entrada(f) for f in filas]
+
+    def obtener(self, id_):
+        fila = self.conexion.execute(
+            f"SELECT {_COLUMNAS} FROM calculos WHERE id = ?", (id_,)
+        ).fetchone()
+        return self._a_entrada(fila) if fila else None
+
+    def entre_fechas(self, desde, hasta):
+        filas = self.conexion.execute(
+            f"SELECT {_COLUMNAS} FROM calculos WHERE fecha BETWEEN ? AND ? ORDER BY fecha",
+            (desde, hasta)
+        )
+        return [self._a_entrada(f) for f in filas]
+
+    def por_red(self, red):
+        red_int, prefijo = clave_red(red)
+        if red_int is None:
+            raise ErrorPlan(f"Red no válida: {red}")
+        filas = self.conexion.execute(
+            f"SELECT {_COLUMNAS} FROM calculos WHERE red_int = ? AND prefijo = ? ORDER BY id DESC",
+            (red_int, prefijo)
+        )
+        return [self._a_entrada(f) for f in filas]
+
+    def iterar(self):
+        for fila in self.conexion.execute(f"SELECT {_COLUMNAS} FROM calculos ORDER BY id"):
+            yield self._a_entrada(fila)
+
+    def limpiar(self):
+        # Los inventarios importados no forman parte del historial
+        with self.conexion:
+            self.conexion.execute("DELETE FROM calculos")
+            self.conexion.execute("DELETE FROM bloques WHERE calculo_id IS NOT NULL")
+
+    def importar_json(self, texto):
+        # Migración del historial antiguo guardado como JSON en QSettings;
+        # el texto completo del resultado no se conserva
+        entradas = json.loads(texto or "[]")
+        with self.conexion:
+            for entrada in entradas:
+                red_int, prefijo = clave_red(entrada["red"])
+                self.conexion.execute(
+                    "INSERT INTO calculos (fecha, red, red_int, prefijo, modo, valor) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (entrada["fecha"], entrada["red"], red_int, prefijo, entrada["modo"],
+                     str(entrada["valor"]))
+                )
+        self.completar_bloques()
+        return len(entradas)
+
+    def cerrar(self):
+        self.conexion.close()
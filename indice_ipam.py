@@ -0,0 +1,156 @@
+"""Índice de solapamientos entre los planes guardados (IPAM).
+
+Los rangos asignados por cada cálculo del historial y por los inventarios
+importados se guardan como segmentos ordenados y disjuntos, cada uno con el
+conjunto de dueños que lo cubren. Comprobar un plan de k rangos cuesta
+O(k log n) más los conflictos encontrados, y añadir uno solo modifica los
+segmentos que toca: el índice nunca se reconstruye.
+"""
+import bisect
+
+from motor_vlsm import ANCHO_IPV4, ErrorPlan, Plan, int_a_ip, parsear_red
+
+
+def etiqueta_calculo(id_, red):
+    return f"Historial #{id_} ({red})"
+
+
+def etiqueta_inventario(origen, nombre, red):
+    return f"{origen}: {nombre} ({red})" if nombre else f"{origen}: {red}"
+
+
+def rangos_plan(plan):
+    """Rangos [inicio, fin) ocupados por el plan, unidos cuando son contiguos."""
+    if isinstance(plan, Plan):
+        # La subdivisión fija ocupa un único tramo desde el inicio de la red
+        return [(plan.red, plan.red + plan.cantidad * plan.paso)] if plan.cantidad else []
+    rangos = []
+    for red, prefijo in plan:
+        fin = red + (1 << (plan.ancho - prefijo))
+        if rangos and rangos[-1][1] == red:
+            rangos[-1] = (rangos[-1][0], fin)
+        else:
+            rangos.append((red, fin))
+    return rangos
+
+
+def leer_inventario(texto):
+    """Redes de un inventario: una por línea, "red" o "red,nombre" (CSV)."""
+    redes = []
+    for numero, linea in enumerate(texto.splitlines(), 1):
+        linea = linea.strip()
+        if not linea or linea.startswith("#"):
+            continue
+        campos = [c.strip() for c in linea.replace(";", ",").split(",")]
+        try:
+            red, prefijo, ancho = parsear_red(campos[0])
+        except ErrorPlan:
+            if numero == 1:
+                continue  # fila de encabezados
+            raise ErrorPlan(f"Línea {numero}: red no válida '{campos[0]}'") from None
+        nombre = campos[1] if len(campos) > 1 else ""
+        redes.append((nombre, red, prefijo, ancho))
+    return redes
+
+
+class IndiceIPAM:
+    def __init__(self):
+        # Por ancho de dirección: inicio, fin y dueños (frozenset) de cada
+        # segmento, en listas paralelas ordenadas por inicio
+        self._segmentos = {}
+        self.rangos = 0
+
+    @classmethod
+    def desde_bloques(cls, bloques):
+        """Índice con los rangos (dueño, ancho, inicio, fin) guardados."""
+        indice = cls()
+        # En orden de dirección casi todos los rangos se añaden al final
+        for dueno, ancho, inicio, fin in sorted(bloques, key=lambda b: (b[1], b[2])):
+            indice.agregar(dueno, ancho, inicio, fin)
+        return indice
+
+    def _listas(self, ancho):
+        if ancho not in self._segmentos:
+            self._segmentos[ancho] = ([], [], [])
+        return self._segmentos[ancho]
+
+    @staticmethod
+    def _primero(inicios, fines, inicio):
+        # Primer segmento que termina después de inicio
+        i = bisect.bisect_right(inicios, inicio) - 1
+        return i if i >= 0 and fines[i] > inicio else i + 1
+
+    def agregar(self, dueno, ancho, inicio, fin):
+        if fin <= inicio:
+            return
+        inicios, fines, duenos = self._listas(ancho)
+        i = self._primero(inicios, fines, inicio)
+        j = bisect.bisect_left(inicios, fin, i)
+        solo = frozenset((dueno,))
+
+        # Se parten los segmentos que toca el rango y se rellenan los huecos
+        nuevos = []
+        cursor = inicio
+        for a, b, d in zip(inicios[i:j], fines[i:j], duenos[i:j]):
+            if a < inicio:
+                nuevos.append((a, inicio, d))
+            elif cursor < a:
+                nuevos.append((cursor, a, solo))
+            hasta = min(b, fin)
+            nuevos.append((max(a, inicio), hasta, d | solo))
+            if b > fin:
+                nuevos.append((fin, b, d))
+            cursor = hasta
+        if cursor < fin:
+            nuevos.append((cursor, fin, solo))
+
+        inicios[i:j] = [n[0] for n in nuevos]
+        fines[i:j] = [n[1] for n in nuevos]
+        duenos[i:j] = [n[2] for n in nuevos]
+        self.rangos += 1
+
+    def agregar_plan(self, dueno, plan):
+        for inicio, fin in rangos_plan(plan):
+            self.agregar(dueno, plan.ancho, inicio, fin)
+
+    def solapamientos(self, ancho, inicio, fin):
+        """Tramos (inicio, fin, dueños) ya asignados dentro de [inicio, fin)."""
+        if ancho not in self._segmentos:
+            return []
+        inicios, fines, duenos = self._segmentos[ancho]
+        i = self._primero(inicios, fines, inicio)
+        resultado = []
+        while i < len(inicios) and inicios[i] < fin:
+            resultado.append((max(inicios[i], inicio), min(fines[i], fin), duenos[i]))
+            i += 1
+        return resultado
+
+    def conflictos_plan(self, plan):
+        """Rangos del plan que ya estaban asignados, agrupados por dueño."""
+        conflictos = {}
+        for inicio, fin in rangos_plan(plan):
+            for a, b, duenos in self.solapamientos(plan.ancho, inicio, fin):
+                for dueno in duenos:
+                    tramos = conflictos.setdefault(dueno, [])
+                    if tramos and tramos[-1][1] == a:
+                        tramos[-1] = (tramos[-1][0], b)
+                    else:
+                        tramos.append((a, b))
+        return conflictos
+
+    def __len__(self):
+        return self.rangos
+
+
+def texto_conflictos(conflictos, ancho=ANCHO_IPV4, limite=10):
+    lineas = []
+    for dueno in sorted(conflictos)[:limite]:
+        tramos = conflictos[dueno]
+        inicio, fin = tramos[0]
+        rango = f"{int_a_ip(inicio, ancho)} - {int_a_ip(fin - 1, ancho)}"
+        if len(tramos) > 1:
+            rango += f" y {len(tramos) - 1} tramos más"
+        lineas.append(f"  • {dueno}: {rango}")
+    if len(conflictos) > limite:
+        lineas.append(f"  ... y {len(conflictos) - limite} más")
+    return "\n".join(lineas)
@@ -0,0 +1,250 @@
+"""Medición de las acciones del usuario: tiempo, CPU, memoria y filas.
+
+Cada acción se mide con Registro.medir, en el mismo hilo que hace el trabajo
+(el tiempo de CPU es el de ese hilo). Las mediciones quedan en un registro
+circular en memoria y, si se indica un archivo, en un log JSONL rotativo; se
+pueden exportar en formato Chrome trace (chrome://tracing, Perfetto). Con
+perfilar_siguiente la próxima acción se ejecuta bajo cProfile y tracemalloc.
+"""
+import io
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MAX_MEDICIONES = 1000
+TAMANO_LOG = 1024 * 1024
+COPIAS_LOG = 2
+FUNCIONES_PERFIL = 30
+
+ESTADO_OK = "ok"
+ESTADO_ERROR = "error"
+ESTADO_CANCELADO = "cancelado"
+
+
+def _pico_windows():
+    import ctypes
+    from ctypes import wintypes
+
+    class Contadores(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    contadores = Contadores()
+    contadores.cb = ctypes.sizeof(contadores)
+    proceso = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(proceso, ctypes.byref(contadores), contadores.cb):
+        return 0
+    return contadores.PeakWorkingSetSize
+
+
+def pico_memoria():
+    """Pico de memoria residente del proceso, en bytes (0 si no se puede leer)."""
+    if resource is not None:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico if sys.platform == "darwin" else pico * 1024  # Linux: KiB
+    try:
+        return _pico_windows()
+    except (OSError, AttributeError):
+        return 0
+
+
+def formatear_duracion(segundos):
+    return f"{segundos * 1000:.0f} ms" if segundos < 1 else f"{segundos:.2f} s"
+
+
+def formatear_bytes(n):
+    for unidad in ("B", "KB", "MB"):
+        if n < 1024:
+            return f"{n:.0f} {unidad}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+class Medicion:
+    __slots__ = ("nombre", "inicio", "duracion", "cpu", "memoria_pico", "memoria_aumento",
+                 "memoria_python", "filas", "estado", "hilo", "nombre_hilo", "perfil")
+
+    def __init__(self, nombre, filas=None):
+        self.nombre = nombre
+        self.inicio = time.time()
+        self.duracion = None
+        self.cpu = None
+        self.memoria_pico = 0
+        # Cuánto subió esta acción el pico del proceso (0 si no lo superó)
+        self.memoria_aumento = 0
+        self.memoria_python = None  # pico de tracemalloc, solo al perfilar
+        self.filas = filas
+        self.estado = ESTADO_OK
+        hilo = threading.current_thread()
+        self.hilo = hilo.ident
+        self.nombre_hilo = hilo.name
+        self.perfil = None
+
+    def a_dict(self):
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+    def __repr__(self):
+        return f"Medicion({self.nombre!r}, {texto_medicion(self)})"
+
+
+def texto_medicion(m):
+    if m.duracion is None:
+        return "en curso"
+    partes = [formatear_duracion(m.duracion), f"CPU {formatear_duracion(m.cpu)}"]
+    if m.filas:
+        partes.append(f"{m.filas} filas")
+    if m.memoria_aumento:
+        partes.append(f"+{formatear_bytes(m.memoria_aumento)} de pico")
+    if m.estado != ESTADO_OK:
+        partes.append(m.estado)
+    return ", ".join(partes)
+
+
+class Registro:
+    def __init__(self, max_mediciones=MAX_MEDICIONES, ruta_log=None):
+        self.mediciones = deque(maxlen=max_mediciones)
+        self._candado = threading.Lock()
+        self._ruta_perfil = None
+        self._log = None
+        if ruta_log:
+            self._log = logging.getLogger(f"{__name__}.{id(self)}")
+            self._log.propagate = False
+            self._log.setLevel(logging.INFO)
+            manejador = RotatingFileHandler(ruta_log, maxBytes=TAMANO_LOG, backupCount=COPIAS_LOG,
+                                            encoding="utf-8", delay=True)
+            self._log.addHandler(manejador)
+
+    def perfilar_siguiente(self, ruta):
+        """La próxima acción medida se perfila y su perfil se guarda en `ruta`."""
+        with self._candado:
+            self._ruta_perfil = ruta
+
+    @contextmanager
+    def medir(self, nombre, filas=None):
+        with self._candado:
+            ruta_perfil, self._ruta_perfil = self._ruta_perfil, None
+        medicion = Medicion(nombre, filas)
+        perfil = None
+        if ruta_perfil:
+            import cProfile
+            import tracemalloc
+
+            # Si ya se estaba trazando la memoria el pico no es de esta acción
+            trazar = not tracemalloc.is_tracing()
+            if trazar:
+                tracemalloc.start()
+            perfil = cProfile.Profile()
+            perfil.enable()
+
+        pico_antes = pico_memoria()
+        inicio_cpu = time.thread_time()
+        inicio = time.perf_counter()
+        try:
+            yield medicion
+        except BaseException:
+            if medicion.estado == ESTADO_OK:
+                medicion.estado = ESTADO_ERROR
+            raise
+        finally:
+            medicion.duracion = time.perf_counter() - inicio
+            medicion.cpu = time.thread_time() - inicio_cpu
+            medicion.memoria_pico = pico_memoria()
+            medicion.memoria_aumento = max(0, medicion.memoria_pico - pico_antes)
+            if perfil is not None:
+                perfil.disable()
+                if trazar:
+                    medicion.memoria_python = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                guardar_perfil(perfil, ruta_perfil, medicion)
+                medicion.perfil = ruta_perfil
+            self.agregar(medicion)
+
+    def instantanea(self):
+        """Copia de las mediciones: los hilos de trabajo siguen agregando."""
+        with self._candado:
+            return list(self.mediciones)
+
+    def agregar(self, medicion):
+        with self._candado:
+            self.mediciones.append(medicion)
+        if self._log:
+            self._log.info(json.dumps(medicion.a_dict(), ensure_ascii=False))
+
+
+def guardar_perfil(perfil, ruta, medicion):
+    # El .prof se abre con pstats o snakeviz; el .txt sirve para un reporte
+    import pstats
+
+    perfil.dump_stats(ruta)
+    texto = io.StringIO()
+    texto.write(f"{medicion.nombre}: {texto_medicion(medicion)}\n")
+    if medicion.memoria_python is not None:
+        texto.write(f"Pico de memoria Python: {formatear_bytes(medicion.memoria_python)}\n")
+    texto.write("\n")
+    pstats.Stats(perfil, stream=texto).sort_stats("cumulative").print_stats(FUNCIONES_PERFIL)
+    with open(os.path.splitext(ruta)[0] + ".txt", "w", encoding="utf-8") as archivo:
+        archivo.write(texto.getvalue())
+
+
+def traza_chrome(mediciones):
+    """Eventos en formato Chrome trace: uno completo ("X") por medición."""
+    pid = os.getpid()
+    eventos = []
+    hilos = {}
+    for m in mediciones:
+        if m.duracion is None:
+            continue
+        hilos[m.hilo] = m.nombre_hilo
+        argumentos = {
+            "cpu_ms": round(m.cpu * 1000, 3),
+            "memoria_pico": m.memoria_pico,
+            "memoria_aumento": m.memoria_aumento,
+            "estado": m.estado,
+        }
+        if m.filas is not None:
+            argumentos["filas"] = m.filas
+        if m.memoria_python is not None:
+            argumentos["memoria_python"] = m.memoria_python
+        if m.perfil:
+            argumentos["perfil"] = m.perfil
+        eventos.append({
+            "name": m.nombre, "cat": m.estado, "ph": "X", "pid": pid, "tid": m.hilo,
+            "ts": round(m.inicio * 1e6), "dur": round(m.duracion * 1e6), "args": argumentos,
+        })
+    for tid, nombre in hilos.items():
+        eventos.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": nombre}})
+    return {"traceEvents": eventos, "displayTimeUnit": "ms"}
+
+
+def exportar_traza(ruta, mediciones):
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        json.dump(traza_chrome(mediciones), archivo, ensure_ascii=False)
+
+
+def texto_registro(mediciones, limite=50):
+    mediciones = list(mediciones)[-limite:]
+    if not mediciones:
+        return "⏱️ Todavía no hay acciones medidas."
+    lineas = [f"⏱️ Últimas {len(mediciones)} acciones:\n"]
+    for m in reversed(mediciones):
+        hora = time.strftime("%H:%M:%S", time.localtime(m.inicio))
+        lineas.append(f"  {hora}  {m.nombre}: {texto_medicion(m)}")
+        if m.perfil:
+            lineas.append(f"            perfil: {m.perfil}")
+    return "\n".join(lineas)
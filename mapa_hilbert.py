@@ -0,0 +1,157 @@
+"""Mapa del espacio de direcciones sobre una curva de Hilbert.
+
+Un rango alineado de 2**bits direcciones se recorre con una curva de Hilbert
+de orden k (2**k x 2**k celdas), de modo que los bloques CIDR contiguos quedan
+como regiones compactas. Cada celda agrupa 2**(bits - 2k) direcciones y
+guarda la fracción ocupada por el plan y, si cae dentro de una sola subred, su
+índice. El coste depende del número de celdas, no del de subredes.
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from motor_vlsm import Plan
+
+ORDEN_MAXIMO = 9  # 512 x 512 celdas
+
+Rejilla = namedtuple("Rejilla", "base bits orden bits_celda ocupacion indice")
+
+
+@lru_cache(maxsize=None)
+def curva_hilbert(orden):
+    """Coordenadas (x, y) de cada posición de la curva y la tabla inversa d[y, x]."""
+    lado = 1 << orden
+    t = np.arange(lado * lado, dtype=np.int64)
+    x = np.zeros_like(t)
+    y = np.zeros_like(t)
+    s = 1
+    while s < lado:
+        rx = (t >> 1) & 1
+        ry = (t ^ rx) & 1
+        # Rotar el cuadrante para que la curva conecte con el siguiente
+        girar = ry == 0
+        reflejar = girar & (rx == 1)
+        x[reflejar] = s - 1 - x[reflejar]
+        y[reflejar] = s - 1 - y[reflejar]
+        x[girar], y[girar] = y[girar], x[girar]
+        x += s * rx
+        y += s * ry
+        t >>= 2
+        s <<= 1
+    posicion = np.empty((lado, lado), dtype=np.int64)
+    posicion[y, x] = np.arange(lado * lado, dtype=np.int64)
+    return x, y, posicion
+
+
+def bloques_plan(plan):
+    # Inicio y fin (exclusivo) de cada subred, relativos a la red padre y
+    # ordenados por dirección; para la subdivisión fija no hace falta: se
+    # calcula de forma aritmética
+    if isinstance(plan, Plan):
+        return None
+    if plan.ancho - plan.prefijo > 62:
+        # Los desplazamientos IPv6 no caben en int64: enteros de Python
+        inicios = np.array([red - plan.red for red, _ in plan], dtype=object)
+        tamanos = np.array([1 << (plan.ancho - p) for _, p in plan], dtype=object)
+        return inicios, inicios + tamanos
+    inicios = np.fromiter((red - plan.red for red, _ in plan), dtype=np.int64, count=len(plan))
+    prefijos = np.fromiter((p for _, p in plan), dtype=np.int64, count=len(plan))
+    return inicios, inicios + (np.int64(1) << (plan.ancho - prefijos))
+
+
+def vista_completa(plan):
+    return plan.red, plan.ancho - plan.prefijo
+
+
+def _ocupacion_fija(plan, base, bits_celda, celdas):
+    tamano = 1 << bits_celda
+    # Las subredes ocupan un único tramo contiguo desde el inicio de la red
+    desde = (plan.red - base) / tamano
+    hasta = (plan.red + plan.cantidad * plan.paso - base) / tamano
+    posiciones = celdas.astype(np.float64)
+    ocupacion = np.clip(np.minimum(posiciones + 1, hasta) - np.maximum(posiciones, desde), 0, 1)
+
+    bits_subred = plan.ancho - plan.nuevo_prefijo
+    if bits_celda > bits_subred:
+        return ocupacion, np.full(celdas.size, -1, dtype=np.int64)
+    primera = (base - plan.red) >> bits_subred
+    # Hay menos de 2**18 celdas: un desplazamiento mayor deja todas en la misma subred
+    indice = primera + (celdas >> min(bits_subred - bits_celda, 62))
+    indice[ocupacion == 0] = -1
+    return ocupacion, indice
+
+
+def _ocupacion_bloques(bloques, desplazamiento, bits, bits_celda, celdas):
+    # Bloques recortados a la vista y medidos en unidades de 2**unidad
+    # direcciones, para que todo quepa en int64 también con IPv6
+    unidad = max(0, bits - 62)
+    inicios, fines = (
+        (np.clip(b - desplazamiento, 0, 1 << bits) >> unidad).astype(np.int64) for b in bloques
+    )
+    tamano = np.int64(1 << (bits_celda - unidad))
+    acumulado = np.concatenate(([0], np.cumsum(fines - inicios)))
+
+    def ocupadas_antes(x):
+        # Direcciones asignadas por debajo de cada x: bloques completos más el parcial
+        j = np.searchsorted(fines, x, side="right")
+        parcial = np.zeros(x.size, dtype=np.int64)
+        dentro = j < inicios.size
+        parcial[dentro] = np.clip(x[dentro] - inicios[j[dentro]], 0, None)
+        return acumulado[j] + parcial
+
+    limites = celdas * tamano
+    ocupacion = (ocupadas_antes(limites + tamano) - ocupadas_antes(limites)) / float(tamano)
+
+    j = np.searchsorted(inicios, limites, side="right") - 1
+    indice = np.full(celdas.size, -1, dtype=np.int64)
+    validos = j >= 0
+    validos[validos] = limites[validos] + tamano <= fines[j[validos]]
+    indice[validos] = j[validos]
+    return ocupacion, indice
+
+
+def rejilla(plan, base, bits, bloques=None, orden_maximo=ORDEN_MAXIMO):
+    """Agrupa el rango [base, base + 2**bits) del plan en celdas de Hilbert."""
+    orden = min(orden_maximo, bits // 2)
+    bits_celda = bits - 2 * orden
+    celdas = np.arange(1 << (2 * orden), dtype=np.int64)
+    if bloques is None and not isinstance(plan, Plan):
+        bloques = bloques_plan(plan)
+    if bloques is None:
+        ocupacion, indice = _ocupacion_fija(plan, base, bits_celda, celdas)
+    else:
+        ocupacion, indice = _ocupacion_bloques(bloques, base - plan.red, bits, bits_celda, celdas)
+
+    x, y, _ = curva_hilbert(orden)
+    lado = 1 << orden
+    ocupacion_2d = np.empty((lado, lado), dtype=np.float64)
+    indice_2d = np.empty((lado, lado), dtype=np.int64)
+    ocupacion_2d[y, x] = ocupacion
+    indice_2d[y, x] = indice
+    return Rejilla(base, bits, orden, bits_celda, ocupacion_2d, indice_2d)
+
+
+def celda_en(rejilla_actual, x, y):
+    """Posición en la curva y rango de direcciones [inicio, fin) de la celda (x, y)."""
+    _, _, posicion = curva_hilbert(rejilla_actual.orden)
+    d = int(posicion[y, x])
+    inicio = rejilla_actual.base + (d << rejilla_actual.bits_celda)
+    return d, inicio, inicio + (1 << rejilla_actual.bits_celda)
+
+
+def acercar(rejilla_actual, d):
+    """Vista de la cuarta parte del rango que contiene la posición d."""
+    if rejilla_actual.bits < 2:
+        return rejilla_actual.base, rejilla_actual.bits
+    bits = rejilla_actual.bits - 2
+    cuarto = (d << rejilla_actual.bits_celda) >> bits
+    return rejilla_actual.base + (cuarto << bits), bits
+
+
+def alejar(plan, base, bits):
+    """Vista cuatro veces mayor que contiene a la actual, sin salir de la red padre."""
+    maximo = plan.ancho - plan.prefijo
+    bits = min(bits + 2, maximo)
+    desplazamiento = ((base - plan.red) >> bits) << bits
+    return plan.red + desplazamiento, bits
@@ -0,0 +1,584 @@
+"""Motor de subnetting sin dependencias de interfaz gráfica.
+
+Los planes se calculan con enteros (red, prefijo) de 32 bits para IPv4 o de
+128 para IPv6; la subred k se obtiene de forma aritmética, sin generar la
+lista. La conversión a texto solo ocurre al presentar o exportar los
+resultados, así que el módulo se puede importar desde scripts y servicios sin
+PyQt5, reportlab ni matplotlib.
+"""
+import bisect
+import ipaddress
+import sys
+import threading
+from collections import OrderedDict
+
+MODO_SUBREDES = "Cantidad de subredes"
+MODO_HOSTS = "Cantidad de hosts por subred"
+MODO_VLSM = "VLSM (lista de hosts)"
+MODOS = (MODO_SUBREDES, MODO_HOSTS, MODO_VLSM)
+
+ANCHO_IPV4 = 32
+ANCHO_IPV6 = 128
+MAX_PREFIJO = 30
+MAX_PREFIJO_IPV6 = 128
+# len() de un plan debe caber en un entero de la plataforma
+MAX_SUBREDES = sys.maxsize
+
+ENCABEZADOS = [
+    "Subred", "Dirección de Red", "Primera IP", "Última IP",
+    "Broadcast", "Hosts", "Máscara", "Prefijo", "Wildcard"
+]
+
+
+class ErrorPlan(ValueError):
+    pass
+
+
+def int_a_ip(n, ancho=ANCHO_IPV4):
+    if ancho == ANCHO_IPV6:
+        return str(ipaddress.IPv6Address(n))
+    return f"{n >> 24}.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}"
+
+
+def mascara(prefijo, ancho=ANCHO_IPV4):
+    todos = (1 << ancho) - 1
+    return (todos << (ancho - prefijo)) & todos
+
+
+def wildcard(prefijo, ancho=ANCHO_IPV4):
+    return ((1 << ancho) - 1) >> prefijo
+
+
+def hosts_en(prefijo, ancho=ANCHO_IPV4):
+    # IPv6 no reserva dirección de broadcast: se cuentan todas las direcciones
+    tamano = 1 << (ancho - prefijo)
+    if ancho == ANCHO_IPV6:
+        return tamano
+    return tamano - 2
+
+
+def bloques_cidr(inicio, fin, ancho=ANCHO_IPV4):
+    """Mínimo conjunto de bloques (red, prefijo) que cubre [inicio, fin)."""
+    while inicio < fin:
+        # El bloque más grande alineado en inicio que no se pasa de fin
+        tamano = min(inicio & -inicio if inicio else 1 << ancho, 1 << ((fin - inicio).bit_length() - 1))
+        yield inicio, ancho - tamano.bit_length() + 1
+        inicio += tamano
+
+
+def parsear_red(texto):
+    """Devuelve (red, prefijo, ancho) de una red IPv4 o IPv6 en notación CIDR."""
+    try:
+        red = ipaddress.ip_network(texto.strip(), strict=False)
+    except ValueError as e:
+        raise ErrorPlan(f"Error en la red: {e}") from e
+    return int(red.network_address), red.prefixlen, red.max_prefixlen
+
+
+def parsear_ip(texto):
+    """Devuelve (entero, ancho) de una dirección IPv4 o IPv6."""
+    try:
+        ip = ipaddress.ip_address(texto.strip())
+    except ValueError as e:
+        raise ErrorPlan(f"Dirección IP no válida: {e}") from e
+    return int(ip), ip.max_prefixlen
+
+
+def parsear_mascara(texto, ancho=ANCHO_IPV4):
+    """Prefijo de "/24", "24" o una máscara de red como "255.255.255.0"."""
+    texto = texto.strip()
+    if texto.lstrip("/").isdigit():
+        prefijo = int(texto.lstrip("/"))
+        if not 0 <= prefijo <= ancho:
+            raise ErrorPlan(f"El prefijo debe estar entre 0 y {ancho}.")
+        return prefijo
+    bits, ancho_mascara = parsear_ip(texto)
+    prefijo = bin(bits).count("1")
+    if ancho_mascara != ancho or bits != mascara(prefijo, ancho):
+        raise ErrorPlan(f"Máscara no válida: {texto}")
+    return prefijo
+
+
+def ancho_de_mascara(texto):
+    # Sin dirección de referencia: IPv6 si la máscara lleva ":" o el prefijo pasa de 32
+    texto = texto.strip().lstrip("/")
+    if ":" in texto or (texto.isdigit() and int(texto) > ANCHO_IPV4):
+        return ANCHO_IPV6
+    return ANCHO_IPV4
+
+
+def calcular_prefijo(prefijo, modo, valor, ancho=ANCHO_IPV4):
+    if valor <= 0:
+        raise ErrorPlan("La cantidad debe ser un número entero positivo.")
+
+    if ancho == ANCHO_IPV6:
+        return _calcular_prefijo_ipv6(prefijo, modo, valor)
+
+    if modo == MODO_SUBREDES:
+        if prefijo > MAX_PREFIJO or valor > (1 << (MAX_PREFIJO - prefijo)):
+            raise ErrorPlan(f"No se pueden crear {valor} subredes con una red /{prefijo}.")
+        nuevo_prefijo = prefijo + (valor - 1).bit_length()
+        if nuevo_prefijo > MAX_PREFIJO:
+            raise ErrorPlan("No hay suficientes direcciones para crear tantas subredes.")
+
+    elif modo == MODO_HOSTS:
+        if prefijo >= 32 or valor > (1 << (31 - prefijo)) - 2:
+            raise ErrorPlan(f"No se pueden crear subredes con {valor} hosts en una red /{prefijo}.")
+        nuevo_prefijo = 32 - (valor + 1).bit_length()
+        if nuevo_prefijo < prefijo:
+            raise ErrorPlan("No hay suficiente espacio en la red original para subredes de ese tamaño.")
+
+    else:
+        raise ErrorPlan(f"Modo de cálculo desconocido: {modo}")
+
+    return nuevo_prefijo
+
+
+def _calcular_prefijo_ipv6(prefijo, modo, valor):
+    if modo == MODO_SUBREDES:
+        nuevo_prefijo = prefijo + (valor - 1).bit_length()
+        if nuevo_prefijo > MAX_PREFIJO_IPV6:
+            raise ErrorPlan(f"No se pueden crear {valor} subredes con una red /{prefijo}.")
+
+    elif modo == MODO_HOSTS:
+        nuevo_prefijo = ANCHO_IPV6 - (valor - 1).bit_length()
+        if nuevo_prefijo < prefijo:
+            raise ErrorPlan("No hay suficiente espacio en la red original para subredes de ese tamaño.")
+
+    else:
+        raise ErrorPlan(f"Modo de cálculo desconocido: {modo}")
+
+    return nuevo_prefijo
+
+
+class Plan:
+    """Subdivisión de longitud fija de una red: la subred i es red + i * paso.
+
+    Nada se materializa: len, índices, cortes e iteración se resuelven con
+    aritmética entera, también para los 2**32 /64 de un /32 IPv6.
+    """
+
+    __slots__ = ("red", "prefijo", "nuevo_prefijo", "cantidad", "modo", "valor", "ancho")
+
+    def __init__(self, red, prefijo, nuevo_prefijo, cantidad, modo, valor, ancho=ANCHO_IPV4):
+        self.red = red
+        self.prefijo = prefijo
+        self.nuevo_prefijo = nuevo_prefijo
+        self.cantidad = cantidad
+        self.modo = modo
+        self.valor = valor
+        self.ancho = ancho
+
+    @property
+    def version(self):
+        return 6 if self.ancho == ANCHO_IPV6 else 4
+
+    @property
+    def cidr(self):
+        return f"{int_a_ip(self.red, self.ancho)}/{self.prefijo}"
+
+    @property
+    def paso(self):
+        return 1 << (self.ancho - self.nuevo_prefijo)
+
+    @property
+    def total(self):
+        # Subredes en que se divide la red padre (puede ser mayor que cantidad)
+        return 1 << (self.nuevo_prefijo - self.prefijo)
+
+    @property
+    def hosts_por_subred(self):
+        return hosts_en(self.nuevo_prefijo, self.ancho)
+
+    @property
+    def desperdicio(self):
+        # Direcciones de host que sobran respecto a lo pedido en modo hosts
+        if self.modo != MODO_HOSTS:
+            return 0
+        return (self.hosts_por_subred - self.valor) * self.cantidad
+
+    @property
+    def direcciones_libres(self):
+        return (self.total - self.cantidad) * self.paso
+
+    @property
+    def libres(self):
+        # Lo que queda de la red padre tras las `cantidad` subredes pedidas
+        fin_red = self.red + (self.total << (self.ancho - self.nuevo_prefijo))
+        return list(bloques_cidr(self.red + self.cantidad * self.paso, fin_red, self.ancho))
+
+    @property
+    def tamano_bytes(self):
+        # Estimación de memoria: la subdivisión fija no guarda subredes
+        return 200
+
+    def etiqueta(self, i):
+        return f"Subred {i + 1}"
+
+    def subred(self, i):
+        if i < 0:
+            i += self.cantidad
+        if not 0 <= i < self.cantidad:
+            raise IndexError("Índice de subred fuera de rango")
+        return self.red + i * self.paso, self.nuevo_prefijo
+
+    def indice_de(self, ip):
+        """Índice de la subred que contiene la IP (entero), o None."""
+        # Desplazamiento dentro de la red dividido por el tamaño de subred
+        desplazamiento = ip - self.red
+        if desplazamiento < 0:
+            return None
+        i = desplazamiento >> (self.ancho - self.nuevo_prefijo)
+        return i if i < self.cantidad else None
+
+    def __len__(self):
+        return self.cantidad
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            # range resuelve el corte sin recorrer las subredes anteriores
+            return [(self.red + j * self.paso, self.nuevo_prefijo) for j in range(self.cantidad)[i]]
+        return self.subred(i)
+
+    def __iter__(self):
+        paso = self.paso
+        for red in range(self.red, self.red + self.cantidad * paso, paso):
+            yield red, self.nuevo_prefijo
+
+    def __repr__(self):
+        return f"Plan({self.cidr} -> {self.cantidad} x /{self.nuevo_prefijo})"
+
+
+def prefijo_para_hosts(hosts, ancho=ANCHO_IPV4):
+    if ancho == ANCHO_IPV6:
+        return ANCHO_IPV6 - (hosts - 1).bit_length()
+    return min(MAX_PREFIJO, 32 - (hosts + 1).bit_length())
+
+
+def parsear_requisitos(texto):
+    # Admite "nombre:hosts" o solo "hosts", separados por comas, ';' o saltos de línea
+    requisitos = []
+    for numero, parte in enumerate(texto.replace(";", ",").replace("\n", ",").split(","), 1):
+        parte = parte.strip()
+        if not parte:
+            continue
+        nombre, _, hosts = parte.rpartition(":")
+        try:
+            hosts = int(hosts)
+        except ValueError:
+            raise ErrorPlan(f"Requisito no válido: '{parte}'") from None
+        if hosts <= 0:
+            raise ErrorPlan(f"La cantidad de hosts debe ser positiva: '{parte}'")
+        requisitos.append((nombre.strip() or f"Subred {len(requisitos) + 1}", hosts))
+    if not requisitos:
+        raise ErrorPlan("Ingresa al menos un requisito de hosts (ej: LAN-A:50, LAN-B:20).")
+    return requisitos
+
+
+class AsignadorBuddy:
+    """Asignador buddy con una lista libre por prefijo.
+
+    Cada bloque libre está alineado a su tamaño; pedir un prefijo toma el
+    bloque libre más pequeño que lo contenga y lo divide en mitades.
+    """
+
+    def __init__(self, red, prefijo, ancho=ANCHO_IPV4):
+        self.ancho = ancho
+        self.libres = [[] for _ in range(ancho + 1)]
+        self.libres[prefijo].append(red)
+
+    def asignar(self, prefijo):
+        origen = prefijo
+        while origen >= 0 and not self.libres[origen]:
+            origen -= 1
+        if origen < 0:
+            return None
+        red = self.libres[origen].pop()
+        # Dividir hasta el tamaño pedido, devolviendo la mitad alta a su lista
+        while origen < prefijo:
+            origen += 1
+            self.libres[origen].append(red + (1 << (self.ancho - origen)))
+        return red
+
+    def bloques_libres(self):
+        return sorted((red, p) for p, lista in enumerate(self.libres) for red in lista)
+
+
+class PlanVLSM:
+    """Asignación VLSM de requisitos con nombre, de mayor a menor."""
+
+    __slots__ = (
+        "red", "prefijo", "modo", "valor", "asignaciones", "rechazados", "libres", "ancho", "_inicios"
+    )
+
+    def __init__(self, red, prefijo, valor, asignaciones, rechazados, libres, ancho=ANCHO_IPV4):
+        self.ancho = ancho
+        self.red = red
+        self.prefijo = prefijo
+        self.modo = MODO_VLSM
+        self.valor = valor
+        self.asignaciones = asignaciones  # (nombre, hosts, red, prefijo) por dirección
+        self.rechazados = rechazados  # (nombre, hosts) que no cupieron
+        self.libres = libres  # (red, prefijo) sin asignar
+        self._inicios = None
+
+    @property
+    def version(self):
+        return 6 if self.ancho == ANCHO_IPV6 else 4
+
+    @property
+    def cidr(self):
+        return f"{int_a_ip(self.red, self.ancho)}/{self.prefijo}"
+
+    @property
+    def desperdicio(self):
+        # Direcciones de host asignadas que ningún requisito necesita
+        return sum(hosts_en(p, self.ancho) - hosts for _, hosts, _, p in self.asignaciones)
+
+    @property
+    def direcciones_libres(self):
+        return sum(1 << (self.ancho - p) for _, p in self.libres)
+
+    @property
+    def tamano_bytes(self):
+        # Estimación de memoria: tupla, nombre y enteros de cada asignación
+        return (
+            300 + 200 * len(self.asignaciones) + 150 * len(self.rechazados)
+            + 100 * len(self.libres) + len(str(self.valor))
+        )
+
+    def etiqueta(self, i):
+        return self.asignaciones[i][0]
+
+    def indice_de(self, ip):
+        """Índice de la subred que contiene la IP (entero), o None."""
+        # Las asignaciones están ordenadas por dirección y no se solapan
+        if self._inicios is None:
+            self._inicios = [red for _, _, red, _ in self.asignaciones]
+        i = bisect.bisect_right(self._inicios, ip) - 1
+        if i < 0:
+            return None
+        _, _, red, p = self.asignaciones[i]
+        return i if ip < red + (1 << (self.ancho - p)) else None
+
+    def __len__(self):
+        return len(self.asignaciones)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [(red, p) for _, _, red, p in self.asignaciones[i]]
+        _, _, red, p = self.asignaciones[i]
+        return red, p
+
+    def __iter__(self):
+        for _, _, red, p in self.asignaciones:
+            yield red, p
+
+    def __repr__(self):
+        return f"PlanVLSM({self.cidr} -> {len(self)} subredes, {len(self.rechazados)} sin asignar)"
+
+
+def asignar_vlsm(red, prefijo, requisitos, valor="", ancho=ANCHO_IPV4):
+    asignador = AsignadorBuddy(red, prefijo, ancho)
+    asignaciones = []
+    rechazados = []
+    for nombre, hosts in sorted(requisitos, key=lambda r: r[1], reverse=True):
+        nuevo_prefijo = prefijo_para_hosts(hosts, ancho)
+        inicio = asignador.asignar(nuevo_prefijo) if nuevo_prefijo >= prefijo else None
+        if inicio is None:
+            rechazados.append((nombre, hosts))
+        else:
+            asignaciones.append((nombre, hosts, inicio, nuevo_prefijo))
+    asignaciones.sort(key=lambda a: a[2])
+    return PlanVLSM(
+        red, prefijo, valor, asignaciones, rechazados, asignador.bloques_libres(), ancho
+    )
+
+
+def planificar(red_cidr, modo, valor):
+    red, prefijo, ancho = parsear_red(red_cidr)
+    if modo == MODO_VLSM:
+        return asignar_vlsm(red, prefijo, parsear_requisitos(str(valor)), valor, ancho)
+    nuevo_prefijo = calcular_prefijo(prefijo, modo, valor, ancho)
+    if modo == MODO_SUBREDES:
+        cantidad = valor
+    else:
+        cantidad = 1 << (nuevo_prefijo - prefijo)
+    if cantidad > MAX_SUBREDES:
+        raise ErrorPlan(f"El plan tendría {cantidad} subredes; el máximo es {MAX_SUBREDES}.")
+    return Plan(red, prefijo, nuevo_prefijo, cantidad, modo, valor, ancho)
+
+
+def datos_subred(red, prefijo, ancho=ANCHO_IPV4):
+    ultima_dir = red | wildcard(prefijo, ancho)
+    if ancho == ANCHO_IPV6:
+        # Sin broadcast: el rango utilizable es el bloque completo
+        primera, ultima, broadcast = red, ultima_dir, None
+    else:
+        primera, ultima, broadcast = red + 1, ultima_dir - 1, ultima_dir
+    return {
+        "red": red,
+        "primera": primera,
+        "ultima": ultima,
+        "broadcast": broadcast,
+        "hosts": hosts_en(prefijo, ancho),
+        "mascara": mascara(prefijo, ancho),
+        "prefijo": prefijo,
+        "wildcard": wildcard(prefijo, ancho),
+    }
+
+
+def fila_subred(numero, red, prefijo, etiqueta=None, ancho=ANCHO_IPV4):
+    d = datos_subred(red, prefijo, ancho)
+    return [
+        etiqueta or f"Subred {numero}",
+        int_a_ip(d["red"], ancho),
+        int_a_ip(d["primera"], ancho),
+        int_a_ip(d["ultima"], ancho),
+        "-" if d["broadcast"] is None else int_a_ip(d["broadcast"], ancho),
+        d["hosts"],
+        int_a_ip(d["mascara"], ancho),
+        f"/{prefijo}",
+        int_a_ip(d["wildcard"], ancho),
+    ]
+
+
+def filas_plan(plan, inicio=0, fin=None):
+    fin = len(plan) if fin is None else min(fin, len(plan))
+    for i in range(inicio, fin):
+        red, prefijo = plan[i]
+        yield fila_subred(i + 1, red, prefijo, plan.etiqueta(i), plan.ancho)
+
+
+def info_subred(numero, red, prefijo, etiqueta=None, ancho=ANCHO_IPV4):
+    nombre, red_txt, primera, ultima, broadcast, hosts, masc, _, wild = fila_subred(
+        numero, red, prefijo, etiqueta, ancho
+    )
+    return (
+        f"{nombre}:\n"
+        f"  ➤ Dirección de red: {red_txt}\n"
+        f"  ➤ Broadcast: {broadcast}\n"
+        f"  ➤ Rango de IPs: {primera} - {ultima}\n"
+        f"  ➤ Hosts disponibles: {hosts}\n"
+        f"  ➤ Máscara: {masc} (/{prefijo})\n"
+        f"  ➤ Wildcard: {wild}\n\n"
+    )
+
+
+def encabezado_plan(plan, timestamp):
+    texto = f"📡 Subnetting de la red {plan.cidr} ({timestamp}):\n\n"
+    if plan.modo == MODO_SUBREDES:
+        texto += f"➡️ Subdivisión en {plan.total} subredes (/{plan.nuevo_prefijo}):\n"
+        if plan.libres:
+            bloques = ", ".join(f"{int_a_ip(red, plan.ancho)}/{p}" for red, p in plan.libres[:10])
+            extra = f" y {len(plan.libres) - 10} más" if len(plan.libres) > 10 else ""
+            texto += f"🟢 Espacio sin asignar ({plan.direcciones_libres} direcciones): {bloques}{extra}\n"
+        texto += "\n"
+    elif plan.modo == MODO_VLSM:
+        texto += (
+            f"➡️ VLSM: {len(plan)} subredes asignadas, desperdicio de {plan.desperdicio} hosts, "
+            f"{plan.direcciones_libres} direcciones libres\n"
+        )
+        if plan.rechazados:
+            nombres = ", ".join(f"{nombre} ({hosts})" for nombre, hosts in plan.rechazados[:10])
+            extra = f" y {len(plan.rechazados) - 10} más" if len(plan.rechazados) > 10 else ""
+            texto += f"⚠️ Sin espacio para: {nombres}{extra}\n"
+        if plan.libres:
+            bloques = ", ".join(f"{int_a_ip(red, plan.ancho)}/{p}" for red, p in plan.libres[:10])
+            extra = f" y {len(plan.libres) - 10} más" if len(plan.libres) > 10 else ""
+            texto += f"🟢 Espacio sin asignar: {bloques}{extra}\n"
+        texto += "\n"
+    else:
+        texto += f"➡️ Subredes con al menos {plan.valor} hosts (/{plan.nuevo_prefijo}):\n\n"
+    return texto
+
+
+def resumen_corto(plan):
+    # Una línea con lo esencial del plan, sin recorrer sus subredes
+    if isinstance(plan, Plan):
+        texto = f"{plan.cantidad} subredes /{plan.nuevo_prefijo}, {plan.hosts_por_subred} hosts por subred"
+    else:
+        texto = f"{len(plan)} subredes asignadas"
+        if plan.rechazados:
+            texto += f", {len(plan.rechazados)} sin espacio"
+    return f"{texto}, desperdicio de {plan.desperdicio} hosts, {plan.direcciones_libres} direcciones libres"
+
+
+def bloques_subredes(plan):
+    for i, (red, prefijo) in enumerate(plan):
+        yield info_subred(i + 1, red, prefijo, plan.etiqueta(i), plan.ancho)
+
+
+def texto_plan(plan, timestamp):
+    return encabezado_plan(plan, timestamp) + "".join(bloques_subredes(plan))
+
+
+class CachePlanes:
+    """Caché LRU de planes, limitada por memoria estimada y no por entradas."""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.bytes_usados = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self._planes = OrderedDict()
+        self._candado = threading.Lock()
+
+    @staticmethod
+    def clave(red_cidr, modo, valor):
+        # "10.0.0.7/8" y "10.0.0.0/8" son la misma red padre; el ancho separa
+        # redes IPv4 e IPv6 con el mismo valor entero
+        red, prefijo, ancho = parsear_red(red_cidr)
+        if modo == MODO_VLSM:
+            return red, prefijo, ancho, modo, str(valor).strip()
+        try:
+            return red, prefijo, ancho, modo, int(valor)
+        except (TypeError, ValueError):
+            raise ErrorPlan("La cantidad debe ser un número entero positivo.") from None
+
+    def obtener(self, clave):
+        with self._candado:
+            plan = self._planes.get(clave)
+            if plan is None:
+                self.fallos += 1
+                return None
+            self._planes.move_to_end(clave)
+            self.aciertos += 1
+            return plan
+
+    def guardar(self, clave, plan):
+        tamano = plan.tamano_bytes
+        if tamano > self.max_bytes:
+            return
+        with self._candado:
+            anterior = self._planes.pop(clave, None)
+            if anterior is not None:
+                self.bytes_usados -= anterior.tamano_bytes
+            self._planes[clave] = plan
+            self.bytes_usados += tamano
+            while self.bytes_usados > self.max_bytes:
+                _, expulsado = self._planes.popitem(last=False)
+                self.bytes_usados -= expulsado.tamano_bytes
+
+    def planificar(self, red_cidr, modo, valor):
+        clave = self.clave(red_cidr, modo, valor)
+        plan = self.obtener(clave)
+        if plan is None:
+            plan = planificar(red_cidr, modo, clave[-1])
+            self.guardar(clave, plan)
+        return plan
+
+    def limpiar(self):
+        with self._candado:
+            self._planes.clear()
+            self.bytes_usados = 0
+
+    def __len__(self):
+        return len(self._planes)
+
+
+CACHE_PLANES = CachePlanes()
+
+
+def planificar_en_cache(red_cidr, modo, valor, cache=CACHE_PLANES):
+    return cache.planificar(red_cidr, modo, valor)
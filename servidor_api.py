@@ -0,0 +1,431 @@
+"""API HTTP local con los cálculos de la aplicación, sin interfaz gráfica.
+
+Servidor asyncio con conexiones persistentes (HTTP/1.1). Los cálculos se
+hacen en un pool de hilos para no bloquear el bucle; las respuestas JSON se
+guardan en una caché LRU y las consultas idénticas que llegan a la vez
+comparten un mismo cálculo. Las subredes de un plan se envían como JSONL con
+codificación chunked, bloque a bloque, sin armar la respuesta en memoria.
+
+    python servidor_api.py --puerto 8080
+
+    GET  /plan?red=10.0.0.0/8&modo=subredes&valor=1024
+    GET  /plan/subredes?red=10.0.0.0/8&modo=subredes&valor=1024&desde=0&limite=100
+    POST /plan  {"red": "10.0.0.0/16", "modo": "vlsm", "valor": "ventas:100,rrhh:50"}
+    GET  /inverso?ip=192.168.1.77&mascara=255.255.255.192
+    GET  /wildcard?mascara=/26
+    POST /sumarizar?tolerancia=0.25&formato=acl  (un prefijo por línea en el cuerpo)
+    GET  /estado
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+from cli_vlsm import normalizar_modo
+from motor_vlsm import (
+    CACHE_PLANES, ErrorPlan, ancho_de_mascara, datos_subred, int_a_ip, parsear_ip, parsear_mascara,
+    parsear_red, planificar_en_cache
+)
+from tabla_vectorizada import TAMANO_BLOQUE, filas_vectorizadas
+
+PUERTO = 8080
+MAX_CUERPO = 64 * 1024 * 1024
+MAX_CABECERAS = 100
+TIMEOUT_INACTIVO = 30  # segundos sin peticiones antes de cerrar la conexión
+CACHE_BYTES = 32 * 1024 * 1024
+# Las respuestas más grandes no se guardan: desplazarían a todas las demás
+MAX_RESPUESTA_EN_CACHE = 1024 * 1024
+
+# Un solo codificador para todas las filas: json.dumps con opciones crea uno por llamada
+_JSON = json.JSONEncoder(ensure_ascii=False, check_circular=False, separators=(",", ":"))
+
+MENSAJES = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 500: "Internal Server Error",
+}
+
+
+class ErrorHTTP(Exception):
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+class CacheRespuestas:
+    """Caché LRU de respuestas ya serializadas, limitada por bytes."""
+
+    def __init__(self, max_bytes=CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes_usados = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self._respuestas = OrderedDict()
+
+    def obtener(self, clave):
+        cuerpo = self._respuestas.get(clave)
+        if cuerpo is None:
+            self.fallos += 1
+            return None
+        self._respuestas.move_to_end(clave)
+        self.aciertos += 1
+        return cuerpo
+
+    def guardar(self, clave, cuerpo):
+        if len(cuerpo) > min(self.max_bytes, MAX_RESPUESTA_EN_CACHE) or clave in self._respuestas:
+            return
+        self._respuestas[clave] = cuerpo
+        self.bytes_usados += len(cuerpo)
+        while self.bytes_usados > self.max_bytes:
+            _, expulsado = self._respuestas.popitem(last=False)
+            self.bytes_usados -= len(expulsado)
+
+    def __len__(self):
+        return len(self._respuestas)
+
+
+def _parametro(parametros, nombre, defecto=None):
+    valor = parametros.get(nombre, defecto)
+    if valor is None or valor == "":
+        raise ErrorPlan(f"Falta el parámetro '{nombre}'")
+    return valor
+
+
+def _entero(parametros, nombre, defecto):
+    try:
+        return int(parametros.get(nombre, defecto))
+    except ValueError:
+        raise ErrorPlan(f"El parámetro '{nombre}' debe ser un número entero") from None
+
+
+def plan_de_parametros(parametros):
+    modo = normalizar_modo(parametros.get("modo") or "subredes")
+    return planificar_en_cache(_parametro(parametros, "red"), modo, _parametro(parametros, "valor"))
+
+
+def resumen_plan(parametros, cuerpo=None):
+    plan = plan_de_parametros(parametros)
+    resumen = {
+        "red": plan.cidr,
+        "modo": plan.modo,
+        "valor": plan.valor,
+        "subredes": len(plan),
+        "desperdicio": plan.desperdicio,
+        "direcciones_libres": plan.direcciones_libres,
+        "bloques_libres": [f"{int_a_ip(red, plan.ancho)}/{p}" for red, p in plan.libres],
+    }
+    if hasattr(plan, "nuevo_prefijo"):
+        resumen["prefijo"] = plan.nuevo_prefijo
+        resumen["hosts_por_subred"] = plan.hosts_por_subred
+    else:
+        resumen["rechazados"] = [{"nombre": n, "hosts": h} for n, h in plan.rechazados]
+    return resumen
+
+
+def registro_red(red, primera, ultima, broadcast, hosts, mascara, prefijo, wildcard, **extra):
+    """Campos JSON de una red, iguales en todas las rutas (broadcast None en IPv6)."""
+    return {
+        **extra,
+        "red": f"{red}/{prefijo}",
+        "primera": primera,
+        "ultima": ultima,
+        "broadcast": broadcast,
+        "hosts": hosts,
+        "mascara": mascara,
+        "prefijo": prefijo,
+        "wildcard": wildcard,
+    }
+
+
+def _datos_red(red, prefijo, ancho):
+    d = datos_subred(red, prefijo, ancho)
+    return registro_red(
+        int_a_ip(red, ancho), int_a_ip(d["primera"], ancho), int_a_ip(d["ultima"], ancho),
+        None if d["broadcast"] is None else int_a_ip(d["broadcast"], ancho),
+        d["hosts"], int_a_ip(d["mascara"], ancho), prefijo, int_a_ip(d["wildcard"], ancho),
+    )
+
+
+def calculo_inverso(parametros, cuerpo=None):
+    """Red que contiene una IP, con la máscara en el parámetro o como ip/prefijo."""
+    texto = _parametro(parametros, "ip")
+    if "/" in texto:
+        ip, _, mascara = texto.partition("/")
+    else:
+        ip, mascara = texto, _parametro(parametros, "mascara")
+    ip_int, ancho = parsear_ip(ip)
+    prefijo = parsear_mascara(mascara, ancho)
+    red, _, _ = parsear_red(f"{ip}/{prefijo}")
+    return dict(_datos_red(red, prefijo, ancho), ip=int_a_ip(ip_int, ancho))
+
+
+def calculo_wildcard(parametros, cuerpo=None):
+    texto = _parametro(parametros, "mascara")
+    ancho = ancho_de_mascara(texto)
+    prefijo = parsear_mascara(texto, ancho)
+    d = _datos_red(0, prefijo, ancho)
+    return {"mascara": d["mascara"], "prefijo": prefijo, "wildcard": d["wildcard"]}
+
+
+def resumen_sumarizacion(parametros, cuerpo=None):
+    from sumarizacion import FORMATOS, PREFIJO_MINIMO, PREFIJO_MINIMO_IPV6, formatear, sumarizar
+
+    formato = parametros.get("formato", "cidr")
+    if formato not in FORMATOS:
+        raise ErrorPlan(f"Formato desconocido: {formato}")
+    try:
+        tolerancia = float(parametros.get("tolerancia", 0))
+    except ValueError:
+        raise ErrorPlan("La tolerancia debe ser un número") from None
+    if not 0 <= tolerancia < 1:
+        raise ErrorPlan("La tolerancia debe estar entre 0 y 1")
+    prefijo_minimo = _entero(parametros, "prefijo_minimo", PREFIJO_MINIMO)
+    prefijo_minimo6 = _entero(parametros, "prefijo_minimo6", PREFIJO_MINIMO_IPV6)
+    if cuerpo:
+        try:
+            lineas = cuerpo.decode("utf-8").splitlines()
+        except UnicodeDecodeError:
+            raise ErrorPlan("El cuerpo debe estar codificado en UTF-8") from None
+    else:
+        lineas = _parametro(parametros, "prefijos").split(",")
+    agregados = [formatear(red, prefijo, ancho, formato)
+                 for red, prefijo, ancho in sumarizar(lineas, tolerancia, prefijo_minimo, prefijo_minimo6)]
+    return {"agregados": agregados, "cantidad": len(agregados)}
+
+
+def bloque_jsonl(plan, desde, hasta):
+    # Las filas de la tabla traen "-" sin broadcast y el prefijo como "/26"
+    lineas = []
+    for etiqueta, red, primera, ultima, broadcast, hosts, masc, prefijo, wild in filas_vectorizadas(plan, desde, hasta):
+        registro = registro_red(
+            red, primera, ultima, None if broadcast == "-" else broadcast, hosts, masc,
+            int(prefijo[1:]), wild, subred=etiqueta,
+        )
+        lineas.append(_JSON.encode(registro))
+        lineas.append("\n")
+    return "".join(lineas).encode("utf-8")
+
+
+class ServidorAPI:
+    def __init__(self, cache_bytes=CACHE_BYTES, hilos=None, cors=None):
+        self.cache = CacheRespuestas(cache_bytes)
+        self.cors = cors
+        self.pool = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="api")
+        self._en_curso = {}
+        self.peticiones = 0
+        self.rutas_json = {
+            "/plan": resumen_plan,
+            "/inverso": calculo_inverso,
+            "/wildcard": calculo_wildcard,
+            "/sumarizar": resumen_sumarizacion,
+        }
+
+    async def iniciar(self, host="127.0.0.1", puerto=PUERTO):
+        return await asyncio.start_server(self.atender, host, puerto)
+
+    def cerrar(self):
+        self.pool.shutdown(wait=False)
+
+    def estado(self):
+        return {
+            "peticiones": self.peticiones,
+            "cache_respuestas": {"entradas": len(self.cache), "bytes": self.cache.bytes_usados,
+                                 "aciertos": self.cache.aciertos, "fallos": self.cache.fallos},
+            "cache_planes": {"entradas": len(CACHE_PLANES), "bytes": CACHE_PLANES.bytes_usados,
+                             "aciertos": CACHE_PLANES.aciertos, "fallos": CACHE_PLANES.fallos},
+        }
+
+    async def atender(self, lector, escritor):
+        try:
+            while True:
+                # readline lanza ValueError si una línea supera el límite del lector
+                try:
+                    linea = await asyncio.wait_for(lector.readline(), TIMEOUT_INACTIVO)
+                except asyncio.TimeoutError:
+                    break
+                except (ValueError, asyncio.LimitOverrunError):
+                    await self._enviar(escritor, 400, {"error": "Línea de petición demasiado larga"}, False)
+                    break
+                if not linea.strip():
+                    break
+                try:
+                    metodo, objetivo, version = linea.decode("latin-1").split()
+                    cabeceras = await self._leer_cabeceras(lector)
+                    largo = int(cabeceras.get("content-length", 0))
+                    if largo < 0:
+                        raise ValueError(largo)
+                except (ValueError, asyncio.LimitOverrunError, ErrorHTTP):
+                    await self._enviar(escritor, 400, {"error": "Petición mal formada"}, False)
+                    break
+                if largo > MAX_CUERPO:
+                    await self._enviar(escritor, 413, {"error": "Cuerpo demasiado grande"}, False)
+                    break
+                cuerpo = await lector.readexactly(largo) if largo else b""
+                mantener = version == "HTTP/1.1" and cabeceras.get("connection", "").lower() != "close"
+                self.peticiones += 1
+                await self.responder(escritor, metodo, objetivo, cuerpo, mantener)
+                if not mantener:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    async def _leer_cabeceras(self, lector):
+        cabeceras = {}
+        for _ in range(MAX_CABECERAS):
+            linea = (await lector.readline()).decode("latin-1")
+            if linea in ("\r\n", "\n", ""):
+                return cabeceras
+            nombre, _, valor = linea.partition(":")
+            cabeceras[nombre.strip().lower()] = valor.strip()
+        raise ErrorHTTP(400, "Demasiadas cabeceras")
+
+    async def responder(self, escritor, metodo, objetivo, cuerpo, mantener):
+        partes = urlsplit(objetivo)
+        ruta = partes.path.rstrip("/") or "/"
+        parametros = dict(parse_qsl(partes.query, keep_blank_values=True))
+        try:
+            if metodo not in ("GET", "POST"):
+                raise ErrorHTTP(405, f"Método no permitido: {metodo}")
+            if cuerpo and ruta != "/sumarizar":
+                parametros.update(self._parametros_json(cuerpo))
+                cuerpo = b""
+            if ruta == "/plan/subredes":
+                await self._enviar_subredes(escritor, parametros, mantener)
+                return
+            if ruta == "/estado":
+                await self._enviar(escritor, 200, self.estado(), mantener)
+                return
+            if ruta not in self.rutas_json:
+                raise ErrorHTTP(404, f"Ruta desconocida: {ruta}")
+            datos, en_cache = await self._calcular(ruta, parametros, cuerpo)
+            await self._enviar(escritor, 200, datos, mantener, en_cache)
+        except ErrorHTTP as e:
+            await self._enviar(escritor, e.estado, {"error": str(e)}, mantener)
+        except ErrorPlan as e:
+            await self._enviar(escritor, 400, {"error": str(e)}, mantener)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            raise
+        except Exception as e:
+            await self._enviar(escritor, 500, {"error": f"Error interno: {e}"}, mantener)
+
+    @staticmethod
+    def _parametros_json(cuerpo):
+        try:
+            datos = json.loads(cuerpo)
+        except ValueError:
+            raise ErrorHTTP(400, "El cuerpo debe ser un objeto JSON") from None
+        if not isinstance(datos, dict):
+            raise ErrorHTTP(400, "El cuerpo debe ser un objeto JSON")
+        return {clave: str(valor) for clave, valor in datos.items()}
+
+    async def _calcular(self, ruta, parametros, cuerpo):
+        """Respuesta serializada de la caché, o calculada en el pool una sola vez."""
+        clave = (ruta, tuple(sorted(parametros.items())), hashlib.sha1(cuerpo).digest())
+        datos = self.cache.obtener(clave)
+        if datos is not None:
+            return datos, True
+        # Consultas idénticas simultáneas esperan al mismo cálculo
+        futuro = self._en_curso.get(clave)
+        if futuro is None:
+            loop = asyncio.get_running_loop()
+            futuro = loop.run_in_executor(self.pool, self._serializar, self.rutas_json[ruta], parametros, cuerpo)
+            self._en_curso[clave] = futuro
+            try:
+                datos = await futuro
+            finally:
+                del self._en_curso[clave]
+            self.cache.guardar(clave, datos)
+            return datos, False
+        return await asyncio.shield(futuro), True
+
+    @staticmethod
+    def _serializar(funcion, parametros, cuerpo):
+        return json.dumps(funcion(parametros, cuerpo), ensure_ascii=False).encode("utf-8")
+
+    def _cabeceras(self, estado, tipo, extra=()):
+        lineas = [f"HTTP/1.1 {estado} {MENSAJES.get(estado, '')}", f"Content-Type: {tipo}"]
+        if self.cors:
+            lineas.append(f"Access-Control-Allow-Origin: {self.cors}")
+        lineas.extend(extra)
+        return ("\r\n".join(lineas) + "\r\n\r\n").encode("latin-1")
+
+    async def _enviar(self, escritor, estado, datos, mantener, en_cache=None):
+        if not isinstance(datos, bytes):
+            datos = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+        extra = [f"Content-Length: {len(datos)}"]
+        if en_cache is not None:
+            extra.append(f"X-Cache: {'HIT' if en_cache else 'MISS'}")
+        if not mantener:
+            extra.append("Connection: close")
+        escritor.write(self._cabeceras(estado, "application/json; charset=utf-8", extra) + datos)
+        await escritor.drain()
+
+    async def _enviar_subredes(self, escritor, parametros, mantener):
+        loop = asyncio.get_running_loop()
+        plan = await loop.run_in_executor(self.pool, plan_de_parametros, parametros)
+        desde = max(0, _entero(parametros, "desde", 0))
+        limite = _entero(parametros, "limite", len(plan))
+        hasta = min(len(plan), desde + max(0, limite))
+
+        extra = ["Transfer-Encoding: chunked", f"X-Subredes: {len(plan)}"]
+        if not mantener:
+            extra.append("Connection: close")
+        escritor.write(self._cabeceras(200, "application/x-ndjson; charset=utf-8", extra))
+        try:
+            for inicio in range(desde, hasta, TAMANO_BLOQUE):
+                bloque = await loop.run_in_executor(
+                    self.pool, bloque_jsonl, plan, inicio, min(inicio + TAMANO_BLOQUE, hasta)
+                )
+                escritor.write(b"%x\r\n%s\r\n" % (len(bloque), bloque))
+                # Se espera a que el cliente lea antes de generar el siguiente bloque
+                await escritor.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            raise
+        except Exception as e:
+            # El estado 200 ya salió: el error va como última línea del flujo
+            error = (json.dumps({"error": str(e)}, ensure_ascii=False) + "\n").encode("utf-8")
+            escritor.write(b"%x\r\n%s\r\n" % (len(error), error))
+        escritor.write(b"0\r\n\r\n")
+        await escritor.drain()
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(description="API HTTP local con los cálculos de subredes.")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="Dirección de escucha (por defecto solo este equipo)")
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--cache-mb", type=int, default=CACHE_BYTES // (1024 * 1024),
+                        help="Memoria para la caché de respuestas")
+    parser.add_argument("--hilos", type=int, default=None, help="Hilos de cálculo")
+    parser.add_argument("--cors", help="Origen permitido para navegadores (p. ej. http://portal.local)")
+    return parser
+
+
+async def servir(args):
+    api = ServidorAPI(args.cache_mb * 1024 * 1024, args.hilos, args.cors)
+    servidor = await api.iniciar(args.host, args.puerto)
+    direcciones = ", ".join(f"http://{s.getsockname()[0]}:{s.getsockname()[1]}" for s in servidor.sockets)
+    print(f"API escuchando en {direcciones}", flush=True)
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        api.cerrar()
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    try:
+        asyncio.run(servir(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
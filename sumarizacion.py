@@ -0,0 +1,227 @@
+"""Sumarización de rutas (supernetting) sobre pares de enteros.
+
+Los prefijos se leen como rangos [inicio, fin), se ordenan y se funden los
+que se solapan o se tocan; cada rango fundido se parte en el mínimo número de
+bloques CIDR alineados. Con una tolerancia se permiten agregados inexactos
+que cubren algo de espacio no pedido, útil para ACL cortas. Ejemplo:
+
+    python sumarizacion.py tabla_rutas.txt --formato acl --tolerancia 0.25 -o acl.txt
+"""
+import argparse
+import os
+import socket
+import sys
+from collections import deque
+
+import numpy as np
+
+from motor_vlsm import ANCHO_IPV4, ANCHO_IPV6, ErrorPlan, bloques_cidr, int_a_ip, parsear_red, wildcard
+
+FORMATOS = ("cidr", "acl")
+
+# Prefijo más corto de un agregado inexacto en cada familia: /8 es el mayor
+# bloque IPv4 asignado y /32 la asignación habitual a un operador IPv6
+PREFIJO_MINIMO = 8
+PREFIJO_MINIMO_IPV6 = 32
+
+
+def _ipv4(texto):
+    # inet_aton admite formas abreviadas ("10.1"): se exigen los cuatro octetos
+    if texto.count(".") != 3:
+        raise OSError
+    return int.from_bytes(socket.inet_aton(texto), "big")
+
+
+def parsear_prefijo(linea):
+    """(inicio, fin, ancho) de "red/prefijo", "red máscara" o una IP suelta.
+
+    Devuelve None en líneas vacías o comentarios.
+    """
+    partes = linea.split()
+    if not partes or partes[0].startswith(("#", "!")):
+        return None
+    texto = partes[0]
+    if len(partes) > 1 and "/" not in texto and "." in partes[1]:
+        # Formato de tabla de rutas o ACL: "10.0.0.0 255.255.255.0"
+        try:
+            bits = _ipv4(partes[1])
+        except OSError:
+            raise ErrorPlan(f"Máscara no válida: {partes[1]}") from None
+        prefijo = bin(bits).count("1")
+        if bits != ((1 << 32) - 1) ^ ((1 << (32 - prefijo)) - 1):
+            raise ErrorPlan(f"La máscara no es contigua: {partes[1]}")
+        texto = f"{texto}/{prefijo}"
+
+    red, _, prefijo = texto.partition("/")
+    try:
+        # Camino rápido para IPv4, el caso de las tablas grandes
+        inicio = _ipv4(red)
+        ancho = ANCHO_IPV4
+        prefijo = int(prefijo) if prefijo else ANCHO_IPV4
+        if not 0 <= prefijo <= ANCHO_IPV4:
+            raise ValueError
+    except (OSError, ValueError):
+        inicio, prefijo, ancho = parsear_red(texto)
+    tamano = 1 << (ancho - prefijo)
+    inicio &= ~(tamano - 1)
+    return inicio, inicio + tamano, ancho
+
+
+def leer_prefijos(lineas):
+    """Separa los prefijos de un iterable de líneas en rangos IPv4 e IPv6."""
+    inicios4, fines4, rangos6 = [], [], []
+    for numero, linea in enumerate(lineas, 1):
+        try:
+            rango = parsear_prefijo(linea)
+        except ErrorPlan as e:
+            raise ErrorPlan(f"Línea {numero}: {e}") from None
+        if rango is None:
+            continue
+        inicio, fin, ancho = rango
+        if ancho == ANCHO_IPV4:
+            inicios4.append(inicio)
+            fines4.append(fin)
+        else:
+            rangos6.append((inicio, fin))
+    return (inicios4, fines4), rangos6
+
+
+def fundir_ipv4(inicios, fines):
+    """Rangos fundidos (listas de inicio y fin) de rangos IPv4, con NumPy."""
+    if not len(inicios):
+        return [], []
+    inicios = np.asarray(inicios, dtype=np.int64)
+    fines = np.asarray(fines, dtype=np.int64)
+    orden = np.argsort(inicios, kind="stable")
+    inicios, fines = inicios[orden], fines[orden]
+    # Un rango abre grupo si empieza después de todo lo anterior
+    alcance = np.maximum.accumulate(fines)
+    nuevo = np.empty(inicios.size, dtype=bool)
+    nuevo[0] = True
+    nuevo[1:] = inicios[1:] > alcance[:-1]
+    grupos = np.flatnonzero(nuevo)
+    finales = np.append(grupos[1:] - 1, inicios.size - 1)
+    return inicios[grupos].tolist(), alcance[finales].tolist()
+
+
+def fundir(rangos):
+    """Rangos fundidos de una lista de (inicio, fin), ordenados."""
+    fundidos = []
+    for inicio, fin in sorted(rangos):
+        if fundidos and inicio <= fundidos[-1][1]:
+            if fin > fundidos[-1][1]:
+                fundidos[-1][1] = fin
+        else:
+            fundidos.append([inicio, fin])
+    return [tuple(r) for r in fundidos]
+
+
+def agregar_inexacto(bloques, ancho, tolerancia, prefijo_minimo=0):
+    """Une bloques ordenados en superredes con a lo sumo `tolerancia` de espacio extra.
+
+    Cada agregado (red, prefijo) cubre como mínimo (1 - tolerancia) de su
+    tamaño con direcciones pedidas y nunca es más corto que prefijo_minimo.
+    """
+    pila = deque()  # (red, prefijo, direcciones cubiertas)
+    region = ancho - prefijo_minimo
+    for red, prefijo in bloques:
+        actual = (red, prefijo, 1 << (ancho - prefijo))
+        while pila:
+            # Superred más pequeña que contiene al bloque anterior y al actual
+            comun = ancho - (pila[-1][0] ^ (actual[0] + actual[2] - 1)).bit_length()
+            if comun < prefijo_minimo:
+                break
+            tamano = 1 << (ancho - comun)
+            base = actual[0] & ~(tamano - 1)
+            cubiertas = actual[2]
+            absorbidos = 0
+            for anterior in reversed(pila):
+                if anterior[0] < base:
+                    break
+                cubiertas += anterior[2]
+                absorbidos += 1
+            if tamano - cubiertas > tolerancia * tamano:
+                break
+            for _ in range(absorbidos):
+                pila.pop()
+            actual = (base, comun, cubiertas)
+        # Lo que queda fuera de la región de prefijo_minimo del bloque actual
+        # ya no puede unirse a nada: se emite sin esperar al final
+        while pila and pila[0][0] >> region != actual[0] >> region:
+            red_p, prefijo_p, _ = pila.popleft()
+            yield red_p, prefijo_p
+        pila.append(actual)
+    for red, prefijo, _ in pila:
+        yield red, prefijo
+
+
+def sumarizar(lineas, tolerancia=0.0, prefijo_minimo=0, prefijo_minimo6=0):
+    """Genera (red, prefijo, ancho) del resumen de los prefijos de `lineas`.
+
+    prefijo_minimo limita los agregados inexactos IPv4 y prefijo_minimo6 los IPv6.
+    """
+    (inicios4, fines4), rangos6 = leer_prefijos(lineas)
+    for ancho, (inicios, fines), minimo in (
+        (ANCHO_IPV4, fundir_ipv4(inicios4, fines4), prefijo_minimo),
+        (ANCHO_IPV6, tuple(zip(*fundir(rangos6))) or ((), ()), prefijo_minimo6),
+    ):
+        bloques = (b for inicio, fin in zip(inicios, fines) for b in bloques_cidr(inicio, fin, ancho))
+        if tolerancia > 0:
+            bloques = agregar_inexacto(bloques, ancho, tolerancia, minimo)
+        for red, prefijo in bloques:
+            yield red, prefijo, ancho
+
+
+def formatear(red, prefijo, ancho, formato="cidr"):
+    if formato == "acl" and ancho == ANCHO_IPV4:
+        return f"{int_a_ip(red)} {int_a_ip(wildcard(prefijo))}"
+    return f"{int_a_ip(red, ancho)}/{prefijo}"
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        description="Resume una lista de prefijos en el mínimo conjunto de agregados."
+    )
+    parser.add_argument("entrada", nargs="?", default="-",
+                        help="Archivo con un prefijo por línea ('-' = stdin)")
+    parser.add_argument("-o", "--salida", default="-", help="Archivo de salida ('-' = stdout)")
+    parser.add_argument("--formato", choices=FORMATOS, default="cidr",
+                        help="cidr (10.0.0.0/22) o acl (10.0.0.0 0.0.3.255)")
+    parser.add_argument("--tolerancia", type=float, default=0.0,
+                        help="Fracción de espacio no pedido admitida en cada agregado (0 = exacto)")
+    parser.add_argument("--prefijo-minimo", type=int, default=PREFIJO_MINIMO,
+                        help="Prefijo más corto que puede tener un agregado inexacto IPv4")
+    parser.add_argument("--prefijo-minimo-ipv6", type=int, default=PREFIJO_MINIMO_IPV6,
+                        help="Lo mismo para los agregados IPv6")
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    if not 0 <= args.tolerancia < 1:
+        print("La tolerancia debe estar entre 0 y 1", file=sys.stderr)
+        return 2
+
+    entrada = sys.stdin if args.entrada == "-" else open(args.entrada, encoding="utf-8")
+    salida = sys.stdout if args.salida == "-" else open(args.salida, "w", encoding="utf-8")
+    try:
+        for red, prefijo, ancho in sumarizar(entrada, args.tolerancia, args.prefijo_minimo, args.prefijo_minimo_ipv6):
+            salida.write(formatear(red, prefijo, ancho, args.formato) + "\n")
+    except ErrorPlan as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    except BrokenPipeError:
+        # La salida se cerró (ej: `| head`): stdout pasa a /dev/null para que
+        # el vaciado al salir no vuelva a fallar
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    finally:
+        if entrada is not sys.stdin:
+            entrada.close()
+        if salida is not sys.stdout:
+            salida.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""Generación vectorizada de la tabla de subredes con NumPy.
+
+Construye todas las columnas de un plan IPv4 (red, primera, última,
+broadcast, hosts, máscara, wildcard) como arreglos uint32 en unas pocas
+operaciones, y las convierte a notación decimal con puntos en bloque.
+"""
+import numpy as np
+
+from motor_vlsm import ANCHO_IPV4, Plan, filas_plan
+
+TAMANO_BLOQUE = 65536
+
+# Texto ASCII de cada mitad de 16 bits ("a.b"), empaquetado en un uint64
+# little-endian, y su longitud en bytes; se construyen en el primer uso
+_TEXTO_MITAD = None
+_LARGO_MITAD = None
+
+# Máscara y wildcard solo dependen del prefijo: 33 textos posibles
+_PREFIJOS = np.arange(33, dtype=np.uint64)
+_WILDCARDS = (np.uint64(1) << (np.uint64(32) - _PREFIJOS)) - np.uint64(1)
+_TEXTO_MASCARA = None
+_TEXTO_WILDCARD = None
+
+
+def redes_y_prefijos(plan, inicio=0, fin=None):
+    fin = len(plan) if fin is None else min(fin, len(plan))
+    if isinstance(plan, Plan):
+        # Subdivisión fija: progresión aritmética, sin recorrer el plan
+        indices = np.arange(inicio, fin, dtype=np.uint64)
+        redes = (np.uint64(plan.red) + indices * np.uint64(plan.paso)).astype(np.uint32)
+        prefijos = np.full(fin - inicio, plan.nuevo_prefijo, dtype=np.uint32)
+    else:
+        pares = plan[inicio:fin]
+        redes = np.fromiter((red for red, _ in pares), dtype=np.uint32, count=len(pares))
+        prefijos = np.fromiter((p for _, p in pares), dtype=np.uint32, count=len(pares))
+    return redes, prefijos
+
+
+def columnas_plan(plan, inicio=0, fin=None):
+    redes, prefijos = redes_y_prefijos(plan, inicio, fin)
+    wildcard = np.uint32(0xFFFFFFFF) >> prefijos
+    broadcast = redes | wildcard
+    return {
+        "red": redes,
+        "primera": redes + np.uint32(1),
+        "ultima": broadcast - np.uint32(1),
+        "broadcast": broadcast,
+        "hosts": (np.uint64(1) << (np.uint64(32) - prefijos.astype(np.uint64))) - np.uint64(2),
+        "mascara": ~wildcard,
+        "prefijo": prefijos,
+        "wildcard": wildcard,
+    }
+
+
+def _tablas_mitad():
+    global _TEXTO_MITAD, _LARGO_MITAD
+    if _TEXTO_MITAD is None:
+        mitades = [f"{i >> 8}.{i & 255}".encode() for i in range(65536)]
+        _LARGO_MITAD = np.array([len(t) for t in mitades], dtype=np.uint64)
+        _TEXTO_MITAD = np.frombuffer(b"".join(t.ljust(8, b"\0") for t in mitades), dtype="<u8")
+    return _TEXTO_MITAD, _LARGO_MITAD
+
+
+def a_texto_ip(valores):
+    texto_mitad, largo_mitad = _tablas_mitad()
+    valores = np.asarray(valores, dtype=np.uint32)
+    alta = valores >> np.uint32(16)
+    bits = largo_mitad[alta] * np.uint64(8)
+    # "." seguido de la mitad baja, desplazado tras el texto de la mitad alta
+    baja = np.uint64(0x2E) | (texto_mitad[valores & np.uint32(0xFFFF)] << np.uint64(8))
+
+    salida = np.empty((valores.size, 2), dtype="<u8")
+    salida[:, 0] = texto_mitad[alta] | (baja << bits)
+    salida[:, 1] = baja >> (np.uint64(64) - bits)
+    # Los bytes nulos de relleno desaparecen al ver cada fila como 'S16'
+    return salida.view("S16").ravel().astype("U15")
+
+
+def _textos_por_prefijo():
+    global _TEXTO_MASCARA, _TEXTO_WILDCARD
+    if _TEXTO_MASCARA is None:
+        _TEXTO_WILDCARD = a_texto_ip(_WILDCARDS.astype(np.uint32))
+        _TEXTO_MASCARA = a_texto_ip((~_WILDCARDS & np.uint64(0xFFFFFFFF)).astype(np.uint32))
+    return _TEXTO_MASCARA, _TEXTO_WILDCARD
+
+
+def tabla_texto(plan, inicio=0, fin=None):
+    c = columnas_plan(plan, inicio, fin)
+    texto_mascara, texto_wildcard = _textos_por_prefijo()
+    return {
+        "red": a_texto_ip(c["red"]),
+        "primera": a_texto_ip(c["primera"]),
+        "ultima": a_texto_ip(c["ultima"]),
+        "broadcast": a_texto_ip(c["broadcast"]),
+        "hosts": c["hosts"],
+        "mascara": texto_mascara[c["prefijo"]],
+        "prefijo": c["prefijo"],
+        "wildcard": texto_wildcard[c["prefijo"]],
+    }
+
+
+def filas_vectorizadas(plan, inicio=0, fin=None, tamano_bloque=TAMANO_BLOQUE):
+    # Mismas filas que motor_vlsm.filas_plan, calculadas por bloques
+    if plan.ancho != ANCHO_IPV4:
+        # Las direcciones IPv6 no caben en uint32: se generan una a una
+        yield from filas_plan(plan, inicio, fin)
+        return
+    fin = len(plan) if fin is None else min(fin, len(plan))
+    for desde in range(inicio, fin, tamano_bloque):
+        hasta = min(desde + tamano_bloque, fin)
+        t = tabla_texto(plan, desde, hasta)
+        columnas = zip(
+            t["red"].tolist(), t["primera"].tolist(), t["ultima"].tolist(),
+            t["broadcast"].tolist(), t["hosts"].tolist(), t["mascara"].tolist(),
+            t["prefijo"].tolist(), t["wildcard"].tolist()
+        )
+        for i, (red, primera, ultima, broadcast, hosts, masc, p, wild) in enumerate(columnas, desde):
+            yield [plan.etiqueta(i), red, primera, ultima, broadcast, hosts, masc, f"/{p}", wild]
@@ -0,0 +1,84 @@
+"""Tareas en segundo plano para la interfaz Qt.
+
+Cada Tarea ejecuta una función en el QThreadPool global. La función recibe la
+propia tarea como primer argumento para informar el progreso, publicar
+resultados parciales y comprobar si el usuario pidió cancelar. Las señales se
+entregan en el hilo de la interfaz, así que los slots pueden tocar widgets.
+"""
+import threading
+import time
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+# Intervalo mínimo entre avisos de progreso, para no saturar el bucle de eventos
+INTERVALO_PROGRESO = 0.1
+
+
+class TareaCancelada(Exception):
+    pass
+
+
+class SenalesTarea(QObject):
+    progreso = pyqtSignal(object, object, str)  # hechos, total, mensaje
+    parcial = pyqtSignal(object)
+    terminado = pyqtSignal(object)
+    error = pyqtSignal(str)
+    cancelado = pyqtSignal()
+    finalizado = pyqtSignal()  # se emite siempre, después de las anteriores
+
+
+class Tarea(QRunnable):
+    def __init__(self, funcion, *args, **kwargs):
+        super().__init__()
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+        self.senales = SenalesTarea()
+        self._cancelar = threading.Event()
+        self._ultimo_progreso = 0.0
+        self.hechos = 0  # último progreso informado: sirve de conteo de filas
+        self.medicion = None  # la asigna quien mide la tarea
+        # El pool no debe destruir la tarea mientras la interfaz la referencia
+        self.setAutoDelete(False)
+
+    def cancelar(self):
+        self._cancelar.set()
+
+    @property
+    def cancelada(self):
+        return self._cancelar.is_set()
+
+    def comprobar(self):
+        if self._cancelar.is_set():
+            raise TareaCancelada()
+
+    def informar(self, hechos, total, mensaje="", forzar=False):
+        self.comprobar()
+        self.hechos = hechos
+        ahora = time.monotonic()
+        if forzar or hechos >= total or ahora - self._ultimo_progreso >= INTERVALO_PROGRESO:
+            self._ultimo_progreso = ahora
+            self.senales.progreso.emit(hechos, total, mensaje)
+
+    def publicar(self, parcial):
+        self.senales.parcial.emit(parcial)
+
+    def run(self):
+        try:
+            resultado = self.funcion(self, *self.args, **self.kwargs)
+        except TareaCancelada:
+            self.senales.cancelado.emit()
+        except Exception as e:
+            self.senales.error.emit(str(e))
+        else:
+            if self.cancelada:
+                self.senales.cancelado.emit()
+            else:
+                self.senales.terminado.emit(resultado)
+        finally:
+            self.senales.finalizado.emit()
+
+
+def iniciar(tarea, pool=None):
+    (pool or QThreadPool.globalInstance()).start(tarea)
+    return tarea
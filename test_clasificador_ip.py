@@ -0,0 +1,86 @@
+import io
+import ipaddress
+import random
+
+import numpy as np
+import pytest
+
+from clasificador_ip import TablaPrefijos, clasificar, extraer_ips
+from motor_vlsm import MODO_HOSTS, MODO_SUBREDES, MODO_VLSM, ErrorPlan, planificar
+
+
+def tabla_y_redes(planes):
+    tabla = TablaPrefijos(planes)
+    redes = [ipaddress.ip_network(tabla.cidr(i)) for i in range(len(tabla))]
+    return tabla, redes
+
+
+def mas_especifica(redes, ip):
+    # Fuerza bruta: la red más larga que contiene la IP
+    candidatas = [(red.prefixlen, i) for i, red in enumerate(redes) if ip in red]
+    return max(candidatas)[1] if candidatas else -1
+
+
+def test_prefijo_mas_largo_coincide_con_fuerza_bruta():
+    # Planes anidados: el /16 dentro del /8 y un VLSM dentro de una subred del /16
+    planes = [
+        planificar("10.0.0.0/8", MODO_SUBREDES, 4),
+        planificar("10.1.0.0/16", MODO_HOSTS, 1000),
+        planificar("10.1.4.0/22", MODO_VLSM, "A:200, B:100, C:20, D:2"),
+        planificar("192.168.0.0/24", MODO_SUBREDES, 3),
+    ]
+    tabla, redes = tabla_y_redes(planes)
+    aleatorio = random.Random(5)
+    ips = [aleatorio.randrange(2 ** 32) for _ in range(2000)]
+    # IPs dentro y en los bordes de cada subred
+    for red in redes:
+        ips += [int(red.network_address), int(red.broadcast_address), int(red.broadcast_address) + 1]
+        ips += [aleatorio.randint(int(red.network_address), int(red.broadcast_address)) for _ in range(5)]
+    ips = [ip % 2 ** 32 for ip in ips]
+    resultado = tabla.buscar(np.array(ips, dtype=np.uint32))
+    esperado = [mas_especifica(redes, ipaddress.IPv4Address(ip)) for ip in ips]
+    assert resultado.tolist() == esperado
+
+
+def test_subred_y_etiqueta():
+    planes = [planificar("10.0.0.0/24", MODO_SUBREDES, 2), planificar("10.1.0.0/24", MODO_VLSM, "WAN:2")]
+    tabla = TablaPrefijos(planes)
+    assert tabla.subred(2) == (planes[1], 0)
+    assert tabla.etiqueta(2) == "WAN"
+    assert tabla.cidr(1) == "10.0.0.128/25"
+
+
+def test_solo_ipv4():
+    with pytest.raises(ErrorPlan):
+        TablaPrefijos([planificar("2001:db8::/32", MODO_SUBREDES, 2)])
+
+
+def test_extraer_ips():
+    lineas = [
+        "1.2.3.4,a", "x,10.0.0.255,z", "255.255.255.255", "256.1.1.1", "1.2.3", "01.2.3.4",
+        "1.2.3.4.5", "::1", "", "10.0.0.1 extra", "1234.1.1.1",
+    ]
+    datos = "".join(linea + "\n" for linea in lineas).encode()
+    ips, validas = extraer_ips(datos)
+    for linea, ip, valida in zip(lineas, ips.tolist(), validas.tolist()):
+        campo = linea.split(",")[0].split(" ")[0]
+        try:
+            esperado = int(ipaddress.IPv4Address(campo))
+        except ValueError:
+            esperado = None
+        if campo == "01.2.3.4":
+            esperado = int(ipaddress.IPv4Address("1.2.3.4"))  # se admiten ceros a la izquierda
+        assert (ip if valida else None) == esperado, linea
+    ips, validas = extraer_ips(datos, columna=1)
+    assert validas.tolist()[:2] == [False, True]
+    assert ips[1] == int(ipaddress.IPv4Address("10.0.0.255"))
+
+
+def test_clasificar_por_bloques():
+    tabla = TablaPrefijos([planificar("10.0.0.0/24", MODO_SUBREDES, 4)])
+    lineas = [f"10.0.0.{n},x" for n in range(256)] + ["no es ip,x", "10.0.1.1,x"]
+    # Bloques pequeños para que las líneas queden cortadas entre lecturas
+    archivo = io.BytesIO("\n".join(lineas).encode())
+    resultado = clasificar(archivo, tabla, tamano_bloque=100)
+    assert resultado.conteos.tolist() == [64, 64, 64, 64]
+    assert (resultado.lineas, resultado.no_validas, resultado.sin_subred) == (258, 1, 1)
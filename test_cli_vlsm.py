@@ -0,0 +1,104 @@
+import csv
+import io
+import ipaddress
+import json
+import subprocess
+import sys
+
+import pytest
+
+import cli_vlsm
+from cli_vlsm import ejecutar, leer_solicitudes, main, procesar
+
+
+def correr(capsys, monkeypatch, entrada, *argumentos):
+    monkeypatch.setattr("sys.stdin", io.StringIO(entrada))
+    codigo = main(["-", *argumentos])
+    salida = capsys.readouterr()
+    return codigo, salida.out, salida.err
+
+
+def test_lineas_jsonl_no_validas(capsys, monkeypatch):
+    entrada = '[1, 2]\n"x"\n{roto\n\n{"red": "10.0.0.0/24", "modo": "subredes", "valor": 2}\n'
+    codigo, salida, error = correr(capsys, monkeypatch, entrada)
+    registros = [json.loads(linea) for linea in salida.splitlines()]
+    assert [r["linea"] for r in registros] == [1, 2, 3, 5]
+    assert all(r["error"] for r in registros[:3])
+    assert "JSON no válido" in registros[2]["error"]
+    assert registros[3]["subredes"] == 2 and "error" not in registros[3]
+    assert codigo == 1 and "3 solicitudes con error" in error
+
+
+@pytest.mark.parametrize("solicitud, mensaje", [
+    ({"red": "10.0.0.0/24", "modo": "otro", "valor": 2}, "Modo de cálculo desconocido"),
+    ({"red": "10.0.0.0/24", "modo": "hosts", "valor": "muchos"}, "número entero positivo"),
+    ({"red": "10.0.0.0/33", "modo": "hosts", "valor": 2}, "Error en la red"),
+    ({"modo": "vlsm", "valor": "A:10"}, "Error en la red"),
+    ({"red": "10.0.0.0/24", "modo": "subredes", "valor": 1000}, "No se pueden crear"),
+])
+def test_errores_por_solicitud(solicitud, mensaje):
+    textos = list(procesar((7, solicitud, "subredes", "jsonl", 0, None)))
+    assert len(textos) == 1
+    texto, hubo_error = textos[0]
+    registro = json.loads(texto)
+    assert hubo_error and registro["linea"] == 7 and mensaje in registro["error"]
+
+
+def test_csv_con_errores(capsys, monkeypatch):
+    entrada = "red,modo,valor\n192.168.0.0/24,hosts,60\n192.168.0.0/24,hosts,\n"
+    codigo, salida, _ = correr(capsys, monkeypatch, entrada, "--entrada-formato", "csv", "--salida", "csv")
+    filas = list(csv.DictReader(io.StringIO(salida)))
+    assert codigo == 1
+    assert [f["linea"] for f in filas] == ["2", "3"]
+    assert filas[0]["subredes"] == "4" and not filas[0]["error"]
+    assert filas[1]["error"]
+
+
+def test_leer_solicitudes_csv():
+    flujo = io.StringIO("red,modo,valor\n10.0.0.0/8,vlsm,A:5\n")
+    assert list(leer_solicitudes(flujo, "csv")) == [(2, {"red": "10.0.0.0/8", "modo": "vlsm", "valor": "A:5"})]
+
+
+def test_subredes_en_bloques_acotados():
+    trabajo = (1, {"red": "10.0.0.0/20", "modo": "hosts", "valor": 2}, "subredes", "jsonl", 0, None)
+    textos = [texto for texto, _ in procesar(trabajo, filas=100)]
+    assert len(textos) == 11  # 1024 subredes /30
+    assert all(texto.count("\n") <= 100 for texto in textos)
+    redes = [json.loads(linea)["red"] for texto in textos for linea in texto.splitlines()]
+    esperadas = ipaddress.ip_network("10.0.0.0/20").subnets(new_prefix=30)
+    assert redes == [str(r.network_address) for r in esperadas]
+
+
+@pytest.mark.parametrize("ordenado", [True, False])
+def test_procesos_dan_el_mismo_resultado(ordenado):
+    solicitudes = [
+        {"red": "10.0.0.0/14", "modo": "hosts", "valor": 2},
+        {"red": "mal", "modo": "hosts", "valor": 2},
+        {"red": "192.168.0.0/24", "modo": "vlsm", "valor": "A:50, B:20"},
+    ]
+    trabajos = [(i, s, "subredes", "jsonl", 0, None) for i, s in enumerate(solicitudes, 1)]
+    secuencial = list(ejecutar(trabajos))
+    paralelo = list(ejecutar(trabajos, procesos=2, ordenado=ordenado))
+    # Ningún proceso devuelve de golpe las 262144 subredes del /14
+    assert max(texto.count("\n") for texto, _ in paralelo) <= 2 * cli_vlsm.FILAS_POR_BLOQUE
+    assert sum(e for _, e in paralelo) == sum(e for _, e in secuencial) == 1
+    if ordenado:
+        assert "".join(t for t, _ in paralelo) == "".join(t for t, _ in secuencial)
+    else:
+        assert sorted("".join(t for t, _ in paralelo).splitlines()) == \
+            sorted("".join(t for t, _ in secuencial).splitlines())
+
+
+def test_salida_cerrada_antes_de_tiempo():
+    # Como `python cli_vlsm.py - --detalle subredes | head -1`
+    solicitud = json.dumps({"red": "10.0.0.0/8", "modo": "subredes", "valor": 65536}) + "\n"
+    proceso = subprocess.Popen(
+        [sys.executable, cli_vlsm.__file__, "-", "--detalle", "subredes"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    proceso.stdin.write(solicitud.encode())
+    proceso.stdin.close()
+    assert proceso.stdout.readline()
+    proceso.stdout.close()
+    assert proceso.wait(30) == 1
+    assert proceso.stderr.read() == b""
@@ -0,0 +1,76 @@
+import ipaddress
+import random
+
+import pytest
+
+from espacio_libre import analizar_espacio
+from motor_vlsm import ANCHO_IPV4, ANCHO_IPV6
+
+
+def rango(red):
+    return int(red.network_address), int(red.broadcast_address) + 1
+
+
+def analizar(padre, asignadas):
+    return analizar_espacio(
+        int(padre.network_address), padre.prefixlen, padre.max_prefixlen, [rango(r) for r in asignadas]
+    )
+
+
+def huecos_esperados(padre, asignadas):
+    # Se resta cada asignación del padre con address_exclude
+    libres = [padre]
+    for asignada in ipaddress.collapse_addresses(asignadas):
+        siguientes = []
+        for libre in libres:
+            if libre.subnet_of(asignada):
+                continue
+            if asignada.subnet_of(libre):
+                siguientes.extend(libre.address_exclude(asignada))
+            else:
+                siguientes.append(libre)
+        libres = siguientes
+    return list(ipaddress.collapse_addresses(libres))
+
+
+@pytest.mark.parametrize("semilla", range(5))
+def test_huecos_coinciden_con_address_exclude(semilla):
+    aleatorio = random.Random(semilla)
+    padre = ipaddress.ip_network("10.0.0.0/12")
+    # Algunas asignaciones se salen del padre y deben recortarse
+    asignadas = [
+        ipaddress.ip_network((aleatorio.randrange(0x09F00000, 0x0A200000), aleatorio.randint(17, 28)), strict=False)
+        for _ in range(300)
+    ]
+    analisis = analizar(padre, asignadas)
+    libres = [ipaddress.ip_network(h) for h in analisis.huecos]
+    assert libres == huecos_esperados(padre, asignadas)
+    assert analisis.total == padre.num_addresses
+    assert analisis.asignadas + sum(r.num_addresses for r in libres) == padre.num_addresses
+    assert analisis.mayor_prefijo == min(r.prefixlen for r in libres)
+
+
+def test_ipv6():
+    padre = ipaddress.ip_network("2001:db8::/32")
+    asignadas = [ipaddress.ip_network(r) for r in ("2001:db8::/48", "2001:db8:8000::/34", "2001:db8:ffff::/48")]
+    analisis = analizar(padre, asignadas)
+    assert analisis.ancho == ANCHO_IPV6
+    assert [ipaddress.ip_network(h) for h in analisis.huecos] == huecos_esperados(padre, asignadas)
+
+
+def test_padre_vacio_y_lleno():
+    padre = ipaddress.ip_network("192.168.0.0/24")
+    vacio = analizar(padre, [])
+    assert vacio.huecos == [(int(padre.network_address), 24)]
+    assert vacio.fragmentacion == 0.0
+    lleno = analizar(padre, [ipaddress.ip_network("192.168.0.0/16")])
+    assert lleno.huecos == [] and lleno.asignadas == 256 and lleno.mayor_prefijo is None
+
+
+def test_fragmentacion():
+    padre = ipaddress.ip_network("192.168.0.0/24")
+    # Libres: 192.168.0.64/26 y 192.168.0.192/26; el mayor bloque es la mitad
+    asignadas = [ipaddress.ip_network("192.168.0.0/26"), ipaddress.ip_network("192.168.0.128/26")]
+    analisis = analizar(padre, asignadas)
+    assert analisis.ancho == ANCHO_IPV4
+    assert analisis.fragmentacion == pytest.approx(0.5)
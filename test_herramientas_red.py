@@ -0,0 +1,197 @@
+import asyncio
+import socket
+import threading
+import time
+
+import pytest
+
+import herramientas_red
+from herramientas_red import CacheTTL, ResolutorDNS, escanear_puertos, resolutores_archivo_hosts
+
+
+class Reloj:
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self):
+        return self.ahora
+
+
+@pytest.fixture
+def resolutor(tmp_path):
+    ruta = tmp_path / "hosts"
+    ruta.write_text(
+        "# pruebas\n"
+        "10.0.0.1  router.lab gw  # puerta de enlace\n"
+        "10.0.0.2  impresora.lab\n"
+        "10.0.0.3  router.lab\n"
+        "2001:db8::5  servidor6.lab\n",
+        encoding="utf-8",
+    )
+    directo, inverso = resolutores_archivo_hosts(ruta)
+    llamadas = []
+
+    def contar(funcion):
+        def envoltura(consulta):
+            llamadas.append(consulta)
+            return funcion(consulta)
+        return envoltura
+
+    reloj = Reloj()
+    cache = CacheTTL(ttl=300, ttl_negativo=60, reloj=reloj)
+    return ResolutorDNS(cache, hilos=4, directo=contar(directo), inverso=contar(inverso)), reloj, llamadas
+
+
+def test_archivo_hosts(resolutor):
+    dns, _, _ = resolutor
+    assert dns.directo("ROUTER.lab").respuesta == ["10.0.0.1", "10.0.0.3"]
+    assert dns.directo("gw").respuesta == ["10.0.0.1"]
+    assert dns.inverso("10.0.0.1").respuesta == "router.lab"
+    assert dns.inverso("2001:db8::5").respuesta == "servidor6.lab"
+    fallo = dns.directo("nadie.lab")
+    assert fallo.respuesta is None and "nadie.lab" in fallo.error
+    assert dns.inverso("10.0.0.9").error
+
+
+def test_cache_y_vencimiento(resolutor):
+    dns, reloj, llamadas = resolutor
+    assert not dns.inverso("10.0.0.2").desde_cache
+    assert not dns.inverso("10.0.0.9").desde_cache
+    reloj.ahora = 59
+    segunda = dns.inverso("10.0.0.2")
+    assert segunda.desde_cache and segunda.respuesta == "impresora.lab"
+    assert dns.inverso("10.0.0.9").desde_cache
+    assert llamadas == ["10.0.0.2", "10.0.0.9"]
+    # La respuesta negativa vence antes que la positiva
+    reloj.ahora = 61
+    assert not dns.inverso("10.0.0.9").desde_cache
+    assert dns.inverso("10.0.0.2").desde_cache
+    reloj.ahora = 301
+    assert not dns.inverso("10.0.0.2").desde_cache
+    assert llamadas == ["10.0.0.2", "10.0.0.9", "10.0.0.9", "10.0.0.2"]
+
+
+def test_resolucion_masiva_en_orden(resolutor):
+    dns, _, llamadas = resolutor
+    ips = ["10.0.0.3", "10.0.0.1", "10.0.0.7", "10.0.0.2"]
+    resultados = dns.resolver_masivo(ips)
+    assert [r.consulta for r in resultados] == ips
+    assert [r.respuesta for r in resultados] == ["router.lab", "router.lab", None, "impresora.lab"]
+    repetidos = dns.resolver_masivo(ips + ips)
+    assert all(r.desde_cache for r in repetidos)
+    assert sorted(llamadas) == sorted(ips)
+
+
+def puertos_de_prueba(abiertos, cerrados):
+    # Servidores en escucha y puertos que se liberan enseguida (cerrados)
+    servidores = []
+    for _ in range(abiertos):
+        s = socket.socket()
+        s.bind(("127.0.0.1", 0))
+        s.listen()
+        servidores.append(s)
+    libres = []
+    for _ in range(cerrados):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            libres.append(s.getsockname()[1])
+    return servidores, [s.getsockname()[1] for s in servidores], libres
+
+
+def test_escaneo_solo_informa_abiertos():
+    servidores, abiertos, cerrados = puertos_de_prueba(3, 5)
+    try:
+        informados = []
+        resultado = escanear_puertos(["127.0.0.1"], cerrados + abiertos, concurrencia=4, timeout=1,
+                                     al_abierto=informados.append)
+    finally:
+        for s in servidores:
+            s.close()
+    assert [r.puerto for r in resultado] == sorted(abiertos)
+    assert sorted(r.puerto for r in informados) == sorted(abiertos)
+    assert all(r.host == "127.0.0.1" and r.latencia >= 0 for r in resultado)
+
+
+def test_escaneo_respeta_concurrencia_y_tasa(monkeypatch):
+    original = herramientas_red.sondear_puerto
+    en_vuelo = 0
+    maximo = 0
+    inicios = {}
+
+    async def sondear(host, puerto, timeout):
+        nonlocal en_vuelo, maximo
+        inicios.setdefault(host, []).append(time.monotonic())
+        en_vuelo += 1
+        maximo = max(maximo, en_vuelo)
+        try:
+            await asyncio.sleep(0.01)
+            return await original(host, puerto, timeout)
+        finally:
+            en_vuelo -= 1
+
+    monkeypatch.setattr(herramientas_red, "sondear_puerto", sondear)
+    _, _, cerrados = puertos_de_prueba(0, 1)
+    hosts = ["127.0.0.1", "127.0.0.2"]
+    progreso = []
+    inicio = time.monotonic()
+    resultado = escanear_puertos(hosts, cerrados * 15, concurrencia=3, timeout=1, tasa_por_host=10,
+                                 al_progreso=lambda hechas, total: progreso.append((hechas, total)))
+    duracion = time.monotonic() - inicio
+    assert resultado == [] and maximo == 3
+    assert progreso[-1] == (30, 30)
+    for host in hosts:
+        tiempos = inicios[host]
+        assert len(tiempos) == 15
+        # Ráfaga de 10 y luego una sonda cada 0,1 s
+        assert tiempos[-1] - tiempos[0] >= 0.45
+        assert all(b - a >= 0.09 for a, b in zip(tiempos[10:], tiempos[11:]))
+    # El límite es por host: los dos avanzan a la vez
+    assert duracion < 0.9
+
+
+def test_limitador_de_tasa():
+    async def medir():
+        limitador = herramientas_red.LimitadorTasa(50, rafaga=5)
+        inicio = time.monotonic()
+        for _ in range(30):
+            await limitador.adquirir()
+        return time.monotonic() - inicio
+
+    # 5 de la ráfaga y 25 a 50 por segundo: al menos medio segundo
+    assert asyncio.run(medir()) >= 0.45
+
+
+def test_cancelar_resolucion_masiva_no_espera():
+    liberar = threading.Event()
+
+    def lento(ip):
+        liberar.wait(5)
+        return "lento.lab"
+
+    def cancelar(resultado):
+        raise KeyboardInterrupt
+
+    dns = ResolutorDNS(CacheTTL(), hilos=2, inverso=lambda ip: "rapido.lab" if ip == "10.0.0.1" else lento(ip))
+    inicio = time.monotonic()
+    try:
+        with pytest.raises(KeyboardInterrupt):
+            dns.resolver_masivo(["10.0.0.1", "10.0.0.2", "10.0.0.3", "10.0.0.4"], al_resultado=cancelar)
+        assert time.monotonic() - inicio < 1
+    finally:
+        liberar.set()
+
+
+@pytest.mark.parametrize("cabecera_ip", [b"", b"\x45" + b"\0" * 19, b"\x46" + b"\0" * 23])
+def test_respuesta_eco_con_y_sin_cabecera_ip(cabecera_ip):
+    respuesta = bytearray(herramientas_red._eco_icmp(7))
+    respuesta[0] = 0  # eco de respuesta
+    assert herramientas_red._es_respuesta_eco(cabecera_ip + bytes(respuesta), 0, 7)
+    assert not herramientas_red._es_respuesta_eco(cabecera_ip + bytes(respuesta), 0, 8)
+    assert not herramientas_red._es_respuesta_eco(cabecera_ip + herramientas_red._eco_icmp(7), 0, 7)
+
+
+def test_icmp_segun_las_familias_del_barrido(monkeypatch):
+    monkeypatch.setattr(herramientas_red, "icmp_permitido", lambda f: f == socket.AF_INET)
+    monkeypatch.setattr(herramientas_red.shutil, "which", lambda programa: None)
+    assert herramientas_red.metodo_ping_disponible(["10.0.0.1", "10.0.0.2"]) == "icmp"
+    assert herramientas_red.metodo_ping_disponible(["10.0.0.1", "2001:db8::1"]) == "tcp"
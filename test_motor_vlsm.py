@@ -0,0 +1,144 @@
+import ipaddress
+import random
+
+import pytest
+
+from motor_vlsm import (
+    ANCHO_IPV4, ANCHO_IPV6, MODO_HOSTS, MODO_SUBREDES, MODO_VLSM, AsignadorBuddy, ErrorPlan,
+    ancho_de_mascara, bloques_cidr, hosts_en, parsear_mascara, planificar,
+)
+
+
+def redes(plan):
+    return [ipaddress.ip_network((red, prefijo)) for red, prefijo in plan]
+
+
+@pytest.mark.parametrize("red_cidr, modo, valor", [
+    ("192.168.1.0/24", MODO_SUBREDES, 4),
+    ("192.168.1.0/24", MODO_SUBREDES, 5),
+    ("10.0.0.0/16", MODO_HOSTS, 500),
+    ("172.16.0.0/20", MODO_HOSTS, 2),
+    ("2001:db8::/48", MODO_SUBREDES, 300),
+    ("2001:db8::/56", MODO_HOSTS, 2 ** 64),
+])
+def test_plan_coincide_con_ipaddress(red_cidr, modo, valor):
+    plan = planificar(red_cidr, modo, valor)
+    padre = ipaddress.ip_network(red_cidr)
+    esperadas = list(padre.subnets(new_prefix=plan.nuevo_prefijo))
+    if modo == MODO_SUBREDES:
+        esperadas = esperadas[:valor]
+        assert plan.nuevo_prefijo == padre.prefixlen + (valor - 1).bit_length()
+    else:
+        # La subred más pequeña con sitio para los hosts pedidos
+        assert hosts_en(plan.nuevo_prefijo, plan.ancho) >= valor
+        assert hosts_en(plan.nuevo_prefijo + 1, plan.ancho) < valor
+    assert redes(plan) == esperadas
+    assert plan[-1] == (int(esperadas[-1].network_address), plan.nuevo_prefijo)
+    assert plan[1:3] == [(int(r.network_address), r.prefixlen) for r in esperadas[1:3]]
+
+
+def test_plan_enorme_sin_materializar():
+    plan = planificar("2001:db8::/32", MODO_SUBREDES, 2 ** 32)
+    assert len(plan) == 2 ** 32
+    ultima = ipaddress.ip_network("2001:db8:ffff:ffff::/64")
+    assert plan[-1] == (int(ultima.network_address), 64)
+    ip = int(ipaddress.ip_address("2001:db8:1:2::5"))
+    assert plan.indice_de(ip) == 0x00010002
+
+
+@pytest.mark.parametrize("red_cidr, modo, valor", [
+    ("192.168.1.0/24", MODO_SUBREDES, 0),
+    ("192.168.1.0/24", MODO_SUBREDES, 65),
+    ("192.168.1.0/24", MODO_HOSTS, 200),
+    ("192.168.1.300/24", MODO_SUBREDES, 2),
+    ("10.0.0.0/8", MODO_VLSM, "A:x"),
+])
+def test_planes_imposibles(red_cidr, modo, valor):
+    with pytest.raises(ErrorPlan):
+        planificar(red_cidr, modo, valor)
+
+
+@pytest.mark.parametrize("red_cidr, ancho", [("10.0.0.0/8", ANCHO_IPV4), ("2001:db8::/32", ANCHO_IPV6)])
+def test_vlsm_asigna_sin_solapes(red_cidr, ancho):
+    aleatorio = random.Random(7)
+    limite = 2 ** 16 if ancho == ANCHO_IPV4 else 2 ** 70
+    valor = ", ".join(f"R{i}:{aleatorio.randint(1, limite)}" for i in range(300))
+    plan = planificar(red_cidr, MODO_VLSM, valor)
+    padre = ipaddress.ip_network(red_cidr)
+    asignadas = redes(plan)
+    assert len(plan) + len(plan.rechazados) == 300
+    for anterior, siguiente in zip(asignadas, asignadas[1:]):
+        assert anterior.broadcast_address < siguiente.network_address
+    for (nombre, hosts, _, prefijo), red in zip(plan.asignaciones, asignadas):
+        assert red.subnet_of(padre)
+        assert hosts_en(prefijo, ancho) >= hosts
+    # Lo asignado y los bloques libres cubren el padre exactamente una vez
+    libres = [ipaddress.ip_network(b) for b in plan.libres]
+    assert sum(r.num_addresses for r in asignadas + libres) == padre.num_addresses
+    assert list(ipaddress.collapse_addresses(asignadas + libres)) == [padre]
+
+
+def test_vlsm_rechaza_lo_que_no_cabe():
+    plan = planificar("192.168.0.0/24", MODO_VLSM, "A:100, B:100, C:100")
+    assert [a[0] for a in plan.asignaciones] == ["A", "B"]
+    assert plan.rechazados == [("C", 100)]
+    assert plan.direcciones_libres == 0
+
+
+def test_buddy_divide_y_agota():
+    asignador = AsignadorBuddy(int(ipaddress.ip_address("10.0.0.0")), 24)
+    bloques = [asignador.asignar(26) for _ in range(4)]
+    assert sorted(bloques) == [int(ipaddress.ip_address(f"10.0.0.{n}")) for n in (0, 64, 128, 192)]
+    assert asignador.asignar(30) is None
+    assert asignador.bloques_libres() == []
+
+
+def test_indice_de():
+    plan = planificar("10.0.0.0/16", MODO_SUBREDES, 6)
+    for i, red in enumerate(redes(plan)):
+        assert plan.indice_de(int(red.network_address)) == i
+        assert plan.indice_de(int(red.broadcast_address)) == i
+    fuera = int(ipaddress.ip_address("10.0.192.1"))  # la subred 7 de 8 no se pidió
+    assert plan.indice_de(fuera) is None
+    assert plan.indice_de(int(ipaddress.ip_address("9.255.255.255"))) is None
+
+
+def test_libres_completan_el_padre():
+    plan = planificar("10.0.0.0/16", MODO_SUBREDES, 5)
+    padre = ipaddress.ip_network("10.0.0.0/16")
+    libres = [ipaddress.ip_network(b) for b in plan.libres]
+    usadas = redes(plan)
+    assert sum(r.num_addresses for r in usadas + libres) == padre.num_addresses
+    assert list(ipaddress.collapse_addresses(usadas + libres)) == [padre]
+    assert sum(r.num_addresses for r in libres) == plan.direcciones_libres
+
+
+def test_bloques_cidr_coincide_con_summarize():
+    aleatorio = random.Random(3)
+    for _ in range(500):
+        inicio = aleatorio.randrange(2 ** 32)
+        fin = aleatorio.randrange(inicio, 2 ** 32) + 1
+        esperados = ipaddress.summarize_address_range(
+            ipaddress.IPv4Address(inicio), ipaddress.IPv4Address(fin - 1)
+        )
+        assert list(bloques_cidr(inicio, fin)) == [(int(r.network_address), r.prefixlen) for r in esperados]
+    assert list(bloques_cidr(0, 2 ** 128, ANCHO_IPV6)) == [(0, 0)]
+
+
+@pytest.mark.parametrize("texto, prefijo", [("/24", 24), ("24", 24), ("255.255.255.0", 24), ("0.0.0.0", 0)])
+def test_parsear_mascara(texto, prefijo):
+    assert parsear_mascara(texto) == prefijo
+
+
+@pytest.mark.parametrize("texto", ["/33", "255.0.255.0", "ffff::"])
+def test_parsear_mascara_no_valida(texto):
+    with pytest.raises(ErrorPlan):
+        parsear_mascara(texto)
+
+
+@pytest.mark.parametrize("texto, ancho", [
+    ("/26", ANCHO_IPV4), ("255.255.0.0", ANCHO_IPV4),
+    ("/64", ANCHO_IPV6), ("33", ANCHO_IPV6), ("ffff:ffff::", ANCHO_IPV6),
+])
+def test_ancho_de_mascara(texto, ancho):
+    assert ancho_de_mascara(texto) == ancho
@@ -0,0 +1,147 @@
+import asyncio
+import http.client
+import ipaddress
+import json
+import socket
+import threading
+
+import pytest
+
+from servidor_api import ServidorAPI
+
+
+@pytest.fixture(scope="module")
+def puerto():
+    # El servidor corre en su propio bucle, en un hilo, sobre un puerto libre
+    loop = asyncio.new_event_loop()
+    api = ServidorAPI()
+    servidor = loop.run_until_complete(api.iniciar("127.0.0.1", 0))
+    hilo = threading.Thread(target=loop.run_forever, daemon=True)
+    hilo.start()
+    yield servidor.sockets[0].getsockname()[1]
+    loop.call_soon_threadsafe(loop.stop)
+    hilo.join()
+    servidor.close()
+    api.cerrar()
+
+
+def pedir(puerto, ruta, metodo="GET", cuerpo=None):
+    conexion = http.client.HTTPConnection("127.0.0.1", puerto, timeout=10)
+    conexion.request(metodo, ruta, body=cuerpo)
+    respuesta = conexion.getresponse()
+    datos = respuesta.read()
+    conexion.close()
+    return respuesta, datos
+
+
+def pedir_crudo(puerto, datos):
+    with socket.create_connection(("127.0.0.1", puerto), timeout=10) as s:
+        s.sendall(datos)
+        respuesta = b""
+        while True:
+            try:
+                parte = s.recv(65536)
+            except ConnectionResetError:
+                break
+            if not parte:
+                break
+            respuesta += parte
+    return respuesta.split(b"\r\n", 1)[0]
+
+
+def test_plan_con_cache(puerto):
+    ruta = "/plan?red=10.20.0.0/16&modo=hosts&valor=500"
+    primera, datos = pedir(puerto, ruta)
+    assert primera.status == 200 and primera.getheader("X-Cache") == "MISS"
+    resumen = json.loads(datos)
+    assert resumen["subredes"] == 128 and resumen["prefijo"] == 23 and resumen["hosts_por_subred"] == 510
+    segunda, datos_cache = pedir(puerto, ruta)
+    assert segunda.getheader("X-Cache") == "HIT" and datos_cache == datos
+
+
+def test_plan_vlsm_por_post(puerto):
+    cuerpo = json.dumps({"red": "192.168.0.0/24", "modo": "vlsm", "valor": "A:100, B:100, C:100"})
+    respuesta, datos = pedir(puerto, "/plan", "POST", cuerpo)
+    resumen = json.loads(datos)
+    assert respuesta.status == 200
+    assert resumen["subredes"] == 2 and resumen["rechazados"] == [{"nombre": "C", "hosts": 100}]
+
+
+def test_subredes_en_streaming(puerto):
+    respuesta, datos = pedir(puerto, "/plan/subredes?red=10.0.0.0/14&modo=hosts&valor=2&desde=5&limite=70000")
+    assert respuesta.status == 200 and respuesta.getheader("Transfer-Encoding") == "chunked"
+    assert respuesta.getheader("X-Subredes") == str(2 ** 16)
+    filas = [json.loads(linea) for linea in datos.decode().splitlines()]
+    esperadas = list(ipaddress.ip_network("10.0.0.0/14").subnets(new_prefix=30))[5:]
+    assert [f["red"] for f in filas] == [str(r) for r in esperadas]
+    assert filas[0] == {
+        "subred": "Subred 6", "red": "10.0.0.20/30", "primera": "10.0.0.21", "ultima": "10.0.0.22",
+        "broadcast": "10.0.0.23", "hosts": 2, "mascara": "255.255.255.252", "prefijo": 30,
+        "wildcard": "0.0.0.3",
+    }
+
+
+def test_subredes_con_el_mismo_esquema_que_inverso(puerto):
+    _, datos = pedir(puerto, "/plan/subredes?red=2001:db8::/64&modo=subredes&valor=2&limite=1")
+    fila = json.loads(datos)
+    _, datos = pedir(puerto, "/inverso?ip=2001:db8::1/65")
+    inverso = json.loads(datos)
+    del fila["subred"], inverso["ip"]
+    assert fila == inverso
+    assert fila["broadcast"] is None and fila["prefijo"] == 65
+
+
+@pytest.mark.parametrize("consulta, red, broadcast", [
+    ("ip=192.168.1.77&mascara=255.255.255.192", "192.168.1.64/26", "192.168.1.127"),
+    ("ip=10.1.2.3/8", "10.0.0.0/8", "10.255.255.255"),
+    ("ip=2001:db8::abcd&mascara=/120", "2001:db8::ab00/120", None),
+])
+def test_inverso(puerto, consulta, red, broadcast):
+    respuesta, datos = pedir(puerto, f"/inverso?{consulta}")
+    resultado = json.loads(datos)
+    assert respuesta.status == 200
+    assert resultado["red"] == red and resultado["broadcast"] == broadcast
+    assert resultado["hosts"] == ipaddress.ip_network(red).num_addresses - (2 if broadcast else 0)
+
+
+@pytest.mark.parametrize("mascara, esperado", [
+    ("255.255.240.0", {"mascara": "255.255.240.0", "prefijo": 20, "wildcard": "0.0.15.255"}),
+    ("/64", {"mascara": "ffff:ffff:ffff:ffff::", "prefijo": 64, "wildcard": "::ffff:ffff:ffff:ffff"}),
+])
+def test_wildcard(puerto, mascara, esperado):
+    _, datos = pedir(puerto, f"/wildcard?mascara={mascara}")
+    assert json.loads(datos) == esperado
+
+
+def test_sumarizar(puerto):
+    cuerpo = "10.0.0.0/24\n10.0.1.0/24\n# nota\n10.0.2.0 255.255.254.0\n"
+    respuesta, datos = pedir(puerto, "/sumarizar?formato=acl", "POST", cuerpo.encode())
+    assert respuesta.status == 200
+    assert json.loads(datos) == {"agregados": ["10.0.0.0 0.0.3.255"], "cantidad": 1}
+
+
+@pytest.mark.parametrize("ruta, metodo, cuerpo, estado", [
+    ("/plan?red=10.0.0.0/24&modo=subredes&valor=1000", "GET", None, 400),
+    ("/plan?modo=subredes&valor=2", "GET", None, 400),
+    ("/plan", "POST", b"[1, 2]", 400),
+    ("/sumarizar", "POST", b"\xff\xfe10.0.0.0/8", 400),
+    ("/no-existe", "GET", None, 404),
+    ("/plan", "DELETE", None, 405),
+])
+def test_errores(puerto, ruta, metodo, cuerpo, estado):
+    respuesta, datos = pedir(puerto, ruta, metodo, cuerpo)
+    assert respuesta.status == estado and json.loads(datos)["error"]
+
+
+@pytest.mark.parametrize("peticion", [
+    b"GET /" + b"a" * 70000 + b" HTTP/1.1\r\n\r\n",
+    b"GET /estado HTTP/1.1\r\nX-Larga: " + b"a" * 70000 + b"\r\n\r\n",
+    b"POST /plan HTTP/1.1\r\nContent-Length: -5\r\n\r\n",
+    b"POST /plan HTTP/1.1\r\nContent-Length: cinco\r\n\r\n",
+    b"GET\r\n\r\n",
+])
+def test_peticiones_mal_formadas(puerto, peticion):
+    assert pedir_crudo(puerto, peticion) == b"HTTP/1.1 400 Bad Request"
+    # El servidor sigue atendiendo
+    respuesta, _ = pedir(puerto, "/estado")
+    assert respuesta.status == 200
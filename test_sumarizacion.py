@@ -0,0 +1,126 @@
+import bisect
+import ipaddress
+import random
+import subprocess
+import sys
+
+import pytest
+
+import sumarizacion
+from motor_vlsm import ANCHO_IPV4, ANCHO_IPV6, ErrorPlan
+from sumarizacion import formatear, parsear_prefijo, sumarizar
+
+
+def prefijos_aleatorios(cantidad, semilla):
+    aleatorio = random.Random(semilla)
+    redes = []
+    for _ in range(cantidad):
+        prefijo = aleatorio.randint(16, 32)
+        red = ipaddress.ip_network((aleatorio.randrange(2 ** 32), prefijo), strict=False)
+        redes.append(red)
+    return redes
+
+
+def redes(resultado):
+    return [ipaddress.ip_network((red, prefijo)) for red, prefijo, _ in resultado]
+
+
+def direcciones(redes_):
+    return sum(r.num_addresses for r in ipaddress.collapse_addresses(redes_))
+
+
+def cubiertas_en(agregado, pedidas, inicios):
+    # pedidas: redes disjuntas ordenadas; se suman las que caen dentro del agregado
+    i = bisect.bisect_left(inicios, int(agregado.network_address))
+    total = 0
+    while i < len(pedidas) and pedidas[i].subnet_of(agregado):
+        total += pedidas[i].num_addresses
+        i += 1
+    return total
+
+
+@pytest.mark.parametrize("semilla", range(5))
+def test_exacto_coincide_con_collapse(semilla):
+    entrada = prefijos_aleatorios(2000, semilla)
+    # Bloques vecinos para que haya fusiones
+    entrada += [next(r.supernet().subnets()) for r in entrada[:500]]
+    resultado = redes(sumarizar(str(r) for r in entrada))
+    assert resultado == list(ipaddress.collapse_addresses(entrada))
+
+
+def test_ipv4_e_ipv6_juntos():
+    lineas = ["2001:db8::/33", "10.0.1.0/24", "2001:db8:8000::/33", "10.0.0.0/24", "# comentario", ""]
+    resultado = list(sumarizar(lineas))
+    assert resultado == [
+        (int(ipaddress.ip_address("10.0.0.0")), 23, ANCHO_IPV4),
+        (int(ipaddress.ip_address("2001:db8::")), 32, ANCHO_IPV6),
+    ]
+
+
+@pytest.mark.parametrize("tolerancia, prefijo_minimo", [(0.1, 0), (0.25, 8), (0.5, 16)])
+def test_inexacto_respeta_la_tolerancia(tolerancia, prefijo_minimo):
+    entrada = prefijos_aleatorios(3000, 11)
+    pedidas = list(ipaddress.collapse_addresses(entrada))
+    inicios = [int(p.network_address) for p in pedidas]
+    agregados = redes(sumarizar((str(r) for r in entrada), tolerancia, prefijo_minimo))
+    assert len(agregados) <= len(pedidas)
+    # Sin solapes entre agregados y cubriendo todo lo pedido
+    assert direcciones(agregados) == sum(a.num_addresses for a in agregados)
+    assert sum(cubiertas_en(a, pedidas, inicios) for a in agregados) == direcciones(pedidas)
+    for agregado in agregados:
+        cubiertas = cubiertas_en(agregado, pedidas, inicios)
+        assert cubiertas >= (1 - tolerancia) * agregado.num_addresses
+        if agregado not in pedidas:
+            assert agregado.prefixlen >= prefijo_minimo
+
+
+def test_prefijo_minimo_por_familia():
+    lineas = ["10.0.0.0/10", "10.192.0.0/10", "2001:db8::/34", "2001:db8:c000::/34"]
+    assert [str(r) for r in redes(sumarizar(lineas, 0.5, 8, 32))] == ["10.0.0.0/8", "2001:db8::/32"]
+    assert [str(r) for r in redes(sumarizar(lineas, 0.5, 8, 33))] == [
+        "10.0.0.0/8", "2001:db8::/34", "2001:db8:c000::/34",
+    ]
+    assert len(list(sumarizar(lineas, 0.5, 9, 32))) == 3
+
+
+@pytest.mark.parametrize("linea, esperado", [
+    ("10.1.2.3/24", ("10.1.2.0", "10.1.3.0")),
+    ("10.1.2.0 255.255.254.0", ("10.1.2.0", "10.1.4.0")),
+    ("192.168.0.1", ("192.168.0.1", "192.168.0.2")),
+    ("2001:db8::1/64", ("2001:db8::", "2001:db8:0:1::")),
+])
+def test_parsear_prefijo(linea, esperado):
+    inicio, fin, _ = parsear_prefijo(linea)
+    assert (inicio, fin) == tuple(int(ipaddress.ip_address(ip)) for ip in esperado)
+
+
+@pytest.mark.parametrize("linea", ["! acl", "# nota", "   "])
+def test_parsear_prefijo_ignora_comentarios(linea):
+    assert parsear_prefijo(linea) is None
+
+
+@pytest.mark.parametrize("linea", ["10.1/8", "10.0.0.0 255.0.255.0", "10.0.0.0/33", "hola"])
+def test_parsear_prefijo_no_valido(linea):
+    with pytest.raises(ErrorPlan):
+        parsear_prefijo(linea)
+
+
+def test_formato_acl():
+    red = int(ipaddress.ip_address("10.0.0.0"))
+    assert formatear(red, 22, ANCHO_IPV4, "acl") == "10.0.0.0 0.0.3.255"
+    assert formatear(red, 22, ANCHO_IPV4) == "10.0.0.0/22"
+
+
+def test_salida_cerrada_antes_de_tiempo():
+    # Como `python sumarizacion.py rutas.txt | head -1`: prefijos /32 sueltos que no se funden
+    entrada = "".join(f"10.{i >> 8}.{i & 255}.0/32\n" for i in range(50000))
+    proceso = subprocess.Popen(
+        [sys.executable, sumarizacion.__file__],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    proceso.stdin.write(entrada.encode())
+    proceso.stdin.close()
+    assert proceso.stdout.readline() == b"10.0.0.0/32\n"
+    proceso.stdout.close()
+    assert proceso.wait(30) == 1
+    assert proceso.stderr.read() == b""
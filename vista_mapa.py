@@ -0,0 +1,182 @@
+"""Mapa del espacio de direcciones del plan, dibujado con QPainter.
+
+La rejilla de Hilbert (mapa_hilbert) se calcula solo al pintar una vista
+nueva y se guarda en una caché pequeña, de modo que acercar y alejar son
+inmediatos aunque el plan tenga millones de subredes.
+"""
+from collections import OrderedDict
+
+from PyQt5.QtCore import Qt, QRect, pyqtSignal
+from PyQt5.QtGui import QColor, QImage, QPainter
+from PyQt5.QtWidgets import QToolTip, QWidget
+
+from motor_vlsm import int_a_ip
+
+VISTAS_EN_CACHE = 16
+
+COLOR_FONDO = QColor(40, 40, 40)
+COLOR_LIBRE = (70, 70, 70)
+COLOR_OCUPADO = (79, 129, 189)
+# Colores alternos para distinguir subredes vecinas cuando una celda cae
+# dentro de una sola subred
+PALETA = (
+    (79, 129, 189), (155, 187, 89), (247, 150, 70), (128, 100, 162),
+    (75, 172, 198), (192, 80, 77), (238, 196, 70), (52, 101, 164),
+)
+
+
+class MapaDirecciones(QWidget):
+    # Índice de la subred bajo el cursor al hacer doble click
+    subred_activada = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumSize(256, 256)
+        self.setMouseTracking(True)
+        self.plan = None
+        self._bloques = None
+        self._bloques_listos = False
+        self._vista = None
+        self._rejillas = OrderedDict()
+        self._imagen = None
+
+    def establecer_plan(self, plan):
+        self.plan = plan
+        self._bloques = None
+        self._bloques_listos = False
+        self._rejillas.clear()
+        self._imagen = None
+        self._vista = (plan.red, plan.ancho - plan.prefijo) if plan else None
+        self.update()
+
+    def _rejilla(self):
+        # Re-agrupar solo cuando cambia la vista; NumPy se importa al primer uso
+        from mapa_hilbert import bloques_plan, rejilla
+
+        if self._vista in self._rejillas:
+            self._rejillas.move_to_end(self._vista)
+            return self._rejillas[self._vista]
+        if not self._bloques_listos:
+            self._bloques = bloques_plan(self.plan)
+            self._bloques_listos = True
+        resultado = rejilla(self.plan, *self._vista, bloques=self._bloques)
+        self._rejillas[self._vista] = resultado
+        if len(self._rejillas) > VISTAS_EN_CACHE:
+            self._rejillas.popitem(last=False)
+        return resultado
+
+    def _construir_imagen(self, r):
+        import numpy as np
+
+        libre = np.array(COLOR_LIBRE, dtype=np.float64)
+        ocupado = np.array(COLOR_OCUPADO, dtype=np.float64)
+        rgb = libre + (ocupado - libre) * r.ocupacion[..., None]
+        dentro = r.indice >= 0
+        paleta = np.array(PALETA, dtype=np.float64)
+        rgb[dentro] = paleta[r.indice[dentro] % len(PALETA)]
+
+        rgb = rgb.astype(np.uint32)
+        pixeles = (0xFF000000 | (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]).astype(np.uint32)
+        lado = pixeles.shape[0]
+        # QImage no copia el búfer: se guarda el arreglo junto a la imagen
+        imagen = QImage(pixeles.data, lado, lado, lado * 4, QImage.Format_RGB32)
+        return imagen, pixeles
+
+    def _area_mapa(self):
+        lado = max(1, min(self.width(), self.height() - 20))
+        return QRect((self.width() - lado) // 2, 20, lado, lado)
+
+    def _celda_bajo(self, pos):
+        if not self.plan or self._imagen is None:
+            return None
+        area = self._area_mapa()
+        if not area.contains(pos):
+            return None
+        r = self._imagen[0]
+        lado = 1 << r.orden
+        x = min(lado - 1, (pos.x() - area.x()) * lado // area.width())
+        y = min(lado - 1, (pos.y() - area.y()) * lado // area.height())
+        return r, x, y
+
+    def paintEvent(self, event):
+        pintor = QPainter(self)
+        pintor.fillRect(self.rect(), COLOR_FONDO)
+        pintor.setPen(Qt.white)
+        if not self.plan:
+            pintor.drawText(self.rect(), Qt.AlignCenter, "Realiza un cálculo para ver el mapa")
+            return
+
+        r = self._rejilla()
+        if self._imagen is None or self._imagen[0] is not r:
+            self._imagen = (r,) + self._construir_imagen(r)
+        # Sin suavizado: cada celda se ve como un bloque nítido
+        pintor.drawImage(self._area_mapa(), self._imagen[1])
+
+        ocupado = float(r.ocupacion.mean()) * 100
+        ancho = self.plan.ancho
+        pintor.drawText(
+            QRect(0, 0, self.width(), 20), Qt.AlignCenter,
+            f"{int_a_ip(r.base, ancho)}/{ancho - r.bits} · celda /{ancho - r.bits_celda} · {ocupado:.1f}% asignado"
+        )
+
+    def mouseMoveEvent(self, event):
+        celda = self._celda_bajo(event.pos())
+        if celda is None:
+            QToolTip.hideText()
+            return
+        from mapa_hilbert import celda_en
+
+        r, x, y = celda
+        ancho = self.plan.ancho
+        _, inicio, fin = celda_en(r, x, y)
+        texto = f"{int_a_ip(inicio, ancho)} - {int_a_ip(fin - 1, ancho)}\nAsignado: {r.ocupacion[y, x] * 100:.0f}%"
+        indice = int(r.indice[y, x])
+        if indice >= 0:
+            red, prefijo = self.plan[indice]
+            texto += f"\n{self.plan.etiqueta(indice)}: {int_a_ip(red, ancho)}/{prefijo}"
+        QToolTip.showText(event.globalPos(), texto, self)
+
+    def acercar_en(self, pos):
+        from mapa_hilbert import acercar, celda_en
+
+        celda = self._celda_bajo(pos)
+        if celda:
+            r, x, y = celda
+            d, _, _ = celda_en(r, x, y)
+            self._cambiar_vista(acercar(r, d))
+
+    def alejar(self):
+        from mapa_hilbert import alejar
+
+        if self.plan:
+            self._cambiar_vista(alejar(self.plan, *self._vista))
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.RightButton:
+            self.alejar()
+
+    def mouseDoubleClickEvent(self, event):
+        # Sobre una sola subred se abre en la tabla; si la celda mezcla varias, se acerca
+        celda = self._celda_bajo(event.pos())
+        if not celda:
+            return
+        r, x, y = celda
+        if r.indice[y, x] >= 0:
+            self.subred_activada.emit(int(r.indice[y, x]))
+        else:
+            self.acercar_en(event.pos())
+
+    def wheelEvent(self, event):
+        if event.angleDelta().y() > 0:
+            self.acercar_en(event.pos())
+        elif event.angleDelta().y() < 0:
+            self.alejar()
+
+    def _cambiar_vista(self, vista):
+        if vista != self._vista:
+            self._vista = vista
+            self.update()
+
+    def vista_completa(self):
+        if self.plan:
+            self._cambiar_vista((self.plan.red, self.plan.ancho - self.plan.prefijo))
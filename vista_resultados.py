@@ -0,0 +1,129 @@
+"""Modelo Qt virtualizado sobre un plan de subnetting.
+
+Las filas se formatean solo cuando la vista las pide, y se van cargando por
+lotes a medida que el usuario se desplaza, así que un plan de millones de
+subredes se muestra al instante y con memoria constante. Al cambiar de plan
+(vista previa) solo se repintan las filas cargadas que difieren.
+"""
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from motor_vlsm import ENCABEZADOS, Plan, fila_subred
+
+LOTE_FILAS = 1000
+COLUMNAS_CENTRADAS = (1, 2, 3, 4)
+# Qt numera filas y guarda enteros en un int de 32 bits
+MAX_ENTERO_QT = 2 ** 31 - 1
+
+
+def rango_distinto(anterior, nuevo, filas):
+    """(primera, última) de las `filas` primeras filas que cambian entre dos planes, o None."""
+    if not filas:
+        return None
+    if anterior.ancho != nuevo.ancho:
+        return 0, filas - 1
+    if isinstance(anterior, Plan) and isinstance(nuevo, Plan):
+        # Dos progresiones aritméticas coinciden en todas las filas o en ninguna
+        iguales = (anterior.red, anterior.nuevo_prefijo) == (nuevo.red, nuevo.nuevo_prefijo)
+        return None if iguales else (0, filas - 1)
+    primera = ultima = None
+    for i in range(filas):
+        if anterior[i] != nuevo[i] or anterior.etiqueta(i) != nuevo.etiqueta(i):
+            if primera is None:
+                primera = i
+            ultima = i
+    return None if primera is None else (primera, ultima)
+
+
+class ModeloPlan(QAbstractTableModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.plan = None
+        self.filas_cargadas = 0
+        self._fila_cache = -1
+        self._datos_cache = None
+
+    def establecer_plan(self, plan):
+        self.beginResetModel()
+        self.plan = plan
+        self.filas_cargadas = min(self.total_filas(), LOTE_FILAS)
+        self._fila_cache = -1
+        self._datos_cache = None
+        self.endResetModel()
+
+    def actualizar_plan(self, plan):
+        """Cambia de plan sin reiniciar la vista, que conserva desplazamiento y selección."""
+        if plan is self.plan:
+            return
+        if self.plan is None or plan is None:
+            self.establecer_plan(plan)
+            return
+        nuevas = min(max(self.filas_cargadas, LOTE_FILAS), len(plan), MAX_ENTERO_QT)
+        cambio = rango_distinto(self.plan, plan, min(self.filas_cargadas, nuevas))
+        if nuevas < self.filas_cargadas:
+            # Se quitan las filas sobrantes mientras el plan anterior sigue puesto
+            self.beginRemoveRows(QModelIndex(), nuevas, self.filas_cargadas - 1)
+            self.filas_cargadas = nuevas
+            self.endRemoveRows()
+        self.plan = plan
+        self._fila_cache = -1
+        self._datos_cache = None
+        if nuevas > self.filas_cargadas:
+            self.beginInsertRows(QModelIndex(), self.filas_cargadas, nuevas - 1)
+            self.filas_cargadas = nuevas
+            self.endInsertRows()
+        if cambio:
+            self.dataChanged.emit(self.index(cambio[0], 0), self.index(cambio[1], len(ENCABEZADOS) - 1))
+
+    def limpiar(self):
+        self.establecer_plan(None)
+
+    def total_filas(self):
+        # Un plan IPv6 puede tener más subredes de las que Qt puede numerar
+        return min(len(self.plan), MAX_ENTERO_QT) if self.plan else 0
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.filas_cargadas
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(ENCABEZADOS)
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self.filas_cargadas < self.total_filas()
+
+    def fetchMore(self, parent):
+        if not parent.isValid():
+            self.cargar_hasta(self.filas_cargadas + LOTE_FILAS)
+
+    def cargar_hasta(self, filas):
+        fin = min(filas, self.total_filas())
+        if fin <= self.filas_cargadas:
+            return
+        self.beginInsertRows(QModelIndex(), self.filas_cargadas, fin - 1)
+        self.filas_cargadas = fin
+        self.endInsertRows()
+
+    def fila(self, numero):
+        # La vista pide todas las columnas de una fila seguidas
+        if numero != self._fila_cache:
+            red, prefijo = self.plan[numero]
+            self._datos_cache = fila_subred(
+                numero + 1, red, prefijo, self.plan.etiqueta(numero), self.plan.ancho
+            )
+            self._fila_cache = numero
+        return self._datos_cache
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self.filas_cargadas:
+            return None
+        if role == Qt.DisplayRole:
+            valor = self.fila(index.row())[index.column()]
+            # Los hosts de una subred IPv6 no caben en un entero de Qt
+            return str(valor) if isinstance(valor, int) and valor > MAX_ENTERO_QT else valor
+        if role == Qt.TextAlignmentRole and index.column() in COLUMNAS_CENTRADAS:
+            return Qt.AlignCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return ENCABEZADOS[section]
+        return None